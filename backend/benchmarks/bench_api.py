@@ -0,0 +1,264 @@
+#!/usr/bin/env python3
+"""
+Load and latency benchmark for the HTTP API.
+
+Runs the FastAPI app in-process over an ASGI transport (no sockets, no
+separate server) and drives each scenario with a fixed number of
+concurrent clients, then prints throughput and latency percentiles as
+JSON. Save the output per commit and pass it back with --compare to see
+the change.
+
+Uses a scratch database (dropped afterwards) on the MongoDB at MONGO_URL,
+or mongomock with --mock when no mongod is around; mock numbers are only
+comparable with other mock runs.
+
+    python benchmarks/bench_api.py --mock --concurrency 32 --requests 500
+    python benchmarks/bench_api.py --scenarios list_poems,upload_music --payload-kb 512 > after.json
+    python benchmarks/bench_api.py --compare before.json
+"""
+
+import os
+import io
+import sys
+import json
+import random
+import asyncio
+import logging
+import argparse
+import tempfile
+import shutil
+from datetime import datetime
+from time import perf_counter
+
+BACKEND_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..")
+sys.path.insert(0, BACKEND_DIR)
+
+import httpx
+
+USERNAME = "bench_author"
+PASSWORD = "bench_password"
+TARGETS = ["eye", "shree", "dhantha", "kalaagruha", "music"]
+WORDS = ["moon", "river", "monsoon", "light", "song", "stone", "temple", "dance", "silence", "ember"]
+
+SCENARIOS = ["login", "list_poems", "list_poems_uncached", "list_images", "page", "search", "upload_poem", "upload_music"]
+
+
+def percentile(values, pct):
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))
+    return ordered[index]
+
+
+def load_server(args, uploads_dir):
+    # server.py reads its configuration at import time
+    os.environ["DB_NAME"] = args.database
+    os.environ["UPLOADS_DIR"] = uploads_dir
+    if args.mongo_url:
+        os.environ["MONGO_URL"] = args.mongo_url
+    if args.mock:
+        # mongomock has no change streams or capped collections
+        os.environ["EVENTS_BACKEND"] = "memory"
+        os.environ["CREATE_INDEXES_ON_STARTUP"] = "false"
+        import mongomock
+        import pymongo
+        pymongo.MongoClient = mongomock.MongoClient
+    import server
+    return server
+
+
+class Lifespan:
+    """Runs the app's startup and shutdown handlers, as a server would."""
+
+    def __init__(self, app):
+        self.app = app
+        self.receive_queue = asyncio.Queue()
+        self.send_queue = asyncio.Queue()
+
+    async def __aenter__(self):
+        self.task = asyncio.create_task(self.app({"type": "lifespan"}, self.receive_queue.get, self.send_queue.put))
+        await self.receive_queue.put({"type": "lifespan.startup"})
+        message = await self.send_queue.get()
+        if message["type"] != "lifespan.startup.complete":
+            raise RuntimeError(f"Startup failed: {message}")
+        return self
+
+    async def __aexit__(self, *exc):
+        await self.receive_queue.put({"type": "lifespan.shutdown"})
+        await self.send_queue.get()
+        await self.task
+
+
+async def seed(server, client, args):
+    server.db.Auth.insert_one({"Username": USERNAME, "Password": server.get_password_hash(PASSWORD)})
+    response = await client.post("/api/auth/token", data={"username": USERNAME, "password": PASSWORD})
+    response.raise_for_status()
+    headers = {"Authorization": f"Bearer {response.json()['access_token']}"}
+
+    rng = random.Random(1)
+    poems = [
+        {
+            "type": "poem",
+            "title": " ".join(rng.choices(WORDS, k=3)),
+            "content": " ".join(rng.choices(WORDS, k=60)),
+            "author": "Bench",
+            "target": rng.choice(TARGETS),
+        }
+        for _ in range(args.seed_items)
+    ]
+    for start in range(0, len(poems), server.UPLOAD_BATCH_MAX_ITEMS):
+        response = await client.post("/api/upload/batch", json={"items": poems[start:start + server.UPLOAD_BATCH_MAX_ITEMS]}, headers=headers)
+        response.raise_for_status()
+    # Image documents for the listing routes; payloads are irrelevant to listing cost
+    now = datetime.utcnow()
+    server.db.images.insert_many([
+        {"title": f"image {i}", "description": None, "blob_id": None, "target": TARGETS[i % len(TARGETS)],
+         "uploaded_by": USERNAME, "uploaded_at": now}
+        for i in range(args.seed_items)
+    ])
+    return headers
+
+
+def make_request(scenario, headers, payload, counter):
+    """Return the kwargs for one request of ``scenario``."""
+    if scenario == "login":
+        return {"method": "POST", "url": "/api/auth/token", "data": {"username": USERNAME, "password": PASSWORD}}
+    if scenario == "list_poems":
+        return {"method": "GET", "url": "/api/poems", "params": {"limit": 50}}
+    if scenario == "list_poems_uncached":
+        # An unused query parameter changes the ETag variant, so every request renders
+        return {"method": "GET", "url": "/api/poems", "params": {"limit": 50, "nocache": counter}}
+    if scenario == "list_images":
+        return {"method": "GET", "url": "/api/images/eye", "params": {"limit": 50}}
+    if scenario == "page":
+        return {"method": "GET", "url": "/api/pages/eye", "params": {"limit": 20}}
+    if scenario == "search":
+        return {"method": "GET", "url": "/api/search", "params": {"q": WORDS[counter % len(WORDS)], "nocache": counter}}
+    if scenario == "upload_poem":
+        poem = {"title": f"bench {counter}", "content": " ".join(WORDS), "author": "Bench", "target": "eye"}
+        return {"method": "POST", "url": "/api/upload/poem", "json": poem, "headers": headers}
+    if scenario == "upload_music":
+        # Distinct bytes per request so every upload writes a new blob
+        data = counter.to_bytes(8, "big") + payload
+        return {
+            "method": "POST",
+            "url": "/api/upload/music/file",
+            "data": {"title": f"bench {counter}", "target": "music"},
+            "files": {"file": ("bench.mp3", io.BytesIO(data), "audio/mpeg")},
+            "headers": headers,
+        }
+    raise ValueError(f"Unknown scenario: {scenario}")
+
+
+async def run_scenario(client, scenario, headers, payload, args):
+    latencies = []
+    errors = 0
+    issued = 0
+
+    async def worker():
+        nonlocal errors, issued
+        while issued < args.requests:
+            counter = issued
+            issued += 1
+            request = make_request(scenario, headers, payload, counter)
+            started = perf_counter()
+            response = await client.request(**request)
+            latencies.append(perf_counter() - started)
+            if response.status_code >= 400:
+                errors += 1
+
+    # Warm-up outside the measurement
+    for i in range(min(args.warmup, args.requests)):
+        await client.request(**make_request(scenario, headers, payload, args.requests + i))
+
+    started = perf_counter()
+    await asyncio.gather(*(worker() for _ in range(args.concurrency)))
+    elapsed = perf_counter() - started
+
+    return {
+        "requests": len(latencies),
+        "errors": errors,
+        "seconds": round(elapsed, 3),
+        "throughput_rps": round(len(latencies) / elapsed, 1),
+        "p50_ms": round(percentile(latencies, 50) * 1000, 2),
+        "p95_ms": round(percentile(latencies, 95) * 1000, 2),
+        "p99_ms": round(percentile(latencies, 99) * 1000, 2),
+        "max_ms": round(max(latencies) * 1000, 2),
+    }
+
+
+async def run(server, args):
+    payload = os.urandom(args.payload_kb * 1024)
+    transport = httpx.ASGITransport(app=server.app)
+    async with Lifespan(server.app):
+        async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+            results = {}
+            try:
+                headers = await seed(server, client, args)
+                for scenario in args.scenarios:
+                    results[scenario] = await run_scenario(client, scenario, headers, payload, args)
+                    print(f"{scenario}: {results[scenario]['throughput_rps']} req/s, p95 {results[scenario]['p95_ms']} ms", file=sys.stderr)
+            finally:
+                # The client only exists while the app is running
+                if not args.mock:
+                    server.client.drop_database(args.database)
+            return results
+
+
+def compare(baseline, current):
+    """Per scenario, current / baseline for throughput and latency percentiles."""
+    changes = {}
+    for scenario, result in current.items():
+        before = baseline.get(scenario)
+        if not before:
+            continue
+        changes[scenario] = {
+            key: round(result[key] / before[key], 3) if before[key] else None
+            for key in ("throughput_rps", "p50_ms", "p95_ms", "p99_ms")
+        }
+    return changes
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--mongo-url", default=os.getenv("MONGO_URL"))
+    parser.add_argument("--database", default="shree_kara_bench")
+    parser.add_argument("--mock", action="store_true", help="use mongomock instead of a real mongod")
+    parser.add_argument("--scenarios", default=",".join(SCENARIOS))
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--requests", type=int, default=300, help="requests per scenario")
+    parser.add_argument("--warmup", type=int, default=10)
+    parser.add_argument("--payload-kb", type=int, default=256, help="upload size for upload_music")
+    parser.add_argument("--seed-items", type=int, default=500, help="poems and images created before measuring")
+    parser.add_argument("--compare", help="earlier JSON output to compare against")
+    args = parser.parse_args()
+    args.scenarios = [s.strip() for s in args.scenarios.split(",") if s.strip()]
+    unknown = [s for s in args.scenarios if s not in SCENARIOS]
+    if unknown:
+        parser.error(f"unknown scenarios: {', '.join(unknown)}")
+
+    logging.basicConfig(level=logging.WARNING)
+    uploads_dir = tempfile.mkdtemp(prefix="shree_kara_bench_")
+    server = load_server(args, uploads_dir)
+    try:
+        results = asyncio.run(run(server, args))
+    finally:
+        shutil.rmtree(uploads_dir, ignore_errors=True)
+
+    output = {
+        "config": {
+            "mock": args.mock,
+            "concurrency": args.concurrency,
+            "requests": args.requests,
+            "payload_kb": args.payload_kb,
+            "seed_items": args.seed_items,
+        },
+        "results": results,
+    }
+    if args.compare:
+        with open(args.compare) as f:
+            output["compared_to_baseline"] = compare(json.load(f)["results"], results)
+    print(json.dumps(output, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,106 @@
+#!/usr/bin/env python3
+"""
+Event loop benchmark for the repository layer.
+
+Issues one large insert and, at the same moment, a burst of small reads.
+With pymongo called inline (max_workers=0) the reads and the loop itself
+stall until the write returns; through the repository thread pool they
+complete independently. Needs a reachable MongoDB at MONGO_URL and uses
+a scratch database that is dropped afterwards.
+
+    python benchmarks/bench_repository.py --readers 50 --write-mb 12
+"""
+
+import os
+import sys
+import json
+import asyncio
+import argparse
+from time import perf_counter
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from pymongo import MongoClient
+
+from repository import Repository
+
+
+def percentile(values, pct):
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))
+    return ordered[index]
+
+
+async def run_mode(db, max_workers, args):
+    repo = Repository(db, max_workers=max_workers)
+    collection = repo.bench
+    await collection.insert_one({"_id": "probe", "value": 1})
+    payload = "x" * (args.write_mb * 1024 * 1024)
+
+    # Measures how late a 1 ms sleep wakes up, i.e. how long the loop was blocked
+    loop_lag = []
+    stop = asyncio.Event()
+
+    async def ticker():
+        while not stop.is_set():
+            started = perf_counter()
+            await asyncio.sleep(0.001)
+            loop_lag.append(perf_counter() - started - 0.001)
+
+    async def write(t0):
+        await collection.insert_one({"payload": payload})
+        return perf_counter() - t0
+
+    async def read(t0):
+        await collection.find_one({"_id": "probe"})
+        return perf_counter() - t0
+
+    tick = asyncio.create_task(ticker())
+    await asyncio.sleep(0.01)
+
+    t0 = perf_counter()
+    write_task = asyncio.create_task(write(t0))
+    reads = await asyncio.gather(*(read(t0) for _ in range(args.readers)))
+    write_seconds = await write_task
+
+    stop.set()
+    await tick
+    await repo.run(db.bench.delete_many, {})
+    repo.close()
+
+    return {
+        "max_workers": max_workers,
+        "write_ms": round(write_seconds * 1000, 2),
+        "read_p50_ms": round(percentile(reads, 50) * 1000, 2),
+        "read_p95_ms": round(percentile(reads, 95) * 1000, 2),
+        "read_max_ms": round(max(reads) * 1000, 2),
+        "reads_finished_before_write": sum(1 for r in reads if r < write_seconds),
+        "max_loop_lag_ms": round(max(loop_lag) * 1000, 2),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--mongo-url", default=os.getenv("MONGO_URL", "mongodb://localhost:27017"))
+    parser.add_argument("--database", default="shree_kara_bench")
+    parser.add_argument("--readers", type=int, default=50)
+    parser.add_argument("--write-mb", type=int, default=12)
+    parser.add_argument("--workers", type=int, default=int(os.getenv("DB_THREAD_POOL_SIZE", "16")))
+    args = parser.parse_args()
+
+    client = MongoClient(args.mongo_url, serverSelectionTimeoutMS=5000)
+    db = client[args.database]
+    try:
+        results = {
+            "inline": asyncio.run(run_mode(db, 0, args)),
+            "thread_pool": asyncio.run(run_mode(db, args.workers, args)),
+        }
+    finally:
+        client.drop_database(args.database)
+        client.close()
+
+    print(json.dumps(results, indent=2))
+
+
+if __name__ == "__main__":
+    main()
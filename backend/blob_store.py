@@ -0,0 +1,174 @@
+import os
+import base64
+import shutil
+import hashlib
+import tempfile
+from datetime import datetime
+
+from pymongo import ReturnDocument
+
+
+class BlobStore:
+    """Content-addressed storage for uploaded media payloads.
+
+    Blobs live on disk under ``root`` keyed by the SHA-256 of their decoded
+    bytes, so identical uploads share one file. A record per blob in
+    ``collection`` holds its reference count, size and MIME type.
+    """
+
+    def __init__(self, root, collection):
+        self.root = root
+        self.collection = collection
+        os.makedirs(root, exist_ok=True)
+
+    def path_for(self, blob_id):
+        return os.path.join(self.root, blob_id[:2], blob_id)
+
+    def derivative_dir(self, blob_id):
+        """Directory for files derived from a blob (e.g. image renditions); removed with it."""
+        return self.path_for(blob_id) + ".d"
+
+    def exists(self, blob_id):
+        return os.path.exists(self.path_for(blob_id))
+
+    def put(self, data, content_type):
+        writer = self.writer()
+        try:
+            writer.write(data)
+        except BaseException:
+            writer.abort()
+            raise
+        return writer.commit(content_type)
+
+    def put_file(self, path, content_type, chunk_size=1024 * 1024):
+        """Store a file from the same filesystem as ``root``, moving it into place."""
+        digest = hashlib.sha256()
+        size = 0
+        with open(path, "rb") as f:
+            while True:
+                chunk = f.read(chunk_size)
+                if not chunk:
+                    break
+                digest.update(chunk)
+                size += len(chunk)
+        return self._install(digest.hexdigest(), path, size, content_type)
+
+    def writer(self):
+        """Return a BlobWriter that hashes and spools chunks into a temp file."""
+        return BlobWriter(self)
+
+    def read(self, blob_id):
+        with open(self.path_for(blob_id), "rb") as f:
+            return f.read()
+
+    def release(self, blob_id):
+        """Drop one reference and delete the blob once nothing points at it."""
+        if not blob_id:
+            return False
+        record = self.collection.find_one_and_update(
+            {"_id": blob_id},
+            {"$inc": {"refcount": -1}},
+            return_document=ReturnDocument.AFTER,
+        )
+        if record is None or record["refcount"] > 0:
+            return False
+        if self.collection.delete_one({"_id": blob_id, "refcount": {"$lte": 0}}).deleted_count == 0:
+            return False
+
+        path = self.path_for(blob_id)
+        trash_path = path + ".deleting"
+        try:
+            os.replace(path, trash_path)
+        except FileNotFoundError:
+            shutil.rmtree(self.derivative_dir(blob_id), ignore_errors=True)
+            return True
+        # A put() may have re-referenced the blob while we were unlinking it.
+        if self.collection.find_one({"_id": blob_id}, {"_id": 1}) is not None:
+            os.replace(trash_path, path)
+            return False
+        os.remove(trash_path)
+        shutil.rmtree(self.derivative_dir(blob_id), ignore_errors=True)
+        return True
+
+    def _install(self, blob_id, tmp_path, size, content_type):
+        # Take the reference before checking the file so a concurrent
+        # release() of the same blob either sees our reference or we rewrite it.
+        self.collection.update_one(
+            {"_id": blob_id},
+            {
+                "$inc": {"refcount": 1},
+                "$setOnInsert": {
+                    "size": size,
+                    "content_type": content_type,
+                    "created_at": datetime.utcnow(),
+                },
+            },
+            upsert=True,
+        )
+        path = self.path_for(blob_id)
+        if os.path.exists(path):
+            os.remove(tmp_path)
+        else:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            os.replace(tmp_path, path)
+        return {"blob_id": blob_id, "size": size, "content_type": content_type}
+
+
+class BlobWriter:
+    """Incrementally writes one blob, hashing as it goes.
+
+    Memory use is bounded by the size of the chunks passed to ``write``.
+    """
+
+    def __init__(self, store):
+        self.store = store
+        self.size = 0
+        self._hash = hashlib.sha256()
+        fd, self._tmp_path = tempfile.mkstemp(dir=store.root, suffix=".tmp")
+        self._file = os.fdopen(fd, "wb")
+
+    def write(self, chunk):
+        self._hash.update(chunk)
+        self._file.write(chunk)
+        self.size += len(chunk)
+
+    def commit(self, content_type):
+        self._file.close()
+        return self.store._install(self._hash.hexdigest(), self._tmp_path, self.size, content_type)
+
+    def abort(self):
+        self._file.close()
+        if os.path.exists(self._tmp_path):
+            os.remove(self._tmp_path)
+
+
+def decode_payload(payload, default_content_type):
+    """Decode a base64 payload, optionally given as a ``data:`` URL.
+
+    Returns ``(bytes, content_type)``; raises ``ValueError`` on bad input.
+    """
+    content_type = default_content_type
+    if payload.startswith("data:"):
+        header, _, payload = payload.partition(",")
+        declared = header[len("data:"):].split(";")[0]
+        if declared:
+            content_type = declared
+    try:
+        data = base64.b64decode(payload, validate=True)
+    except (ValueError, TypeError):
+        raise ValueError("Invalid base64 payload")
+    return data, content_type
+
+
+def migrate_inline_payloads(collection, field, store, default_content_type):
+    """Move base64 payloads stored inside documents into the blob store."""
+    migrated = 0
+    for doc in collection.find({field: {"$exists": True}}, {field: 1}):
+        try:
+            data, content_type = decode_payload(doc[field], default_content_type)
+        except ValueError:
+            continue
+        blob = store.put(data, content_type)
+        collection.update_one({"_id": doc["_id"]}, {"$set": blob, "$unset": {field: ""}})
+        migrated += 1
+    return migrated
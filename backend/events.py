@@ -0,0 +1,135 @@
+import asyncio
+import logging
+import threading
+
+from pymongo.errors import PyMongoError
+
+logger = logging.getLogger("shree_kara")
+
+
+class Subscription:
+    """One SSE client: its filters and a bounded queue of pending events.
+
+    A ``None`` in the queue means events were dropped because the client
+    fell behind; it should refetch and reconnect.
+    """
+
+    def __init__(self, target=None, types=None, max_queue=256):
+        self.target = target
+        self.types = types
+        self.queue = asyncio.Queue(maxsize=max_queue)
+
+    def wants(self, event):
+        if self.types is not None and event["type"] not in self.types:
+            return False
+        # Deletes seen through a change stream carry no target; let them through
+        if self.target is not None and event.get("target") not in (self.target, None):
+            return False
+        return True
+
+
+class EventBroker:
+    """In-process fan-out of content change events to subscribers.
+
+    Meant to be used from the event loop. Publishing never blocks: a
+    subscriber whose queue is full is dropped and told to resync.
+    """
+
+    def __init__(self, max_subscribers=1000, max_queue=256):
+        self.max_subscribers = max_subscribers
+        self.max_queue = max_queue
+        self._subscriptions = set()
+        self.published = 0
+        self.dropped = 0
+
+    def subscribe(self, target=None, types=None):
+        """Return a new Subscription, or None when the subscriber limit is reached."""
+        if len(self._subscriptions) >= self.max_subscribers:
+            return None
+        subscription = Subscription(target, types, self.max_queue)
+        self._subscriptions.add(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription):
+        self._subscriptions.discard(subscription)
+
+    def publish(self, event):
+        self.published += 1
+        for subscription in list(self._subscriptions):
+            if not subscription.wants(event):
+                continue
+            try:
+                subscription.queue.put_nowait(event)
+            except asyncio.QueueFull:
+                # Replace the backlog with the resync marker
+                while not subscription.queue.empty():
+                    subscription.queue.get_nowait()
+                subscription.queue.put_nowait(None)
+                self._subscriptions.discard(subscription)
+                self.dropped += 1
+
+    def stats(self):
+        return {
+            "subscribers": len(self._subscriptions),
+            "published": self.published,
+            "dropped": self.dropped,
+        }
+
+
+class ChangeStreamFeed:
+    """Tails a Mongo change stream for inserts, updates and deletes on a background thread.
+
+    Changes made by any process sharing the database are handed to
+    ``on_change(op, collection, doc)`` on the event loop, where ``doc`` is
+    the full document for inserts and only ``{"_id": ...}`` for updates and
+    deletes.
+    ``start()`` raises OperationFailure when the server has no change
+    streams (a standalone mongod).
+    """
+
+    def __init__(self, db, collections, on_change, loop, max_await_ms=1000):
+        self.db = db
+        self.pipeline = [{"$match": {
+            "operationType": {"$in": ["insert", "update", "delete"]},
+            "ns.coll": {"$in": list(collections)},
+        }}]
+        self.on_change = on_change
+        self.loop = loop
+        self.max_await_ms = max_await_ms
+        self._stop = threading.Event()
+        self._thread = None
+
+    def start(self):
+        # Opened here so an unsupported server fails the caller, not the thread
+        stream = self.db.watch(self.pipeline, max_await_time_ms=self.max_await_ms)
+        self._thread = threading.Thread(target=self._run, args=(stream,), name="change-stream", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout=self.max_await_ms / 1000 + 1)
+
+    def _run(self, stream):
+        resume_token = None
+        while not self._stop.is_set():
+            try:
+                if stream is None:
+                    stream = self.db.watch(self.pipeline, max_await_time_ms=self.max_await_ms, resume_after=resume_token)
+                with stream:
+                    while not self._stop.is_set():
+                        change = stream.try_next()
+                        resume_token = stream.resume_token
+                        if change is not None:
+                            self._dispatch(change)
+            except PyMongoError as e:
+                # pymongo resumes transient errors itself; anything else reopens from the last token
+                logger.warning("Change stream interrupted: %s", e)
+                self._stop.wait(1.0)
+            stream = None
+
+    def _dispatch(self, change):
+        collection = change["ns"]["coll"]
+        op = change["operationType"]
+        doc = change["fullDocument"] if op == "insert" else change["documentKey"]
+        self.loop.call_soon_threadsafe(self.on_change, op, collection, doc)
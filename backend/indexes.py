@@ -0,0 +1,221 @@
+#!/usr/bin/env python3
+"""
+Index bootstrap for the Shree Kara collections.
+
+Creates the indexes the API's queries rely on, verifies they exist and
+flags queries that still fall back to collection scans.
+
+    python indexes.py            # create missing indexes, showing build progress
+    python indexes.py verify     # exit 1 if an expected index is missing
+    python indexes.py explain    # exit 1 if a listing query scans a collection
+
+With SEARCH_BACKEND=mongo the content collections also get the text
+indexes /api/search queries. The capped tombstones collection that
+records deletions for ?since= syncs is created here as well.
+"""
+
+import os
+import sys
+import time
+import logging
+import argparse
+import threading
+
+from pymongo import MongoClient, IndexModel, ASCENDING, DESCENDING, TEXT
+from pymongo.errors import OperationFailure, CollectionInvalid
+
+from search_index import SEARCH_FIELDS
+
+logger = logging.getLogger("shree_kara")
+
+CONTENT_COLLECTIONS = ["images", "videos", "poems", "music"]
+
+# Sort order of every listing query; see list_content in server.py
+LISTING_SORT = [("uploaded_at", DESCENDING), ("_id", DESCENDING)]
+
+# Deletions kept for ?since= syncs; the oldest are dropped once either limit is reached
+TOMBSTONES = "tombstones"
+TOMBSTONE_MAX_DOCS = int(os.getenv("TOMBSTONE_MAX_DOCS", "10000"))
+TOMBSTONE_MAX_BYTES = int(os.getenv("TOMBSTONE_MAX_BYTES", str(4 * 1024 * 1024)))
+
+# Finished background jobs are kept this long for status lookups, then removed by Mongo
+JOB_RETENTION_SECONDS = int(os.getenv("JOB_RETENTION_SECONDS", str(7 * 24 * 3600)))
+
+
+def text_search_enabled():
+    # Text indexes only back /api/search when it runs on Mongo rather than in memory
+    return os.getenv("SEARCH_BACKEND", "memory") == "mongo"
+
+
+def expected_indexes(text_search=None):
+    if text_search is None:
+        text_search = text_search_enabled()
+    indexes = {
+        collection: [
+            IndexModel([("target", ASCENDING)] + LISTING_SORT, name="target_uploaded_at"),
+            IndexModel(LISTING_SORT, name="uploaded_at"),
+            IndexModel([("uploaded_by", ASCENDING), ("uploaded_at", DESCENDING)], name="uploaded_by_uploaded_at"),
+        ]
+        for collection in CONTENT_COLLECTIONS
+    }
+    if text_search:
+        for collection, weights in SEARCH_FIELDS.items():
+            indexes[collection].append(
+                IndexModel([(field, TEXT) for field in weights], name="text_search", weights=weights)
+            )
+    indexes["Auth"] = [IndexModel([("Username", ASCENDING)], name="username_unique", unique=True)]
+    indexes["upload_sessions"] = [IndexModel([("expires_at", ASCENDING)], name="expires_at")]
+    indexes["jobs"] = [
+        IndexModel([("state", ASCENDING), ("run_at", ASCENDING)], name="state_run_at"),
+        IndexModel([("state", ASCENDING), ("lease_until", ASCENDING)], name="state_lease_until"),
+        IndexModel([("finished_at", ASCENDING)], name="finished_at_ttl", expireAfterSeconds=JOB_RETENTION_SECONDS),
+    ]
+    indexes[TOMBSTONES] = [IndexModel([("collection", ASCENDING), ("deleted_at", ASCENDING)], name="collection_deleted_at")]
+    return indexes
+
+
+def ensure_tombstones(db):
+    """Create the capped tombstones collection unless it already exists."""
+    try:
+        db.create_collection(TOMBSTONES, capped=True, size=TOMBSTONE_MAX_BYTES, max=TOMBSTONE_MAX_DOCS)
+    except CollectionInvalid:
+        if not db[TOMBSTONES].options().get("capped"):
+            logger.warning("%s exists but is not capped; old tombstones will never be dropped", TOMBSTONES)
+
+
+def ensure_indexes(db):
+    """Create any missing indexes; returns the names created per collection."""
+    # Before the indexes, which would otherwise create it as an ordinary collection
+    ensure_tombstones(db)
+    created = {}
+    for collection, models in expected_indexes().items():
+        created[collection] = db[collection].create_indexes(models)
+    return created
+
+
+def missing_indexes(db):
+    """Return ``(collection, index name)`` pairs whose key pattern is absent."""
+    missing = []
+    for collection, models in expected_indexes().items():
+        existing = [list(info["key"]) for info in db[collection].index_information().values()]
+        for model in models:
+            document = model.document
+            key = list(document["key"].items())
+            if TEXT in document["key"].values():
+                # Mongo reports text indexes by their internal _fts key, not the indexed fields
+                if not any(("_fts", TEXT) in existing_key or existing_key == key for existing_key in existing):
+                    missing.append((collection, document["name"]))
+                continue
+            if key not in existing:
+                missing.append((collection, document["name"]))
+    return missing
+
+
+def index_builds_in_progress(client):
+    """Describe createIndexes operations currently running on the server."""
+    try:
+        ops = client.admin.aggregate([
+            {"$currentOp": {"allUsers": True}},
+            {"$match": {"command.createIndexes": {"$exists": True}}},
+        ])
+        builds = []
+        for op in ops:
+            progress = op.get("progress") or {}
+            builds.append({
+                "collection": op["command"]["createIndexes"],
+                "message": op.get("msg", ""),
+                "done": progress.get("done"),
+                "total": progress.get("total"),
+            })
+        return builds
+    except OperationFailure:
+        return []
+
+
+def _plan_stages(plan):
+    yield plan.get("stage")
+    for child in [plan.get("inputStage"), plan.get("queryPlan")] + plan.get("inputStages", []):
+        if child:
+            yield from _plan_stages(child)
+
+
+def find_collection_scans(db, sample_target="shree"):
+    """Explain the API's read queries and report any that scan or sort in memory."""
+    queries = []
+    for collection in CONTENT_COLLECTIONS:
+        queries.append((collection, {}, LISTING_SORT))
+        queries.append((collection, {"target": sample_target}, LISTING_SORT))
+    queries.append(("Auth", {"Username": "probe"}, None))
+
+    problems = []
+    for collection, query, sort in queries:
+        cursor = db[collection].find(query).limit(50)
+        if sort:
+            cursor = cursor.sort(sort)
+        winning_plan = cursor.explain()["queryPlanner"]["winningPlan"]
+        stages = set(_plan_stages(winning_plan))
+        if "COLLSCAN" in stages:
+            problems.append({"collection": collection, "query": query, "issue": "collection scan"})
+        elif "SORT" in stages:
+            problems.append({"collection": collection, "query": query, "issue": "in-memory sort"})
+    return problems
+
+
+def _create_with_progress(client, db):
+    result = {}
+    error = []
+
+    def build():
+        try:
+            result.update(ensure_indexes(db))
+        except Exception as e:
+            error.append(e)
+
+    worker = threading.Thread(target=build)
+    worker.start()
+    while worker.is_alive():
+        worker.join(timeout=1)
+        for op in index_builds_in_progress(client):
+            if op["total"]:
+                print(f"  {op['collection']}: {op['done']}/{op['total']} {op['message']}")
+            else:
+                print(f"  {op['collection']}: {op['message'] or 'building'}")
+
+    if error:
+        raise error[0]
+    for collection, names in result.items():
+        print(f"{collection}: {', '.join(names)}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("command", nargs="?", default="create", choices=["create", "verify", "explain"])
+    parser.add_argument("--mongo-url", default=os.getenv("MONGO_URL", "mongodb://localhost:27017/shree_kara_db"))
+    parser.add_argument("--database", default=os.getenv("DB_NAME", "shree_kara_db"))
+    args = parser.parse_args()
+
+    client = MongoClient(args.mongo_url, serverSelectionTimeoutMS=5000)
+    db = client[args.database]
+
+    if args.command == "create":
+        started = time.monotonic()
+        _create_with_progress(client, db)
+        print(f"Indexes ready in {time.monotonic() - started:.1f}s")
+        return 0
+
+    if args.command == "verify":
+        missing = missing_indexes(db)
+        for collection, name in missing:
+            print(f"missing: {collection}.{name}")
+        print("All indexes present" if not missing else f"{len(missing)} index(es) missing")
+        return 1 if missing else 0
+
+    problems = find_collection_scans(db)
+    for problem in problems:
+        print(f"{problem['collection']} {problem['query']}: {problem['issue']}")
+    print("No collection scans" if not problems else f"{len(problems)} query(ies) not covered by an index")
+    return 1 if problems else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,119 @@
+from datetime import datetime, timedelta
+
+from bson import ObjectId
+from pymongo import ASCENDING, ReturnDocument
+
+
+class LeaseLost(Exception):
+    """The job was reclaimed by another worker after its lease ran out."""
+
+
+class JobQueue:
+    """Background jobs kept in a Mongo collection, so they survive restarts.
+
+    A worker claims a job by taking a lease on it and keeps renewing the
+    lease while it works. If the worker dies, the lease runs out and
+    another worker (in any process sharing the database) claims the job
+    again. A job gets ``max_attempts`` claims in all. Failures are retried
+    after ``retry_seconds``, and the wait doubles on each retry.
+    """
+
+    def __init__(self, collection, lease_seconds=60, max_attempts=3, retry_seconds=30):
+        self.collection = collection
+        self.lease = timedelta(seconds=lease_seconds)
+        self.max_attempts = max_attempts
+        self.retry_seconds = retry_seconds
+
+    def enqueue(self, kind, payload, owner=None):
+        now = datetime.utcnow()
+        job = {
+            "_id": ObjectId(),
+            "kind": kind,
+            "payload": payload,
+            "owner": owner,
+            "state": "queued",
+            "attempts": 0,
+            "run_at": now,
+            "lease_until": None,
+            "worker": None,
+            "result": None,
+            "error": None,
+            "created_at": now,
+            "updated_at": now,
+            "finished_at": None,
+        }
+        self.collection.insert_one(job)
+        return job
+
+    def claim(self, worker):
+        """Lease the next due job to ``worker``; None when there is nothing to do."""
+        while True:
+            now = datetime.utcnow()
+            job = self.collection.find_one_and_update(
+                {"$or": [
+                    {"state": "queued", "run_at": {"$lte": now}},
+                    {"state": "running", "lease_until": {"$lte": now}},
+                ]},
+                {
+                    "$set": {"state": "running", "worker": worker, "lease_until": now + self.lease, "updated_at": now},
+                    "$inc": {"attempts": 1},
+                },
+                sort=[("run_at", ASCENDING)],
+                return_document=ReturnDocument.AFTER,
+            )
+            if job is None or job["attempts"] <= self.max_attempts:
+                return job
+            # Every attempt ended with the worker's lease running out; stop retrying
+            self._finish(job["_id"], worker, "failed", error="Worker lease expired")
+
+    def renew(self, job_id, worker):
+        """Extend the lease; False when the job is no longer this worker's."""
+        now = datetime.utcnow()
+        result = self.collection.update_one(
+            {"_id": job_id, "state": "running", "worker": worker},
+            {"$set": {"lease_until": now + self.lease, "updated_at": now}},
+        )
+        return result.matched_count == 1
+
+    def complete(self, job_id, worker, result):
+        return self._finish(job_id, worker, "done", result=result)
+
+    def fail(self, job, worker, error, retry=True):
+        """Requeue a failed job with backoff, or mark it failed once out of attempts (or ``retry`` is False)."""
+        if not retry or job["attempts"] >= self.max_attempts:
+            return self._finish(job["_id"], worker, "failed", error=error)
+        now = datetime.utcnow()
+        delay = self.retry_seconds * 2 ** (job["attempts"] - 1)
+        result = self.collection.update_one(
+            {"_id": job["_id"], "state": "running", "worker": worker},
+            {"$set": {
+                "state": "queued",
+                "run_at": now + timedelta(seconds=delay),
+                "lease_until": None,
+                "worker": None,
+                "error": error,
+                "updated_at": now,
+            }},
+        )
+        return result.matched_count == 1
+
+    def get(self, job_id, owner=None):
+        query = {"_id": job_id}
+        if owner is not None:
+            query["owner"] = owner
+        return self.collection.find_one(query)
+
+    def _finish(self, job_id, worker, state, result=None, error=None):
+        now = datetime.utcnow()
+        outcome = self.collection.update_one(
+            {"_id": job_id, "state": "running", "worker": worker},
+            {"$set": {
+                "state": state,
+                "result": result,
+                "error": error,
+                "lease_until": None,
+                "updated_at": now,
+                "finished_at": now,
+            }},
+        )
+        return outcome.matched_count == 1
@@ -0,0 +1,228 @@
+import os
+import secrets
+from datetime import timezone
+from email.utils import formatdate, parsedate_to_datetime
+
+import anyio
+from starlette.responses import Response
+
+from response_cache import etag_matches
+
+# Read size when the server offers no zero-copy extension
+CHUNK_SIZE = 256 * 1024
+
+# More ranges than this in one request are ignored and the whole file is sent
+MAX_RANGES = 16
+
+
+class RangeNotSatisfiable(Exception):
+    pass
+
+
+def parse_range(header, size):
+    """Parse a ``Range`` header into merged, inclusive ``(start, end)`` byte ranges.
+
+    Returns None when the header should be ignored (absent, another unit,
+    malformed or too many ranges), as RFC 9110 allows. Raises
+    RangeNotSatisfiable when no range overlaps a file of ``size`` bytes.
+    """
+    if not header:
+        return None
+    unit, _, spec = header.partition("=")
+    if unit.strip().lower() != "bytes" or not spec.strip():
+        return None
+
+    ranges = []
+    for part in spec.split(","):
+        part = part.strip()
+        if not part:
+            continue
+        first, dash, last = part.partition("-")
+        if not dash:
+            return None
+        try:
+            if first == "":
+                suffix_length = int(last)
+                if suffix_length <= 0 or size == 0:
+                    continue
+                ranges.append((max(0, size - suffix_length), size - 1))
+                continue
+            start = int(first)
+            end = int(last) if last else None
+        except ValueError:
+            return None
+        if start < 0 or (end is not None and start > end):
+            return None
+        if start >= size:
+            continue
+        ranges.append((start, size - 1 if end is None else min(end, size - 1)))
+
+    if not ranges:
+        raise RangeNotSatisfiable()
+
+    ranges.sort()
+    merged = [ranges[0]]
+    for start, end in ranges[1:]:
+        last_start, last_end = merged[-1]
+        if start <= last_end + 1:
+            merged[-1] = (last_start, max(last_end, end))
+        else:
+            merged.append((start, end))
+    if len(merged) > MAX_RANGES:
+        return None
+    return merged
+
+
+def _not_modified_since(if_modified_since, mtime):
+    try:
+        since = parsedate_to_datetime(if_modified_since)
+    except (TypeError, ValueError):
+        return False
+    if since.tzinfo is None:
+        since = since.replace(tzinfo=timezone.utc)
+    return int(mtime) <= since.timestamp()
+
+
+def _if_range_allows(if_range, etag, last_modified):
+    if not if_range:
+        return True
+    if_range = if_range.strip()
+    if if_range.startswith('"') or if_range.startswith("W/"):
+        # If-Range requires a strong comparison
+        return if_range == etag
+    return if_range == last_modified
+
+
+async def media_response(request, path, media_type, etag, cache_control="no-cache", stat=None, headers=None):
+    """Serve a file with conditional GET and (multi-)range support.
+
+    Handles If-None-Match / If-Modified-Since (304), Range and If-Range
+    (206, multipart/byteranges for several ranges) and unsatisfiable
+    ranges (416). ``etag`` must be a strong, quoted entity tag. Pass
+    ``stat`` when it is already known to skip the ``os.stat`` call, and
+    ``headers`` for extra response headers such as Content-Encoding.
+    """
+    if stat is None:
+        stat = await anyio.to_thread.run_sync(os.stat, path)
+    size = stat.st_size
+    last_modified = formatdate(stat.st_mtime, usegmt=True)
+    headers = {
+        **(headers or {}),
+        "Accept-Ranges": "bytes",
+        "ETag": etag,
+        "Last-Modified": last_modified,
+        "Cache-Control": cache_control,
+    }
+
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match is not None:
+        if etag_matches(if_none_match, etag):
+            return Response(status_code=304, headers=headers)
+    elif _not_modified_since(request.headers.get("if-modified-since"), stat.st_mtime):
+        return Response(status_code=304, headers=headers)
+
+    ranges = None
+    if _if_range_allows(request.headers.get("if-range"), etag, last_modified):
+        try:
+            ranges = parse_range(request.headers.get("range"), size)
+        except RangeNotSatisfiable:
+            headers["Content-Range"] = f"bytes */{size}"
+            return Response(status_code=416, headers=headers)
+
+    return FileRangeResponse(path, size, media_type, ranges, headers, request.method == "HEAD")
+
+
+class FileRangeResponse(Response):
+    """Streams a whole file or byte ranges of it.
+
+    Uses the ASGI zero-copy send extension when the server offers it (or
+    path send for whole files), otherwise reads bounded chunks off the
+    event loop.
+    """
+
+    def __init__(self, path, size, media_type, ranges, headers, head_only=False):
+        self.path = path
+        self.size = size
+        self.ranges = ranges
+        self.head_only = head_only
+        self.background = None
+        self.parts = []  # (preamble bytes, start, end) per range for multipart bodies
+
+        headers = dict(headers)
+        if ranges is None:
+            self.status_code = 200
+            content_length = size
+            headers["Content-Type"] = media_type
+        elif len(ranges) == 1:
+            self.status_code = 206
+            start, end = ranges[0]
+            content_length = end - start + 1
+            headers["Content-Type"] = media_type
+            headers["Content-Range"] = f"bytes {start}-{end}/{size}"
+        else:
+            self.status_code = 206
+            boundary = secrets.token_hex(16)
+            for index, (start, end) in enumerate(ranges):
+                preamble = (
+                    ("\r\n" if index else "")
+                    + f"--{boundary}\r\nContent-Type: {media_type}\r\n"
+                    + f"Content-Range: bytes {start}-{end}/{size}\r\n\r\n"
+                ).encode("latin-1")
+                self.parts.append((preamble, start, end))
+            self.epilogue = f"\r\n--{boundary}--\r\n".encode("latin-1")
+            content_length = sum(len(p) + end - start + 1 for p, start, end in self.parts) + len(self.epilogue)
+            headers["Content-Type"] = f"multipart/byteranges; boundary={boundary}"
+
+        headers["Content-Length"] = str(content_length)
+        self.raw_headers = [(key.lower().encode("latin-1"), value.encode("latin-1")) for key, value in headers.items()]
+
+    async def __call__(self, scope, receive, send):
+        await send({"type": "http.response.start", "status": self.status_code, "headers": self.raw_headers})
+        if self.head_only:
+            await send({"type": "http.response.body", "body": b"", "more_body": False})
+            return
+
+        extensions = scope.get("extensions") or {}
+        if self.ranges is None and "http.response.pathsend" in extensions:
+            await send({"type": "http.response.pathsend", "path": self.path})
+            return
+
+        zero_copy = "http.response.zerocopysend" in extensions
+        async with await anyio.open_file(self.path, "rb") as file:
+            if self.ranges is None:
+                await self._send_span(send, file, 0, self.size - 1, zero_copy, last=True)
+            elif not self.parts:
+                start, end = self.ranges[0]
+                await self._send_span(send, file, start, end, zero_copy, last=True)
+            else:
+                for preamble, start, end in self.parts:
+                    await send({"type": "http.response.body", "body": preamble, "more_body": True})
+                    await self._send_span(send, file, start, end, zero_copy, last=False)
+                await send({"type": "http.response.body", "body": self.epilogue, "more_body": False})
+
+    async def _send_span(self, send, file, start, end, zero_copy, last):
+        count = end - start + 1
+        if count <= 0:
+            if last:
+                await send({"type": "http.response.body", "body": b"", "more_body": False})
+            return
+        if zero_copy:
+            await send({
+                "type": "http.response.zerocopysend",
+                "file": file.wrapped,
+                "offset": start,
+                "count": count,
+                "more_body": not last,
+            })
+            return
+
+        await file.seek(start)
+        remaining = count
+        while remaining > 0:
+            chunk = await file.read(min(CHUNK_SIZE, remaining))
+            if not chunk:
+                break
+            remaining -= len(chunk)
+            await send({"type": "http.response.body", "body": chunk, "more_body": remaining > 0 or not last})
+        if remaining > 0 and last:
+            await send({"type": "http.response.body", "body": b"", "more_body": False})
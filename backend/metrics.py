@@ -0,0 +1,177 @@
+import time
+import bisect
+import threading
+
+from pymongo import monitoring
+
+LATENCY_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+SIZE_BUCKETS = (256, 1024, 4096, 16384, 65536, 262144, 1048576, 4194304, 16777216, 67108864)
+
+
+def _escape(value):
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _labels(names, values, extra=""):
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+class Histogram:
+    """Cumulative-bucket histogram per label set, rendered in Prometheus text format."""
+
+    def __init__(self, name, help, label_names, buckets):
+        self.name = name
+        self.help = help
+        self.label_names = label_names
+        self.buckets = buckets
+        self._series = {}  # label values -> [bucket counts..., +Inf count, sum]
+        self._lock = threading.Lock()
+
+    def observe(self, label_values, value):
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._series.get(label_values)
+            if series is None:
+                series = self._series[label_values] = [0] * (len(self.buckets) + 1) + [0.0]
+            series[index] += 1
+            series[-1] += value
+
+    def render(self):
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} histogram"]
+        with self._lock:
+            series = {labels: list(values) for labels, values in self._series.items()}
+        for label_values, values in sorted(series.items()):
+            cumulative = 0
+            for bound, count in zip(self.buckets + ("+Inf",), values):
+                cumulative += count
+                le = f'le="{bound}"'
+                lines.append(f"{self.name}_bucket{_labels(self.label_names, label_values, le)} {cumulative}")
+            lines.append(f"{self.name}_sum{_labels(self.label_names, label_values)} {values[-1]}")
+            lines.append(f"{self.name}_count{_labels(self.label_names, label_values)} {cumulative}")
+        return lines
+
+
+class Gauge:
+    def __init__(self, name, help):
+        self.name = name
+        self.help = help
+        self.value = 0
+
+    def render(self):
+        return [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} gauge", f"{self.name} {self.value}"]
+
+
+class Metrics:
+    """Request, payload and Mongo command metrics for /api/metrics.
+
+    HTTP series are labelled by route template rather than raw path so the
+    number of series stays bounded. Everything is kept in this process;
+    with several workers each reports its own numbers.
+    """
+
+    def __init__(self):
+        self.request_duration = Histogram(
+            "http_request_duration_seconds", "Time from request start to the last response byte.",
+            ("method", "route", "status"), LATENCY_BUCKETS,
+        )
+        self.request_size = Histogram(
+            "http_request_size_bytes", "Request body size.", ("method", "route"), SIZE_BUCKETS,
+        )
+        self.response_size = Histogram(
+            "http_response_size_bytes", "Response body size.", ("method", "route"), SIZE_BUCKETS,
+        )
+        self.in_flight = Gauge("http_requests_in_flight", "Requests currently being served.")
+        self.mongo_duration = Histogram(
+            "mongodb_command_duration_seconds", "Mongo command round trip as seen by pymongo.",
+            ("command", "outcome"), LATENCY_BUCKETS,
+        )
+        self._collectors = []  # (name, help, label name, callable returning {label: value})
+
+    def add_gauges(self, name, help, label_name, collect):
+        """Export the dict returned by ``collect()`` as gauge ``name`` labelled by ``label_name``."""
+        self._collectors.append((name, help, label_name, collect))
+
+    def command_listener(self):
+        return MongoCommandListener(self.mongo_duration)
+
+    def render(self):
+        lines = []
+        for metric in (self.request_duration, self.request_size, self.response_size, self.in_flight, self.mongo_duration):
+            lines += metric.render()
+        for name, help, label_name, collect in self._collectors:
+            lines += [f"# HELP {name} {help}", f"# TYPE {name} gauge"]
+            for label, value in sorted(collect().items()):
+                if isinstance(value, (int, float)) and not isinstance(value, bool):
+                    lines.append(f"{name}{_labels((label_name,), (label,))} {value}")
+        return "\n".join(lines) + "\n"
+
+
+class MongoCommandListener(monitoring.CommandListener):
+    """Feeds pymongo command durations into a histogram; runs on the calling thread."""
+
+    def __init__(self, histogram):
+        self.histogram = histogram
+
+    def started(self, event):
+        pass
+
+    def succeeded(self, event):
+        self.histogram.observe((event.command_name, "success"), event.duration_micros / 1e6)
+
+    def failed(self, event):
+        self.histogram.observe((event.command_name, "failure"), event.duration_micros / 1e6)
+
+
+class MetricsMiddleware:
+    """ASGI middleware timing each HTTP request and counting body bytes both ways.
+
+    Plain ASGI rather than BaseHTTPMiddleware so streamed and file
+    responses pass through untouched; the per-request cost is a couple of
+    clock reads and histogram updates.
+    """
+
+    def __init__(self, app, metrics):
+        self.app = app
+        self.metrics = metrics
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        metrics = self.metrics
+        started = time.perf_counter()
+        status = 500
+        request_bytes = 0
+        response_bytes = 0
+
+        async def counting_receive():
+            nonlocal request_bytes
+            message = await receive()
+            if message["type"] == "http.request":
+                request_bytes += len(message.get("body", b""))
+            return message
+
+        async def counting_send(message):
+            nonlocal status, response_bytes
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            elif message["type"] == "http.response.body":
+                response_bytes += len(message.get("body", b""))
+            elif message["type"] == "http.response.zerocopysend":
+                response_bytes += message.get("count") or 0
+            await send(message)
+
+        metrics.in_flight.value += 1
+        try:
+            await self.app(scope, counting_receive, counting_send)
+        finally:
+            metrics.in_flight.value -= 1
+            route = getattr(scope.get("route"), "path", None) or "unmatched"
+            method = scope["method"]
+            metrics.request_duration.observe((method, route, str(status)), time.perf_counter() - started)
+            metrics.request_size.observe((method, route), request_bytes)
+            metrics.response_size.observe((method, route), response_bytes)
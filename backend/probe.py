@@ -0,0 +1,231 @@
+import json
+import os
+import shutil
+import struct
+import subprocess
+
+from PIL import Image, UnidentifiedImageError
+
+# Used for audio and video when installed; the built-in parsers cover MP4/MOV, WAV and MP3
+FFPROBE = shutil.which("ffprobe")
+FFPROBE_TIMEOUT_SECONDS = 60
+
+# Bytes read to identify a file
+SNIFF_SIZE = 64
+
+# MPEG audio bitrates in kbit/s by bitrate index, for MPEG-1 and MPEG-2/2.5 Layer III
+MP3_BITRATES = {
+    1: [0, 32, 40, 48, 56, 64, 80, 96, 112, 128, 160, 192, 224, 256, 320],
+    2: [0, 8, 16, 24, 32, 40, 48, 56, 64, 80, 96, 112, 128, 144, 160],
+}
+MP3_SAMPLE_RATES = {1: [44100, 48000, 32000], 2: [22050, 24000, 16000], 2.5: [11025, 12000, 8000]}
+
+# EXIF orientations that rotate the image by 90 degrees
+ROTATED_ORIENTATIONS = {5, 6, 7, 8}
+
+
+def sniff_content_type(header):
+    """Identify a file's MIME type from its first bytes; None when unrecognised."""
+    if header.startswith(b"\xff\xd8\xff"):
+        return "image/jpeg"
+    if header.startswith(b"\x89PNG\r\n\x1a\n"):
+        return "image/png"
+    if header[:6] in (b"GIF87a", b"GIF89a"):
+        return "image/gif"
+    if header.startswith(b"RIFF") and header[8:12] == b"WEBP":
+        return "image/webp"
+    if header.startswith(b"RIFF") and header[8:12] == b"WAVE":
+        return "audio/wav"
+    if header.startswith(b"RIFF") and header[8:12] == b"AVI ":
+        return "video/x-msvideo"
+    if header[4:8] == b"ftyp":
+        brand = header[8:12]
+        if brand == b"qt  ":
+            return "video/quicktime"
+        if brand in (b"M4A ", b"M4B "):
+            return "audio/mp4"
+        if brand in (b"heic", b"heix", b"mif1"):
+            return "image/heic"
+        return "video/mp4"
+    if header.startswith(b"\x1a\x45\xdf\xa3"):
+        return "video/webm" if b"webm" in header else "video/x-matroska"
+    if header.startswith(b"OggS"):
+        return "audio/ogg"
+    if header.startswith(b"fLaC"):
+        return "audio/flac"
+    if header.startswith(b"ID3"):
+        return "audio/mpeg"
+    if len(header) >= 2 and header[0] == 0xFF and header[1] & 0xE0 == 0xE0:
+        # Frame sync; layer bits 00 mark AAC in an ADTS stream
+        return "audio/aac" if header[1] & 0x06 == 0 else "audio/mpeg"
+    if header.startswith(b"BM"):
+        return "image/bmp"
+    if header[:4] in (b"II*\x00", b"MM\x00*"):
+        return "image/tiff"
+    return None
+
+
+def probe_media(path):
+    """Inspect a stored upload and describe what it really is.
+
+    Runs in a worker process, so it only takes and returns plain data.
+    Returns ``{content_type, width, height, duration, bitrate}``; fields
+    that don't apply or can't be determined are None. Duration is in
+    seconds and bitrate in bits per second.
+    """
+    size = os.path.getsize(path)
+    with open(path, "rb") as f:
+        header = f.read(SNIFF_SIZE)
+    result = {
+        "content_type": sniff_content_type(header),
+        "width": None,
+        "height": None,
+        "duration": None,
+        "bitrate": None,
+    }
+
+    content_type = result["content_type"] or ""
+    if not content_type or content_type.startswith("image/"):
+        _probe_image(path, result)
+    elif FFPROBE:
+        _probe_ffprobe(path, result)
+    elif content_type in ("video/mp4", "video/quicktime", "audio/mp4"):
+        _probe_mp4(path, result)
+    elif content_type == "audio/wav":
+        _probe_wav(path, result)
+    elif content_type == "audio/mpeg":
+        _probe_mp3(path, size, result)
+
+    if result["duration"]:
+        result["duration"] = round(result["duration"], 3)
+        if result["bitrate"] is None:
+            result["bitrate"] = round(size * 8 / result["duration"])
+    return result
+
+
+def _probe_image(path, result):
+    try:
+        with Image.open(path) as image:
+            width, height = image.size
+            if image.getexif().get(0x0112) in ROTATED_ORIENTATIONS:
+                width, height = height, width
+            result.update(content_type=Image.MIME.get(image.format, result["content_type"]), width=width, height=height)
+    except (UnidentifiedImageError, OSError):
+        pass
+
+
+def _probe_ffprobe(path, result):
+    try:
+        completed = subprocess.run(
+            [FFPROBE, "-v", "error", "-print_format", "json", "-show_format", "-show_streams", path],
+            capture_output=True, check=True, timeout=FFPROBE_TIMEOUT_SECONDS,
+        )
+        info = json.loads(completed.stdout)
+    except (subprocess.SubprocessError, ValueError):
+        return
+    fmt = info.get("format", {})
+    if fmt.get("duration"):
+        result["duration"] = float(fmt["duration"])
+    if fmt.get("bit_rate"):
+        result["bitrate"] = int(fmt["bit_rate"])
+    for stream in info.get("streams", []):
+        if stream.get("codec_type") == "video" and stream.get("width"):
+            result.update(width=stream["width"], height=stream["height"])
+            break
+
+
+def _iter_boxes(f, start, end):
+    # (type, payload offset, payload end) of each ISO BMFF box in [start, end)
+    offset = start
+    while offset + 8 <= end:
+        f.seek(offset)
+        size, kind = struct.unpack(">I4s", f.read(8))
+        header = 8
+        if size == 1:
+            size = struct.unpack(">Q", f.read(8))[0]
+            header = 16
+        elif size == 0:
+            size = end - offset
+        if size < header:
+            return
+        yield kind, offset + header, min(offset + size, end)
+        offset += size
+
+
+def _probe_mp4(path, result):
+    with open(path, "rb") as f:
+        end = f.seek(0, os.SEEK_END)
+        for kind, start, stop in _iter_boxes(f, 0, end):
+            if kind != b"moov":
+                continue
+            for child, child_start, child_stop in _iter_boxes(f, start, stop):
+                if child == b"mvhd":
+                    f.seek(child_start)
+                    version = f.read(4)[0]
+                    if version == 1:
+                        timescale, duration = struct.unpack(">16xIQ", f.read(28))
+                    else:
+                        timescale, duration = struct.unpack(">8xII", f.read(16))
+                    if timescale:
+                        result["duration"] = duration / timescale
+                elif child == b"trak" and result["width"] is None:
+                    for box, box_start, box_stop in _iter_boxes(f, child_start, child_stop):
+                        if box == b"tkhd" and box_stop - box_start >= 84:
+                            # Width and height are 16.16 fixed point at the end of the box
+                            f.seek(box_stop - 8)
+                            width, height = struct.unpack(">II", f.read(8))
+                            if width and height:
+                                result.update(width=width >> 16, height=height >> 16)
+            return
+
+
+def _probe_wav(path, result):
+    with open(path, "rb") as f:
+        f.seek(12)
+        byte_rate = None
+        while True:
+            chunk = f.read(8)
+            if len(chunk) < 8:
+                return
+            kind, size = struct.unpack("<4sI", chunk)
+            if kind == b"fmt ":
+                byte_rate = struct.unpack("<8xI", f.read(12))[0]
+                f.seek(size - 12 + (size & 1), os.SEEK_CUR)
+            elif kind == b"data":
+                if byte_rate:
+                    result.update(duration=size / byte_rate, bitrate=byte_rate * 8)
+                return
+            else:
+                f.seek(size + (size & 1), os.SEEK_CUR)
+
+
+def _probe_mp3(path, size, result):
+    with open(path, "rb") as f:
+        start = 0
+        header = f.read(10)
+        if header.startswith(b"ID3") and len(header) == 10:
+            # Tag size is a 28-bit syncsafe integer, plus a footer when flagged
+            tag_size = (header[6] << 21) | (header[7] << 14) | (header[8] << 7) | header[9]
+            start = 10 + tag_size + (10 if header[5] & 0x10 else 0)
+        f.seek(start)
+        frame = f.read(4 + 32 + 12)
+    if len(frame) < 4 or frame[0] != 0xFF or frame[1] & 0xE0 != 0xE0 or frame[1] & 0x06 != 0x02:
+        return
+    version = {3: 1, 2: 2, 0: 2.5}.get((frame[1] >> 3) & 0x03)
+    bitrate_index = frame[2] >> 4
+    rate_index = (frame[2] >> 2) & 0x03
+    if version is None or bitrate_index in (0, 15) or rate_index == 3:
+        return
+    sample_rate = MP3_SAMPLE_RATES[version][rate_index]
+    kbps = MP3_BITRATES[1 if version == 1 else 2][bitrate_index]
+
+    # A Xing/Info header in the first frame holds the frame count of VBR files
+    mono = frame[3] >> 6 == 3
+    side_info = (17 if mono else 32) if version == 1 else (9 if mono else 17)
+    xing = frame[4 + side_info:4 + side_info + 12]
+    samples_per_frame = 1152 if version == 1 else 576
+    if xing[:4] in (b"Xing", b"Info") and struct.unpack(">I", xing[4:8])[0] & 0x01:
+        frames = struct.unpack(">I", xing[8:12])[0]
+        result["duration"] = frames * samples_per_frame / sample_rate
+        return
+    result.update(duration=(size - start) * 8 / (kbps * 1000), bitrate=kbps * 1000)
@@ -0,0 +1,168 @@
+import os
+import re
+import sys
+import hmac
+import time
+import uuid
+import cProfile
+import threading
+from collections import Counter
+from urllib.parse import parse_qs
+
+import anyio
+
+# Top frames of threads that are waiting rather than working; such samples are dropped
+IDLE_FRAMES = {
+    ("selectors.py", "select"),
+    ("thread.py", "_worker"),
+    ("threading.py", "wait"),
+    ("queue.py", "get"),
+}
+
+
+class StackSampler:
+    """Samples the Python stacks of every busy thread at a fixed interval.
+
+    Covers the event loop and the thread pools Mongo and file work run on,
+    which cProfile (one thread only) cannot see. Produces collapsed stacks,
+    one ``thread;outer;...;inner count`` line per distinct stack, as read by
+    flamegraph.pl, speedscope and inferno.
+    """
+
+    def __init__(self, interval=0.001, loop_thread_id=None):
+        self.interval = interval
+        self.loop_thread_id = loop_thread_id
+        self.samples = Counter()
+        self.sample_count = 0
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="stack-sampler", daemon=True)
+
+    def start(self):
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        self._thread.join()
+
+    def _run(self):
+        own_id = threading.get_ident()
+        names = {}
+        while not self._stop.wait(self.interval):
+            self.sample_count += 1
+            for thread_id, frame in sys._current_frames().items():
+                if thread_id == own_id:
+                    continue
+                code = frame.f_code
+                if (os.path.basename(code.co_filename), code.co_name) in IDLE_FRAMES:
+                    continue
+                stack = []
+                while frame is not None:
+                    code = frame.f_code
+                    stack.append(f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})")
+                    frame = frame.f_back
+                if thread_id not in names:
+                    names = {thread.ident: thread.name for thread in threading.enumerate()}
+                label = "event-loop" if thread_id == self.loop_thread_id else names.get(thread_id, str(thread_id))
+                stack.append(label)
+                self.samples[";".join(reversed(stack))] += 1
+
+    def write_folded(self, path):
+        with open(path, "w") as f:
+            for stack, count in self.samples.most_common():
+                f.write(f"{stack} {count}\n")
+
+
+class ProfilingMiddleware:
+    """Profiles single requests that carry the profiling token.
+
+    A request is profiled when it sends ``X-Profile: <token>`` or
+    ``?profile=<token>``; ``X-Profile-Mode: cprofile`` switches from stack
+    sampling (a ``.folded`` file) to cProfile (a ``.prof`` pstats file).
+    The file is written to ``output_dir`` after the response completes and
+    its name returned in the ``X-Profile-File`` header. Samples cover every
+    thread, so requests running concurrently show up as well.
+
+    One request is profiled at a time: cProfile hooks the whole event loop
+    thread, so overlapping profiles would each record the other's calls.
+    A profiling request that arrives while another runs gets 409.
+
+    Only install this when a token is configured; without it the app runs
+    with no profiling code on the request path at all.
+    """
+
+    def __init__(self, app, token, output_dir, interval=0.001):
+        self.app = app
+        self.token = token.encode()
+        self.output_dir = output_dir
+        self.interval = interval
+        self._busy = False
+
+    def _requested(self, scope):
+        mode = b"sample"
+        supplied = None
+        for name, value in scope["headers"]:
+            if name == b"x-profile":
+                supplied = value
+            elif name == b"x-profile-mode":
+                mode = value
+        if supplied is None and b"profile=" in scope.get("query_string", b""):
+            values = parse_qs(scope["query_string"].decode("latin-1")).get("profile")
+            supplied = values[0].encode() if values else None
+        if supplied is None or not hmac.compare_digest(supplied, self.token):
+            return None
+        return "cprofile" if mode == b"cprofile" else "sample"
+
+    async def __call__(self, scope, receive, send):
+        mode = self._requested(scope) if scope["type"] == "http" else None
+        if mode is None:
+            await self.app(scope, receive, send)
+            return
+
+        if self._busy:
+            await send({
+                "type": "http.response.start",
+                "status": 409,
+                "headers": [(b"content-type", b"text/plain; charset=utf-8")],
+            })
+            await send({"type": "http.response.body", "body": b"Another request is being profiled"})
+            return
+        self._busy = True
+        try:
+            await self._profile(scope, receive, send, mode)
+        finally:
+            self._busy = False
+
+    async def _profile(self, scope, receive, send, mode):
+        slug = re.sub(r"[^A-Za-z0-9]+", "_", scope["path"]).strip("_")[:60] or "root"
+        name = f"{time.strftime('%Y%m%d-%H%M%S')}-{scope['method']}-{slug}-{uuid.uuid4().hex[:6]}"
+        name += ".prof" if mode == "cprofile" else ".folded"
+
+        async def tagged_send(message):
+            if message["type"] == "http.response.start":
+                message = {**message, "headers": list(message.get("headers", [])) + [(b"x-profile-file", name.encode())]}
+            await send(message)
+
+        profiler = None
+        sampler = None
+        if mode == "cprofile":
+            profiler = cProfile.Profile()
+            profiler.enable()
+        else:
+            sampler = StackSampler(self.interval, loop_thread_id=threading.get_ident())
+            sampler.start()
+        try:
+            await self.app(scope, receive, tagged_send)
+        finally:
+            if profiler is not None:
+                profiler.disable()
+            else:
+                sampler.stop()
+            await anyio.to_thread.run_sync(self._write, profiler or sampler, name)
+
+    def _write(self, recorder, name):
+        os.makedirs(self.output_dir, exist_ok=True)
+        path = os.path.join(self.output_dir, name)
+        if isinstance(recorder, StackSampler):
+            recorder.write_folded(path)
+        else:
+            recorder.dump_stats(path)
@@ -0,0 +1,54 @@
+import os
+
+from PIL import Image, ImageOps
+
+# Encoder settings per output format: (file extension, MIME type, save options)
+FORMATS = {
+    "webp": ("webp", "image/webp", {"quality": 80, "method": 4}),
+    "jpeg": ("jpg", "image/jpeg", {"quality": 82, "optimize": True, "progressive": True}),
+}
+
+CONTENT_TYPES = {extension: content_type for extension, content_type, _ in FORMATS.values()}
+
+
+def render_renditions(source_path, dest_dir, widths, formats=("webp", "jpeg")):
+    """Write width-bounded copies of an image into ``dest_dir``.
+
+    One rendition per width narrower than the original (or a single one at
+    the original width for small images), in each of ``formats``. Runs in
+    a worker process, so it only takes and returns plain data. Returns a
+    list of ``{name, width, height, content_type, size}`` dicts.
+    """
+    with Image.open(source_path) as original:
+        os.makedirs(dest_dir, exist_ok=True)
+        image = ImageOps.exif_transpose(original)
+        if image.mode not in ("RGB", "RGBA"):
+            image = image.convert("RGBA" if image.mode == "LA" or "transparency" in image.info else "RGB")
+
+        bounds = sorted(width for width in widths if width < image.width) or [image.width]
+        renditions = []
+        for width in bounds:
+            height = max(1, round(image.height * width / image.width))
+            resized = image if width == image.width else image.resize((width, height), Image.LANCZOS)
+            for format_name in formats:
+                extension, content_type, options = FORMATS[format_name]
+                frame = resized
+                if format_name == "jpeg" and frame.mode == "RGBA":
+                    # JPEG has no alpha channel; flatten onto white
+                    background = Image.new("RGB", frame.size, (255, 255, 255))
+                    background.paste(frame, mask=frame.split()[3])
+                    frame = background
+
+                name = f"{width}.{extension}"
+                path = os.path.join(dest_dir, name)
+                tmp_path = path + ".tmp"
+                frame.save(tmp_path, format=format_name.upper(), **options)
+                os.replace(tmp_path, path)
+                renditions.append({
+                    "name": name,
+                    "width": width,
+                    "height": height,
+                    "content_type": content_type,
+                    "size": os.path.getsize(path),
+                })
+        return renditions
@@ -0,0 +1,110 @@
+import asyncio
+import functools
+import itertools
+from concurrent.futures import ThreadPoolExecutor
+
+
+class Repository:
+    """Async access to a pymongo database.
+
+    pymongo is synchronous, so every call is handed to a bounded thread
+    pool and awaited; a slow query or large insert then only occupies one
+    pool thread instead of the event loop. ``max_workers=0`` runs calls
+    inline on the loop, which is only meant for tooling and benchmarks.
+    """
+
+    def __init__(self, db, max_workers=16):
+        self.db = db
+        self.max_workers = max_workers
+        self._executor = None
+        if max_workers > 0:
+            self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="mongo")
+
+    def __getattr__(self, name):
+        if name.startswith("_"):
+            raise AttributeError(name)
+        return self[name]
+
+    def __getitem__(self, name):
+        return AsyncCollection(self.db[name], self)
+
+    async def run(self, fn, *args, **kwargs):
+        """Run a blocking callable (pymongo, disk I/O) off the event loop."""
+        if self._executor is None:
+            return fn(*args, **kwargs)
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._executor, functools.partial(fn, *args, **kwargs))
+
+    def close(self):
+        if self._executor is not None:
+            self._executor.shutdown(wait=False)
+
+
+class AsyncCollection:
+    """Awaitable wrappers for the pymongo collection methods the app uses."""
+
+    def __init__(self, collection, repository):
+        self.collection = collection
+        self.repository = repository
+
+    async def find(self, filter=None, projection=None, sort=None, limit=0):
+        """Run a query and return all matching documents as a list."""
+        def query():
+            cursor = self.collection.find(filter, projection)
+            if sort:
+                cursor = cursor.sort(sort)
+            if limit:
+                cursor = cursor.limit(limit)
+            return list(cursor)
+        return await self.repository.run(query)
+
+    async def iterate(self, filter=None, projection=None, sort=None, limit=0, batch_size=100):
+        """Yield matching documents, fetching ``batch_size`` at a time off the event loop.
+
+        Unlike ``find`` only one batch is held in memory, so callers can
+        stream results of any size.
+        """
+        cursor = self.collection.find(filter, projection, batch_size=batch_size)
+        if sort:
+            cursor = cursor.sort(sort)
+        if limit:
+            cursor = cursor.limit(limit)
+        try:
+            while True:
+                batch = await self.repository.run(lambda: list(itertools.islice(cursor, batch_size)))
+                for doc in batch:
+                    yield doc
+                if len(batch) < batch_size:
+                    return
+        finally:
+            cursor.close()
+
+    async def find_one(self, *args, **kwargs):
+        return await self.repository.run(self.collection.find_one, *args, **kwargs)
+
+    async def insert_one(self, *args, **kwargs):
+        return await self.repository.run(self.collection.insert_one, *args, **kwargs)
+
+    async def insert_many(self, *args, **kwargs):
+        return await self.repository.run(self.collection.insert_many, *args, **kwargs)
+
+    async def update_one(self, *args, **kwargs):
+        return await self.repository.run(self.collection.update_one, *args, **kwargs)
+
+    async def delete_one(self, *args, **kwargs):
+        return await self.repository.run(self.collection.delete_one, *args, **kwargs)
+
+    async def delete_many(self, *args, **kwargs):
+        return await self.repository.run(self.collection.delete_many, *args, **kwargs)
+
+    async def find_one_and_delete(self, *args, **kwargs):
+        return await self.repository.run(self.collection.find_one_and_delete, *args, **kwargs)
+
+    async def find_one_and_update(self, *args, **kwargs):
+        return await self.repository.run(self.collection.find_one_and_update, *args, **kwargs)
+
+    async def count_documents(self, *args, **kwargs):
+        return await self.repository.run(self.collection.count_documents, *args, **kwargs)
+
+    async def estimated_document_count(self, *args, **kwargs):
+        return await self.repository.run(self.collection.estimated_document_count, *args, **kwargs)
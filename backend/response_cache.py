@@ -0,0 +1,103 @@
+import hashlib
+import secrets
+import time
+from collections import OrderedDict, defaultdict
+
+
+class ResponseCache:
+    """Rendered listing responses keyed by strong ETags.
+
+    ETags are derived from per-(collection, target) version counters that
+    the upload and delete handlers bump, so computing one never touches
+    Mongo and a write changes every ETag that covers it. Bodies for stale
+    ETags are simply never asked for again and age out of the LRU, which
+    is bounded by total body size.
+
+    Counters live in this process; the random epoch keeps ETags issued
+    before a restart from matching afterwards. Writes made by other
+    processes only reach the counters if something calls ``bump`` or
+    ``bump_collection`` for them, such as a change stream. Without that,
+    set ``max_age`` (seconds): ETags then also change every ``max_age``
+    seconds, which bounds how long another process's write can go unseen.
+    """
+
+    def __init__(self, max_bytes=32 * 1024 * 1024, max_age=None):
+        self.max_bytes = max_bytes
+        self.max_age = max_age
+        self.hits = 0
+        self.misses = 0
+        self.not_modified = 0
+        self.evictions = 0
+        self._epoch = secrets.token_hex(8)
+        self._versions = defaultdict(int)
+        self._collection_versions = defaultdict(int)
+        self._entries = OrderedDict()  # etag -> body
+        self._bytes = 0
+
+    def bump(self, collection, target):
+        """Record a write to ``collection`` for ``target``; also invalidates unfiltered listings."""
+        self._versions[(collection, target)] += 1
+        self._versions[(collection, None)] += 1
+
+    def bump_collection(self, collection):
+        """Record a write to ``collection`` whose target isn't known; invalidates every listing of it."""
+        self._collection_versions[collection] += 1
+
+    def etag(self, scopes, variant):
+        """Strong ETag for a response covering ``scopes`` ((collection, target) pairs).
+
+        ``variant`` distinguishes representations of the same scopes, e.g. the
+        request path and query string.
+        """
+        parts = [self._epoch, variant]
+        if self.max_age:
+            parts.append(str(int(time.time() // self.max_age)))
+        parts += [
+            f"{collection}:{self._collection_versions[collection]}:{target}:{self._versions[(collection, target)]}"
+            for collection, target in scopes
+        ]
+        return '"' + hashlib.sha1("|".join(parts).encode()).hexdigest() + '"'
+
+    def get(self, etag):
+        body = self._entries.get(etag)
+        if body is None:
+            self.misses += 1
+            return None
+        self._entries.move_to_end(etag)
+        self.hits += 1
+        return body
+
+    def put(self, etag, body):
+        if len(body) > self.max_bytes:
+            return
+        previous = self._entries.pop(etag, None)
+        if previous is not None:
+            self._bytes -= len(previous)
+        self._entries[etag] = body
+        self._bytes += len(body)
+        while self._bytes > self.max_bytes:
+            _, evicted = self._entries.popitem(last=False)
+            self._bytes -= len(evicted)
+            self.evictions += 1
+
+    def stats(self):
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "not_modified": self.not_modified,
+            "evictions": self.evictions,
+            "entries": len(self._entries),
+            "bytes": self._bytes,
+            "max_bytes": self.max_bytes,
+            "max_age": self.max_age,
+        }
+
+
+def etag_matches(if_none_match, etag):
+    """Whether an If-None-Match header value matches ``etag`` (weak comparison, as RFC 9110 requires)."""
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    candidates = [candidate.strip() for candidate in if_none_match.split(",")]
+    return any(candidate.removeprefix("W/") == etag for candidate in candidates)
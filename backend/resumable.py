@@ -0,0 +1,107 @@
+import os
+import uuid
+from datetime import datetime, timedelta
+
+from pymongo import ReturnDocument
+
+
+class UploadSessions:
+    """Partially uploaded files for the resumable upload routes.
+
+    Each session is a record in ``collection`` (owner, declared length,
+    upload metadata, committed offset, expiry) plus a ``.part`` file under
+    ``root``. The record's offset is authoritative: bytes past it are left
+    over from an interrupted write and get overwritten by the next one.
+    Keep ``root`` on the same filesystem as the blob store so a finished
+    file can be moved into it rather than copied.
+    """
+
+    def __init__(self, root, collection, ttl_seconds=24 * 3600):
+        self.root = root
+        self.collection = collection
+        self.ttl = timedelta(seconds=ttl_seconds)
+        os.makedirs(root, exist_ok=True)
+
+    def path_for(self, upload_id):
+        return os.path.join(self.root, f"{upload_id}.part")
+
+    def create(self, owner, length, metadata):
+        now = datetime.utcnow()
+        session = {
+            "_id": uuid.uuid4().hex,
+            "owner": owner,
+            "length": length,
+            "offset": 0,
+            "metadata": metadata,
+            "state": "uploading",
+            "created_at": now,
+            "expires_at": now + self.ttl,
+        }
+        self.collection.insert_one(session)
+        open(self.path_for(session["_id"]), "wb").close()
+        return session
+
+    def get(self, upload_id, owner):
+        """Return the caller's live session, or None."""
+        return self.collection.find_one({
+            "_id": upload_id,
+            "owner": owner,
+            "expires_at": {"$gt": datetime.utcnow()},
+        })
+
+    def open_at(self, upload_id, offset):
+        f = open(self.path_for(upload_id), "r+b")
+        f.seek(offset)
+        return f
+
+    def commit(self, upload_id, expected_offset, new_offset, f):
+        """Record bytes written through ``f`` from ``expected_offset``.
+
+        Returns the updated session, or None when another request moved the
+        offset first. Overlapping PATCHes are only expected from a client
+        resending the same bytes after a timeout, so whichever commits
+        first leaves the file consistent.
+        """
+        f.flush()
+        os.fsync(f.fileno())
+        session = self.collection.find_one_and_update(
+            {"_id": upload_id, "state": "uploading", "offset": expected_offset},
+            {"$set": {"offset": new_offset, "expires_at": datetime.utcnow() + self.ttl}},
+            return_document=ReturnDocument.AFTER,
+        )
+        if session is not None:
+            f.truncate(new_offset)
+        return session
+
+    def claim(self, upload_id, owner):
+        """Move a fully uploaded session to "finalizing" so only one request finishes it."""
+        session = self.get(upload_id, owner)
+        if session is None or session["offset"] != session["length"]:
+            return session, False
+        claimed = self.collection.find_one_and_update(
+            {"_id": upload_id, "state": "uploading", "offset": session["length"]},
+            {"$set": {"state": "finalizing", "expires_at": datetime.utcnow() + self.ttl}},
+            return_document=ReturnDocument.AFTER,
+        )
+        return claimed or session, claimed is not None
+
+    def unclaim(self, upload_id):
+        """Put a "finalizing" session back to "uploading" after finishing it failed."""
+        self.collection.update_one(
+            {"_id": upload_id, "state": "finalizing"},
+            {"$set": {"state": "uploading", "expires_at": datetime.utcnow() + self.ttl}},
+        )
+
+    def remove(self, upload_id):
+        try:
+            os.remove(self.path_for(upload_id))
+        except FileNotFoundError:
+            pass
+        self.collection.delete_one({"_id": upload_id})
+
+    def expire(self):
+        """Delete sessions past their expiry and their files; returns how many."""
+        expired = list(self.collection.find({"expires_at": {"$lte": datetime.utcnow()}}, {"_id": 1}))
+        for session in expired:
+            self.remove(session["_id"])
+        return len(expired)
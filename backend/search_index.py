@@ -0,0 +1,150 @@
+import re
+import math
+import heapq
+import itertools
+from collections import Counter
+from datetime import timezone
+
+# Searchable fields per collection and their ranking weights
+SEARCH_FIELDS = {
+    "poems": {"title": 3, "author": 2, "content": 1},
+    "images": {"title": 3, "description": 1},
+    "videos": {"title": 3, "description": 1},
+    "music": {"title": 3, "artist": 2, "description": 1},
+}
+
+# Words are runs of letters, digits and combining marks (Latin and Indic), so vowel signs stay inside words
+TOKEN = re.compile(r"[\w\u0300-\u036f\u0900-\u0dff]+")
+
+MAX_QUERY_TERMS = 16
+
+# BM25 parameters
+K1 = 1.2
+B = 0.75
+
+
+def tokenize(text):
+    if not text:
+        return []
+    return TOKEN.findall(str(text).casefold())
+
+
+class SearchIndex:
+    """In-process inverted index over the searchable content fields.
+
+    Documents are ranked with BM25 over field-weighted term frequencies;
+    every query term must match. Built from Mongo at startup and kept
+    current by the upload and delete handlers, so it only sees writes made
+    through this process. Meant to be used from the event loop; it does no
+    locking of its own.
+    """
+
+    def __init__(self):
+        # Postings are keyed by small ints rather than (collection, ObjectId) tuples,
+        # which hash far more slowly in the scoring loop
+        self._numbers = {}  # (collection, _id) -> document number
+        self._docs = {}  # document number -> (collection, _id, target, uploaded_at timestamp, length, terms)
+        self._postings = {}  # term -> {document number: weighted term frequency}
+        self._next_number = itertools.count()
+        self._total_length = 0
+
+    def __len__(self):
+        return len(self._docs)
+
+    def add(self, collection, doc):
+        """Index ``doc`` (which must carry ``_id``), replacing any previous version."""
+        self.remove(collection, doc["_id"])
+
+        frequencies = Counter()
+        for field, weight in SEARCH_FIELDS[collection].items():
+            for term in tokenize(doc.get(field)):
+                frequencies[term] += weight
+        length = sum(frequencies.values())
+
+        number = next(self._next_number)
+        for term, frequency in frequencies.items():
+            self._postings.setdefault(term, {})[number] = frequency
+
+        uploaded_at = doc.get("uploaded_at")
+        timestamp = 0.0
+        if uploaded_at is not None:
+            # pymongo hands back naive UTC datetimes
+            timestamp = (uploaded_at if uploaded_at.tzinfo else uploaded_at.replace(tzinfo=timezone.utc)).timestamp()
+        self._numbers[(collection, doc["_id"])] = number
+        self._docs[number] = (collection, doc["_id"], doc.get("target"), timestamp, length, tuple(frequencies))
+        self._total_length += length
+
+    def remove(self, collection, doc_id):
+        number = self._numbers.pop((collection, doc_id), None)
+        if number is None:
+            return
+        _, _, _, _, length, terms = self._docs.pop(number)
+        self._total_length -= length
+        for term in terms:
+            postings = self._postings.get(term)
+            if postings is not None:
+                postings.pop(number, None)
+                if not postings:
+                    del self._postings[term]
+
+    def clear(self):
+        self._numbers.clear()
+        self._docs.clear()
+        self._postings.clear()
+        self._total_length = 0
+
+    def search(self, query, collections=None, target=None, limit=20, offset=0):
+        """Return ``(total, [(collection, _id, score), ...])`` for one page of ranked matches.
+
+        Ties in score go to the newer document.
+        """
+        terms = list(dict.fromkeys(tokenize(query)))[:MAX_QUERY_TERMS]
+        if not terms:
+            return 0, []
+        postings = [self._postings.get(term) for term in terms]
+        if any(p is None for p in postings):
+            return 0, []
+
+        count = len(self._docs)
+        average_length = (self._total_length / count if count else 0.0) or 1.0
+        # BM25 with the per-document length norm K1 * (1 - B + B * length / average) split
+        # into constants, and idf * (K1 + 1) folded into one factor per term
+        base_norm = K1 * (1 - B)
+        length_norm = K1 * B / average_length
+        factors = [math.log(1 + (count - len(p) + 0.5) / (len(p) + 0.5)) * (K1 + 1) for p in postings]
+
+        # Walk the rarest term's postings and probe the others
+        order = sorted(range(len(postings)), key=lambda i: len(postings[i]))
+        rarest, rarest_factor = postings[order[0]], factors[order[0]]
+        others = [(postings[i], factors[i]) for i in order[1:]]
+        filtered = collections is not None or target is not None
+
+        docs = self._docs
+        scored = []
+        for number, frequency in rarest.items():
+            collection, _, doc_target, timestamp, length, _ = docs[number]
+            if filtered and ((collections is not None and collection not in collections)
+                             or (target is not None and doc_target != target)):
+                continue
+            norm = base_norm + length_norm * length
+            score = rarest_factor * frequency / (frequency + norm)
+            for p, factor in others:
+                frequency = p.get(number)
+                if frequency is None:
+                    break
+                score += factor * frequency / (frequency + norm)
+            else:
+                scored.append((score, timestamp, number))
+
+        top = heapq.nlargest(offset + limit, scored)
+        hits = []
+        for score, _, number in top[offset:]:
+            collection, doc_id = docs[number][:2]
+            hits.append((collection, doc_id, round(score, 4)))
+        return len(scored), hits
+
+    def stats(self):
+        return {
+            "documents": len(self._docs),
+            "terms": len(self._postings),
+        }
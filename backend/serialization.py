@@ -0,0 +1,43 @@
+import json
+from datetime import date, datetime
+
+from bson import ObjectId
+from fastapi.responses import JSONResponse
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+
+def _default(obj):
+    # Types Mongo documents carry that neither encoder knows about natively
+    if isinstance(obj, ObjectId):
+        return str(obj)
+    if isinstance(obj, (datetime, date)):
+        return obj.isoformat()
+    raise TypeError(f"Object of type {type(obj).__name__} is not JSON serializable")
+
+
+def dumps(obj) -> bytes:
+    """Encode ``obj`` to JSON bytes, with ObjectId and datetime support.
+
+    Uses orjson when installed (it encodes datetimes itself); the stdlib
+    fallback produces the same output, only slower.
+    """
+    if orjson is not None:
+        return orjson.dumps(obj, default=_default)
+    return json.dumps(obj, default=_default, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+
+class FastJSONResponse(JSONResponse):
+    """JSONResponse that encodes with ``dumps``.
+
+    As the app's default response class it only replaces the final
+    encoding step: FastAPI still runs ``jsonable_encoder`` over whatever a
+    route returns. Routes that build ``FastJSONResponse`` (or a Response
+    around ``dumps``) themselves, like the listings, skip that pass.
+    """
+
+    def render(self, content) -> bytes:
+        return dumps(content)
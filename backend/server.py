@@ -1,26 +1,82 @@
-from fastapi import FastAPI, HTTPException, Depends, status, UploadFile, File, Request
+from fastapi import FastAPI, HTTPException, Depends, status, Query, Request, BackgroundTasks
 from fastapi.security import OAuth2PasswordBearer, OAuth2PasswordRequestForm
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.staticfiles import StaticFiles
-from fastapi.responses import FileResponse
+from fastapi.responses import Response, StreamingResponse
+from starlette.requests import ClientDisconnect
 
 from pymongo import MongoClient
-from pydantic import BaseModel
+from pymongo.errors import OperationFailure, BulkWriteError, PyMongoError, ExecutionTimeout
+from pydantic import BaseModel, ValidationError
 
 from passlib.context import CryptContext
 from jose import JWTError, jwt
 from dotenv import load_dotenv
 
 import os
+import asyncio
+import logging
+import socket
+import multiprocessing
+from contextlib import asynccontextmanager
 import datetime as dt
 from datetime import datetime, timedelta
 from bson import ObjectId
 
-from typing import Optional
+from typing import Optional, List
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+import base64
+import binascii
+import json
+from email.utils import format_datetime
 
+# Before the local modules, some of which read their settings at import time
 load_dotenv()
 
-app = FastAPI(title="Shree Kara Studios API")
+from blob_store import BlobStore, decode_payload, migrate_inline_payloads
+from repository import Repository
+from indexes import ensure_indexes, LISTING_SORT, TOMBSTONES, TOMBSTONE_MAX_DOCS
+from token_cache import TokenCache
+from response_cache import ResponseCache, etag_matches
+from renditions import render_renditions
+from media import media_response
+from static_manifest import StaticManifest
+from serialization import FastJSONResponse, dumps
+from search_index import SearchIndex, SEARCH_FIELDS
+from metrics import Metrics, MetricsMiddleware
+from events import EventBroker, ChangeStreamFeed
+from resumable import UploadSessions
+from streaming_form import StreamingForm, FormError
+from jobs import JobQueue, LeaseLost
+from probe import probe_media
+from profiling import ProfilingMiddleware
+
+logger = logging.getLogger("shree_kara")
+
+@asynccontextmanager
+async def lifespan(app):
+    # Connections, threads and startup scans live here rather than at import time
+    global ready
+    start_password_executor()
+    open_database()
+    try:
+        await warm_up_database()
+        migrate_media_payloads()
+        create_indexes()
+        build_static_manifest()
+        build_search_index()
+        start_change_feed()
+        start_session_sweeper()
+        start_job_workers()
+        ready = True
+        yield
+    finally:
+        ready = False
+        await stop_job_workers()
+        close_resources()
+
+app = FastAPI(title="Shree Kara Studios API", default_response_class=FastJSONResponse, lifespan=lifespan)
 
 # CORS middleware
 app.add_middleware(
@@ -29,12 +85,55 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    # Read by resumable upload clients
+    expose_headers=["Location", "Upload-Offset", "Upload-Length", "Upload-Expires"],
 )
 
+# Request latency, payload size and Mongo command metrics, served at /api/metrics
+metrics = Metrics()
+app.add_middleware(MetricsMiddleware, metrics=metrics)
+
+# Per-request profiling, only installed when a token is configured; send
+# "X-Profile: <token>" (or ?profile=<token>) to profile that one request
+PROFILING_TOKEN = os.getenv("PROFILING_TOKEN", "")
+PROFILING_DIR = os.getenv("PROFILING_DIR", os.path.join(os.path.dirname(__file__), "profiles"))
+PROFILING_INTERVAL_MS = float(os.getenv("PROFILING_INTERVAL_MS", "1"))
+if PROFILING_TOKEN:
+    app.add_middleware(
+        ProfilingMiddleware,
+        token=PROFILING_TOKEN,
+        output_dir=PROFILING_DIR,
+        interval=PROFILING_INTERVAL_MS / 1000,
+    )
+
 # MongoDB connection
 MONGO_URL = os.getenv("MONGO_URL", "mongodb://localhost:27017/shree_kara_db")
-client = MongoClient(MONGO_URL)
-db = client.shree_kara_db
+DB_NAME = os.getenv("DB_NAME", "shree_kara_db")
+MONGO_MAX_POOL_SIZE = int(os.getenv("MONGO_MAX_POOL_SIZE", "100"))
+MONGO_SERVER_SELECTION_TIMEOUT_MS = int(os.getenv("MONGO_SERVER_SELECTION_TIMEOUT_MS", "5000"))
+MONGO_CONNECT_TIMEOUT_MS = int(os.getenv("MONGO_CONNECT_TIMEOUT_MS", "5000"))
+MONGO_SOCKET_TIMEOUT_MS = int(os.getenv("MONGO_SOCKET_TIMEOUT_MS", "30000"))
+# Connections kept open (and opened at startup) so the first requests don't pay for handshakes
+MONGO_MIN_POOL_SIZE = int(os.getenv("MONGO_MIN_POOL_SIZE", "4"))
+MONGO_MAX_IDLE_TIME_MS = int(os.getenv("MONGO_MAX_IDLE_TIME_MS", "300000"))
+MONGO_WAIT_QUEUE_TIMEOUT_MS = int(os.getenv("MONGO_WAIT_QUEUE_TIMEOUT_MS", "10000"))
+# Wire compression in order of preference; the server picks the first it supports.
+# zstd needs the zstandard package and snappy python-snappy; zlib is always available
+MONGO_COMPRESSORS = os.getenv("MONGO_COMPRESSORS", "zstd,zlib")
+# Threads that run blocking pymongo and blob store calls off the event loop
+DB_THREAD_POOL_SIZE = int(os.getenv("DB_THREAD_POOL_SIZE", "16"))
+
+# Set up by the lifespan handler, so importing this module opens no connections
+client = None
+db = None
+repo = None
+blob_store = None
+upload_sessions = None
+job_queue = None
+ready = False
+
+# Create missing indexes at startup; disable to manage them with `python indexes.py`
+CREATE_INDEXES_ON_STARTUP = os.getenv("CREATE_INDEXES_ON_STARTUP", "true").lower() == "true"
 
 # Security
 SECRET_KEY = os.getenv("SECRET_KEY", "shree_kara_secret_key_2024_secure")
@@ -44,13 +143,128 @@ ACCESS_TOKEN_EXPIRE_MINUTES = int(os.getenv("ACCESS_TOKEN_EXPIRE_MINUTES", "1440
 pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/api/auth/token")
 
+# bcrypt is deliberately slow and releases the GIL, so hashing runs on its own
+# small thread pool instead of blocking the event loop during a login burst
+PASSWORD_HASH_WORKERS = int(os.getenv("PASSWORD_HASH_WORKERS", "2"))
+# Started by the lifespan handler, which also shuts it down
+password_executor = None
+
+# Validated tokens are cached so repeat calls skip jwt.decode and the Auth lookup.
+# Entries never outlive the token's exp; AUTH_CACHE_SIZE=0 disables the cache.
+AUTH_CACHE_SIZE = int(os.getenv("AUTH_CACHE_SIZE", "1024"))
+AUTH_CACHE_TTL_SECONDS = int(os.getenv("AUTH_CACHE_TTL_SECONDS", "60"))
+token_cache = TokenCache(max_entries=AUTH_CACHE_SIZE, ttl_seconds=AUTH_CACHE_TTL_SECONDS)
+
 # Create uploads directory for assets
-uploads_dir = os.path.join(os.path.dirname(__file__), "uploads")
-os.makedirs(uploads_dir, exist_ok=True)
+uploads_dir = os.getenv("UPLOADS_DIR", os.path.join(os.path.dirname(__file__), "uploads"))
+
+# Fields returned by the listing routes unless ?fields= picks a subset.
+# Media payloads are fetched separately through each item's url.
+LISTING_FIELDS = {
+    "images": ["title", "description", "target", "uploaded_by", "uploaded_at", "size", "content_type", "url", "renditions", "media"],
+    "videos": ["title", "description", "target", "uploaded_by", "uploaded_at", "size", "content_type", "url", "media"],
+    "music": ["title", "description", "artist", "target", "uploaded_by", "uploaded_at", "size", "content_type", "url", "media"],
+    "poems": ["title", "content", "author", "target", "uploaded_by", "uploaded_at"],
+}
+
+# Listing page sizes
+DEFAULT_PAGE_SIZE = int(os.getenv("DEFAULT_PAGE_SIZE", "50"))
+MAX_PAGE_SIZE = int(os.getenv("MAX_PAGE_SIZE", "200"))
+# Documents fetched per round trip when streaming NDJSON listings
+NDJSON_BATCH_SIZE = int(os.getenv("NDJSON_BATCH_SIZE", "200"))
+
+# Listings return a sync_token; ?since=<token> then returns only what was added or
+# deleted after it. Tokens lag the response by SYNC_OVERLAP_SECONDS so writes still
+# committing are not skipped, which means changes can repeat across syncs
+SYNC_OVERLAP_SECONDS = int(os.getenv("SYNC_OVERLAP_SECONDS", "5"))
+# Larger deltas get 410 and the client reloads the listing instead
+SYNC_MAX_CHANGES = int(os.getenv("SYNC_MAX_CHANGES", "1000"))
+
+# Rendered listings are cached under ETags that uploads and deletes invalidate.
+# With a change stream (see EVENTS_BACKEND) writes from every process invalidate
+# them; otherwise only this process's writes do, so with several workers ETags
+# also rotate every RESPONSE_CACHE_MAX_AGE_SECONDS to bound how stale a page can
+# get (0 disables that, which is only correct with a single worker)
+RESPONSE_CACHE_MAX_BYTES = int(os.getenv("RESPONSE_CACHE_MAX_BYTES", str(32 * 1024 * 1024)))
+RESPONSE_CACHE_MAX_AGE_SECONDS = int(os.getenv("RESPONSE_CACHE_MAX_AGE_SECONDS", "10"))
+
+# Uploaded images get resized WebP/JPEG renditions no wider than these widths,
+# rendered after the response on a pool of worker processes
+RENDITION_WIDTHS = [int(width) for width in os.getenv("RENDITION_WIDTHS", "256,768,1600").split(",")]
+RENDITION_WORKERS = int(os.getenv("RENDITION_WORKERS", "2"))
+
+# Multipart uploads are copied to the blob store in chunks of this size
+UPLOAD_CHUNK_SIZE = int(os.getenv("UPLOAD_CHUNK_SIZE", str(1024 * 1024)))
+
+# Resumable video uploads: the largest accepted file, how long an idle session
+# lives, and how often expired sessions and their partial files are removed
+RESUMABLE_MAX_BYTES = int(os.getenv("RESUMABLE_MAX_BYTES", str(4 * 1024 * 1024 * 1024)))
+RESUMABLE_TTL_SECONDS = int(os.getenv("RESUMABLE_TTL_SECONDS", str(24 * 3600)))
+RESUMABLE_SWEEP_SECONDS = int(os.getenv("RESUMABLE_SWEEP_SECONDS", "600"))
+
+# Uploads are probed for their real MIME type, dimensions, duration and bitrate by
+# jobs queued in Mongo; the result lands in the item's content_type and "media".
+# Each server process runs JOB_WORKERS probes at once in worker processes (0 leaves
+# the queue to other processes). A job whose worker stops renewing its lease for
+# JOB_LEASE_SECONDS is claimed again, up to JOB_MAX_ATTEMPTS times in all
+JOB_WORKERS = int(os.getenv("JOB_WORKERS", "2"))
+JOB_LEASE_SECONDS = int(os.getenv("JOB_LEASE_SECONDS", "60"))
+JOB_MAX_ATTEMPTS = int(os.getenv("JOB_MAX_ATTEMPTS", "3"))
+JOB_RETRY_SECONDS = int(os.getenv("JOB_RETRY_SECONDS", "30"))
+# Idle workers check for due jobs (retries, other processes' uploads) this often
+JOB_POLL_SECONDS = float(os.getenv("JOB_POLL_SECONDS", "2"))
+
+# Limits for POST /api/upload/batch; the byte budget counts base64 payload characters
+UPLOAD_BATCH_MAX_ITEMS = int(os.getenv("UPLOAD_BATCH_MAX_ITEMS", "50"))
+UPLOAD_BATCH_MAX_BYTES = int(os.getenv("UPLOAD_BATCH_MAX_BYTES", str(64 * 1024 * 1024)))
+# Bound on the whole request body, checked before it is read: the payloads plus room for the other fields
+UPLOAD_BATCH_MAX_BODY_BYTES = int(os.getenv("UPLOAD_BATCH_MAX_BODY_BYTES", str(UPLOAD_BATCH_MAX_BYTES + 1024 * 1024)))
+DELETE_BATCH_MAX_ITEMS = int(os.getenv("DELETE_BATCH_MAX_ITEMS", "200"))
+
+response_cache = ResponseCache(max_bytes=RESPONSE_CACHE_MAX_BYTES, max_age=RESPONSE_CACHE_MAX_AGE_SECONDS or None)
+
+# /api/search runs on an in-process inverted index ("memory") or Mongo text indexes ("mongo")
+SEARCH_BACKEND = os.getenv("SEARCH_BACKEND", "memory")
+search_index = SearchIndex()
+
+metrics.add_gauges("shree_kara_response_cache", "Listing response cache counters.", "stat", response_cache.stats)
+metrics.add_gauges("shree_kara_token_cache", "Bearer token cache counters.", "stat", token_cache.stats)
+# GET /api/events pushes upload/delete notifications over SSE. "changestream" tails a
+# Mongo change stream (replica sets only) and sees writes from every process,
+# "memory" only this process's writes; "auto" picks the first that works
+EVENTS_BACKEND = os.getenv("EVENTS_BACKEND", "auto")
+EVENTS_MAX_SUBSCRIBERS = int(os.getenv("EVENTS_MAX_SUBSCRIBERS", "1000"))
+EVENTS_QUEUE_SIZE = int(os.getenv("EVENTS_QUEUE_SIZE", "256"))
+EVENTS_HEARTBEAT_SECONDS = int(os.getenv("EVENTS_HEARTBEAT_SECONDS", "15"))
+event_broker = EventBroker(max_subscribers=EVENTS_MAX_SUBSCRIBERS, max_queue=EVENTS_QUEUE_SIZE)
+# Set by the lifespan handler when a change stream is feeding the broker
+change_feed = None
+# Periodic removal of expired resumable upload sessions, also started by the lifespan handler
+session_sweeper = None
+
+metrics.add_gauges("shree_kara_search_index", "In-memory search index size.", "stat", search_index.stats)
+metrics.add_gauges("shree_kara_events", "Content event feed counters.", "stat", event_broker.stats)
+
+# Started on first use so importing the app doesn't spawn processes
+rendition_executor = None
+probe_executor = None
+# Job worker tasks and the event that wakes idle ones, set up by the lifespan handler
+job_runners = []
+job_wakeup = None
+job_stats = {"claimed": 0, "completed": 0, "retried": 0, "failed": 0}
+metrics.add_gauges("shree_kara_jobs", "Background job counters for this process.", "stat", lambda: job_stats)
+
+# Collection -> (payload field, default MIME type) for blob-backed content
+MEDIA_FIELDS = {
+    "images": ("image_data", "image/jpeg"),
+    "videos": ("video_data", "video/mp4"),
+    "music": ("music_data", "audio/mpeg"),
+}
 
 # Build frontend if build directory doesn't exist
 frontend_path = os.path.abspath(os.path.join(os.path.dirname(__file__), "../frontend"))
 build_path = os.path.join(frontend_path, "build")
+static_manifest = StaticManifest(build_path)
 
 # Static file serving temporarily disabled for testing
 # if os.path.exists(build_path):
@@ -85,6 +299,13 @@ class VideoUpload(BaseModel):
     video_data: str  # base64 encoded video
     target: str      # where to place content
 
+class ResumableVideoUpload(BaseModel):
+    title: str
+    description: Optional[str] = None
+    target: str
+    size: int  # total bytes the client will send
+    content_type: str = "video/mp4"
+
 class PoemUpload(BaseModel):
     title: str
     content: str
@@ -98,6 +319,83 @@ class MusicUpload(BaseModel):
     artist: Optional[str] = None
     target: str      # where to place content
 
+class BatchUpload(BaseModel):
+    items: List[dict]  # each {"type": "poem" | "image" | "video" | "music", ...upload fields}
+
+# Batch item type -> (collection, model, fields copied into the document)
+BATCH_TYPES = {
+    "poem": ("poems", PoemUpload, ("title", "content", "author")),
+    "image": ("images", ImageUpload, ("title", "description")),
+    "video": ("videos", VideoUpload, ("title", "description")),
+    "music": ("music", MusicUpload, ("title", "description", "artist")),
+}
+
+# Collection -> item type used by the batch and event APIs
+COLLECTION_TYPES = {collection: item_type for item_type, (collection, _, _) in BATCH_TYPES.items()}
+
+class DeleteItem(BaseModel):
+    type: str  # "poem" | "image" | "video" | "music"
+    id: str
+
+class BatchDelete(BaseModel):
+    items: List[DeleteItem]
+
+class ListingParams:
+    """Query parameters shared by the content listing routes."""
+
+    def __init__(
+        self,
+        fields: Optional[str] = None,
+        limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+        cursor: Optional[str] = None,
+        include_total: bool = False,
+        since: Optional[str] = None,
+    ):
+        self.fields = fields
+        self.limit = limit
+        self.cursor = cursor
+        self.include_total = include_total
+        self.since = since
+
+PAGE_SECTIONS = ["poems", "images", "videos", "music"]
+
+class PageParams:
+    """Query parameters for /api/pages/{target}: which sections, and a limit and cursor per section."""
+
+    def __init__(
+        self,
+        sections: Optional[str] = None,
+        limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+        poems_limit: Optional[int] = Query(None, ge=1, le=MAX_PAGE_SIZE),
+        images_limit: Optional[int] = Query(None, ge=1, le=MAX_PAGE_SIZE),
+        videos_limit: Optional[int] = Query(None, ge=1, le=MAX_PAGE_SIZE),
+        music_limit: Optional[int] = Query(None, ge=1, le=MAX_PAGE_SIZE),
+        poems_cursor: Optional[str] = None,
+        images_cursor: Optional[str] = None,
+        videos_cursor: Optional[str] = None,
+        music_cursor: Optional[str] = None,
+        include_total: bool = False,
+    ):
+        if sections is None:
+            self.sections = PAGE_SECTIONS
+        else:
+            self.sections = [section.strip() for section in sections.split(",") if section.strip()]
+            unknown = [section for section in self.sections if section not in PAGE_SECTIONS]
+            if unknown:
+                raise HTTPException(status_code=400, detail=f"Unknown sections: {', '.join(unknown)}")
+
+        limits = {"poems": poems_limit, "images": images_limit, "videos": videos_limit, "music": music_limit}
+        cursors = {"poems": poems_cursor, "images": images_cursor, "videos": videos_cursor, "music": music_cursor}
+        self.listings = {
+            section: ListingParams(
+                fields=None,
+                limit=limits[section] or limit,
+                cursor=cursors[section],
+                include_total=include_total,
+            )
+            for section in self.sections
+        }
+
 # Utility functions
 def verify_password(plain_password, hashed_password):
     return pwd_context.verify(plain_password, hashed_password)
@@ -105,6 +403,18 @@ def verify_password(plain_password, hashed_password):
 def get_password_hash(password):
     return pwd_context.hash(password)
 
+async def verify_and_update_password(plain_password, hashed_password):
+    # Returns (verified, new_hash); new_hash is set when the stored hash is deprecated
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(
+        password_executor, pwd_context.verify_and_update, plain_password, hashed_password
+    )
+
+async def dummy_verify_password():
+    # Spend the same time on unknown usernames as on wrong passwords
+    loop = asyncio.get_running_loop()
+    await loop.run_in_executor(password_executor, pwd_context.dummy_verify)
+
 def create_access_token(data: dict, expires_delta: Optional[timedelta] = None):
     to_encode = data.copy()
     if expires_delta:
@@ -121,29 +431,631 @@ async def get_current_user(token: str = Depends(oauth2_scheme)):
         detail="Could not validate credentials",
         headers={"WWW-Authenticate": "Bearer"},
     )
+    cached_user = token_cache.get(token)
+    if cached_user is not None:
+        return cached_user
+
     try:
         payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
         username: str = payload.get("sub")
         if username is None:
             raise credentials_exception
 
-        user = db.Auth.find_one({"Username": username})
+        user = await repo.Auth.find_one({"Username": username})
         if user is None:
             raise credentials_exception
     except JWTError:
         raise credentials_exception
 
-    return {"username": username}
+    current_user = {"username": username}
+    if payload.get("exp") is not None:
+        token_cache.put(token, current_user, payload["exp"])
+    return current_user
+
+async def store_payload(payload: str, default_content_type: str):
+    try:
+        data, content_type = decode_payload(payload, default_content_type)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    return await repo.run(blob_store.put, data, content_type)
+
+async def insert_media(collection: str, doc: dict):
+    # The blob reference was taken before the insert; give it back if the insert fails
+    try:
+        return await repo[collection].insert_one(doc)
+    except BaseException:
+        await repo.run(blob_store.release, doc["blob_id"])
+        raise
+
+async def store_upload(request: Request, default_content_type: str, required=("title", "target")):
+    # Parse the multipart body as it arrives and write the file part straight into
+    # the blob store; UploadFile would first spool the whole file to a temp file.
+    # Returns the form's text fields and the stored blob
+    try:
+        form = StreamingForm(request.headers.get("content-type", ""))
+    except FormError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    writer = await repo.run(blob_store.writer)
+    try:
+        buffer = bytearray()
+        try:
+            async for chunk in request.stream():
+                buffer += form.feed(chunk)
+                if len(buffer) >= UPLOAD_CHUNK_SIZE:
+                    await repo.run(writer.write, buffer)
+                    buffer = bytearray()
+            form.finish()
+        except FormError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+        if buffer:
+            await repo.run(writer.write, buffer)
+
+        missing = [field for field in required if not form.fields.get(field)]
+        if not form.file_received:
+            missing.append("file")
+        if missing:
+            raise HTTPException(status_code=422, detail=f"Missing form fields: {', '.join(missing)}")
+        if writer.size == 0:
+            raise HTTPException(status_code=400, detail="Uploaded file is empty")
+    except BaseException:
+        writer.abort()
+        raise
+
+    content_type = form.file_content_type
+    if not content_type or content_type == "application/octet-stream":
+        content_type = default_content_type
+    return form.fields, await repo.run(writer.commit, content_type)
+
+def get_rendition_executor():
+    global rendition_executor
+    if rendition_executor is None:
+        rendition_executor = ProcessPoolExecutor(
+            max_workers=RENDITION_WORKERS, mp_context=multiprocessing.get_context("spawn")
+        )
+    return rendition_executor
+
+def reset_rendition_executor():
+    global rendition_executor
+    if rendition_executor is not None:
+        rendition_executor.shutdown(wait=False)
+        rendition_executor = None
+
+async def generate_renditions(image_id: ObjectId, blob_id: str, target: str):
+    # Renditions belong to the blob, so duplicate uploads reuse the first set
+    blob = await repo.blobs.find_one({"_id": blob_id}, {"renditions": 1})
+    if blob is None:
+        return
+    renditions = blob.get("renditions")
+    if renditions is None:
+        loop = asyncio.get_running_loop()
+        try:
+            renditions = await loop.run_in_executor(
+                get_rendition_executor(),
+                render_renditions,
+                blob_store.path_for(blob_id),
+                blob_store.derivative_dir(blob_id),
+                RENDITION_WIDTHS,
+            )
+        except BrokenProcessPool:
+            # A worker died (e.g. killed for memory); start a fresh pool next time
+            reset_rendition_executor()
+            logger.exception("Rendition worker died rendering blob %s", blob_id)
+            return
+        except Exception as e:
+            logger.warning("Could not render renditions for blob %s: %s", blob_id, e)
+            return
+        await repo.blobs.update_one({"_id": blob_id}, {"$set": {"renditions": renditions}})
+
+    result = await repo.images.update_one({"_id": image_id}, {"$set": {"renditions": renditions}})
+    if result.modified_count:
+        response_cache.bump("images", target)
+
+def get_probe_executor():
+    global probe_executor
+    if probe_executor is None:
+        probe_executor = ProcessPoolExecutor(
+            max_workers=max(1, JOB_WORKERS), mp_context=multiprocessing.get_context("spawn")
+        )
+    return probe_executor
+
+def reset_probe_executor():
+    global probe_executor
+    if probe_executor is not None:
+        probe_executor.shutdown(wait=False)
+        probe_executor = None
+
+async def enqueue_probe(collection: str, doc: dict, owner: str):
+    # Queued rather than run inline so the upload responds as soon as the item is stored
+    payload = {"collection": collection, "id": doc["_id"], "blob_id": doc["blob_id"]}
+    try:
+        job = await repo.run(job_queue.enqueue, "probe", payload, owner)
+    except PyMongoError as e:
+        # The item is already stored; failing the upload now would only invite a duplicate
+        logger.warning("Could not queue a probe for %s %s: %s", collection, doc["_id"], e)
+        return None
+    job_wakeup.set()
+    return str(job["_id"])
+
+async def hold_lease(future, job: dict, worker: str):
+    # Wait for the job's work, renewing its lease so no other worker claims it meanwhile
+    while True:
+        done, _ = await asyncio.wait({future}, timeout=JOB_LEASE_SECONDS / 3)
+        if done:
+            return future.result()
+        if not await repo.run(job_queue.renew, job["_id"], worker):
+            raise LeaseLost()
+
+async def run_probe_job(job: dict, worker: str):
+    payload = job["payload"]
+    blob_id = payload["blob_id"]
+    # Like renditions, probe results belong to the blob and are reused by duplicate uploads
+    blob = await repo.blobs.find_one({"_id": blob_id}, {"probe": 1})
+    if blob is None:
+        raise FileNotFoundError(f"Blob {blob_id} no longer exists")
+    result = blob.get("probe")
+    if result is None:
+        loop = asyncio.get_running_loop()
+        future = loop.run_in_executor(get_probe_executor(), probe_media, blob_store.path_for(blob_id))
+        result = await hold_lease(future, job, worker)
+        fields = {"probe": result}
+        if result["content_type"]:
+            # /api/media serves the blob's type, so correct it there too
+            fields["content_type"] = result["content_type"]
+        await repo.blobs.update_one({"_id": blob_id}, {"$set": fields})
+
+    fields = {"media": {key: result[key] for key in ("width", "height", "duration", "bitrate")}}
+    if result["content_type"]:
+        fields["content_type"] = result["content_type"]
+    doc = await repo[payload["collection"]].find_one_and_update({"_id": payload["id"]}, {"$set": fields}, {"target": 1})
+    if doc is not None:
+        response_cache.bump(payload["collection"], doc["target"])
+    return result
+
+async def run_jobs(worker: str):
+    while True:
+        job_wakeup.clear()
+        try:
+            job = await repo.run(job_queue.claim, worker)
+        except PyMongoError as e:
+            logger.warning("Could not claim a job: %s", e)
+            job = None
+        if job is None:
+            try:
+                await asyncio.wait_for(job_wakeup.wait(), JOB_POLL_SECONDS)
+            except asyncio.TimeoutError:
+                pass
+            continue
+
+        job_stats["claimed"] += 1
+        try:
+            result = await run_probe_job(job, worker)
+            await repo.run(job_queue.complete, job["_id"], worker, result)
+            job_stats["completed"] += 1
+        except LeaseLost:
+            logger.warning("Lost the lease on job %s to another worker", job["_id"])
+        except Exception as e:
+            if isinstance(e, BrokenProcessPool):
+                # A worker died (e.g. killed for memory); start a fresh pool for the retry
+                reset_probe_executor()
+            # A blob deleted before it was probed won't come back, so don't retry that
+            retry = not isinstance(e, FileNotFoundError) and job["attempts"] < JOB_MAX_ATTEMPTS
+            logger.warning("Job %s failed (attempt %d): %s", job["_id"], job["attempts"], e)
+            try:
+                await repo.run(job_queue.fail, job, worker, str(e) or type(e).__name__, retry=retry)
+            except PyMongoError:
+                logger.exception("Could not record the failure of job %s", job["_id"])
+            job_stats["retried" if retry else "failed"] += 1
+
+async def read_payload(blob_id: str):
+    # Base64 of a stored blob, for clients that still ask for payloads inline
+    try:
+        data = await repo.run(blob_store.read, blob_id)
+    except FileNotFoundError:
+        return None
+    return base64.b64encode(data).decode("ascii")
+
+def select_fields(collection: str, fields: Optional[str]):
+    if fields is None:
+        return LISTING_FIELDS[collection]
+
+    allowed = set(LISTING_FIELDS[collection])
+    if collection in MEDIA_FIELDS:
+        allowed.add(MEDIA_FIELDS[collection][0])
+    selected = [field.strip() for field in fields.split(",") if field.strip()]
+    unknown = [field for field in selected if field not in allowed and field != "_id"]
+    if unknown:
+        raise HTTPException(status_code=400, detail=f"Unknown fields: {', '.join(unknown)}")
+    return selected
+
+def encode_cursor(item: dict):
+    # Keyset position of the last item on a page: (uploaded_at, _id)
+    raw = json.dumps({"t": item["uploaded_at"].isoformat(), "i": str(item["_id"])})
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+def decode_cursor(cursor: str):
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        position = json.loads(raw)
+        return datetime.fromisoformat(position["t"]), ObjectId(position["i"])
+    except (binascii.Error, ValueError, KeyError, TypeError):
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
+def encode_sync_token(moment: datetime):
+    raw = json.dumps({"s": moment.isoformat()})
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+def decode_since(since: str):
+    # A sync token from an earlier response, or an ISO-8601 timestamp; naive UTC either way
+    try:
+        moment = datetime.fromisoformat(since.replace("Z", "+00:00"))
+    except ValueError:
+        try:
+            raw = base64.urlsafe_b64decode(since + "=" * (-len(since) % 4))
+            moment = datetime.fromisoformat(json.loads(raw)["s"])
+        except (binascii.Error, ValueError, KeyError, TypeError):
+            raise HTTPException(status_code=400, detail="Invalid since")
+    if moment.tzinfo is not None:
+        moment = moment.astimezone(dt.timezone.utc).replace(tzinfo=None)
+    return moment
+
+def new_sync_token():
+    return encode_sync_token(datetime.utcnow() - timedelta(seconds=SYNC_OVERLAP_SECONDS))
+
+class ListingQuery:
+    """Projection, keyset filter and item shaping shared by paged and streamed listings."""
+
+    def __init__(self, collection: str, query: dict, params: ListingParams):
+        self.collection = collection
+        self.query = query
+        self.selected = select_fields(collection, params.fields)
+        self.payload_field = MEDIA_FIELDS.get(collection, (None,))[0]
+        self.want_payload = self.payload_field in self.selected
+        self.want_url = "url" in self.selected
+        self.want_renditions = "renditions" in self.selected
+
+        self.projection = {field: 1 for field in self.selected if field not in ("_id", "url", self.payload_field)}
+        self.projection["uploaded_at"] = 1
+        if self.want_payload or self.want_url or self.want_renditions:
+            self.projection["blob_id"] = 1
+
+        self.page_query = query
+        if params.cursor:
+            uploaded_at, last_id = decode_cursor(params.cursor)
+            self.page_query = {"$and": [query, {"$or": [
+                {"uploaded_at": {"$lt": uploaded_at}},
+                {"uploaded_at": uploaded_at, "_id": {"$lt": last_id}},
+            ]}]}
+
+    async def shape(self, item: dict):
+        # _id stays an ObjectId; the response encoder turns it into a string
+        if "uploaded_at" not in self.selected:
+            del item["uploaded_at"]
+        blob_id = item.pop("blob_id", None)
+        if self.want_url:
+            item["url"] = f"/api/media/{blob_id}" if blob_id else None
+        if self.want_payload:
+            item[self.payload_field] = await read_payload(blob_id) if blob_id else None
+        if self.want_renditions:
+            item["renditions"] = rendition_urls(blob_id, item.get("renditions", []))
+        return item
+
+def rendition_urls(blob_id: str, renditions: list):
+    return [
+        {**rendition, "url": f"/api/media/{blob_id}/renditions/{rendition['name']}"}
+        for rendition in renditions
+    ]
+
+async def list_content(collection: str, query: dict, params: ListingParams):
+    listing = ListingQuery(collection, query, params)
+    items = []
+    next_cursor = None
+    sync_token = new_sync_token()
+    # One extra document tells us whether another page exists
+    docs = await repo[collection].find(
+        listing.page_query,
+        listing.projection,
+        sort=LISTING_SORT,
+        limit=params.limit + 1,
+    )
+    if len(docs) > params.limit:
+        docs = docs[:params.limit]
+        next_cursor = encode_cursor(docs[-1])
+
+    for item in docs:
+        items.append(await listing.shape(item))
+
+    page = {"items": items, "next_cursor": next_cursor, "sync_token": sync_token}
+    if params.include_total:
+        page["estimated_total"] = await estimate_total(collection, query)
+    return page
+
+async def sync_content(collection: str, query: dict, params: ListingParams):
+    # Documents added and tombstones left since the token, newest first
+    since = decode_since(params.since)
+    sync_token = new_sync_token()
+    listing = ListingQuery(collection, query, params)
+    removed_query = {"collection": collection, "deleted_at": {"$gt": since}}
+    if "target" in query:
+        removed_query["target"] = query["target"]
+
+    docs, tombstones, expired = await asyncio.gather(
+        repo[collection].find({**query, "uploaded_at": {"$gt": since}}, listing.projection, sort=LISTING_SORT, limit=SYNC_MAX_CHANGES + 1),
+        repo[TOMBSTONES].find(removed_query, {"doc_id": 1}, sort=[("deleted_at", -1)], limit=SYNC_MAX_CHANGES + 1),
+        tombstones_expired(since),
+    )
+    if expired or len(docs) + len(tombstones) > SYNC_MAX_CHANGES:
+        raise HTTPException(status_code=410, detail="Too many changes since this token; reload the listing")
+
+    return {
+        "items": [await listing.shape(item) for item in docs],
+        "deleted": [tombstone["doc_id"] for tombstone in tombstones],
+        "sync_token": sync_token,
+    }
+
+async def tombstones_expired(since: datetime):
+    # A full capped collection is dropping its oldest tombstones; a token older than
+    # the oldest one left may have missed deletions
+    if await repo[TOMBSTONES].estimated_document_count() < TOMBSTONE_MAX_DOCS:
+        return False
+    oldest = await repo[TOMBSTONES].find_one({}, {"deleted_at": 1}, sort=[("$natural", 1)])
+    return oldest is not None and oldest["deleted_at"] > since
+
+async def record_tombstones(collection: str, docs: list):
+    # Lets ?since= syncs report deletions; the content documents are already gone
+    deleted_at = datetime.utcnow()
+    try:
+        await repo[TOMBSTONES].insert_many([
+            {"collection": collection, "doc_id": doc["_id"], "target": doc.get("target"), "deleted_at": deleted_at}
+            for doc in docs
+        ])
+    except PyMongoError as e:
+        logger.error("Recording %d tombstone(s) for %s failed: %s", len(docs), collection, e)
+
+async def stream_content(collection: str, query: dict, params: ListingParams, limit: Optional[int]):
+    # One JSON document per line, straight off the Mongo cursor
+    listing = ListingQuery(collection, query, params)
+    async def lines():
+        async for item in repo[collection].iterate(
+            listing.page_query,
+            listing.projection,
+            sort=LISTING_SORT,
+            limit=limit or 0,
+            batch_size=NDJSON_BATCH_SIZE,
+        ):
+            yield dumps(await listing.shape(item)) + b"\n"
+    return StreamingResponse(lines(), media_type="application/x-ndjson", headers={"Cache-Control": "no-store"})
+
+def wants_ndjson(request: Request):
+    return "application/x-ndjson" in request.headers.get("accept", "")
+
+async def listing_response(request: Request, collection: str, target: Optional[str], params: ListingParams):
+    query = {"target": target} if target is not None else {}
+    if params.since is not None:
+        if params.cursor:
+            raise HTTPException(status_code=400, detail="since cannot be combined with cursor")
+        return await cached_json(request, [(collection, target)], lambda: sync_content(collection, query, params))
+    if wants_ndjson(request):
+        # Streams run to the end of the collection unless a limit was asked for explicitly
+        limit = params.limit if "limit" in request.query_params else None
+        return await stream_content(collection, query, params, limit)
+    return await cached_json(request, [(collection, target)], lambda: list_content(collection, query, params))
+
+async def estimate_total(collection: str, query: dict):
+    # Collection metadata when unfiltered, otherwise an index-backed count
+    try:
+        if not query:
+            return await repo[collection].estimated_document_count()
+        return await repo[collection].count_documents(query, maxTimeMS=1000)
+    except ExecutionTimeout:
+        # Too slow to count; the page is still complete without a total
+        return None
+
+async def cached_json(request: Request, scopes: list, render):
+    # Serve a listing from its ETag: 304 or a cached body without touching Mongo
+    etag = response_cache.etag(scopes, f"{request.url.path}?{request.url.query}")
+    headers = {"ETag": etag, "Cache-Control": "no-cache"}
+    if etag_matches(request.headers.get("if-none-match"), etag):
+        response_cache.not_modified += 1
+        return Response(status_code=304, headers=headers)
+
+    body = response_cache.get(etag)
+    if body is None:
+        try:
+            body = dumps(await render())
+        except PyMongoError as e:
+            # Never cache a page the database could not produce in full
+            logger.warning("Could not render %s: %s", request.url.path, e)
+            raise HTTPException(status_code=503, detail="Database unavailable")
+        response_cache.put(etag, body)
+    return Response(content=body, media_type="application/json", headers=headers)
+
+def content_inserted(collection: str, doc: dict):
+    # Keep derived state (listing ETags, search index, event feed) in step with a write
+    response_cache.bump(collection, doc["target"])
+    if SEARCH_BACKEND == "memory":
+        search_index.add(collection, doc)
+    if change_feed is None:
+        publish_content_event("insert", collection, doc)
+
+def content_deleted(collection: str, doc: dict):
+    response_cache.bump(collection, doc.get("target"))
+    if SEARCH_BACKEND == "memory":
+        search_index.remove(collection, doc["_id"])
+    if change_feed is None:
+        publish_content_event("delete", collection, doc)
+
+def content_changed(op: str, collection: str, doc: dict):
+    # A change stream event, possibly from another process; only inserts say which target they touched
+    if op == "insert":
+        response_cache.bump(collection, doc["target"])
+    else:
+        response_cache.bump_collection(collection)
+    if op != "update":
+        publish_content_event(op, collection, doc)
+
+def publish_content_event(op: str, collection: str, doc: dict):
+    event = {
+        "op": op,
+        "type": COLLECTION_TYPES[collection],
+        "id": doc["_id"],
+        "target": doc.get("target"),
+    }
+    if op == "insert":
+        # The item as the listing routes would return it, so clients can insert it directly
+        item = {"_id": doc["_id"]}
+        for field in LISTING_FIELDS[collection]:
+            if field == "url":
+                item["url"] = f"/api/media/{doc['blob_id']}" if doc.get("blob_id") else None
+            elif field == "renditions":
+                item["renditions"] = rendition_urls(doc.get("blob_id"), doc.get("renditions", []))
+            else:
+                item[field] = doc.get(field)
+        event["item"] = item
+    event_broker.publish(event)
+
+def start_password_executor():
+    global password_executor
+    password_executor = ThreadPoolExecutor(max_workers=PASSWORD_HASH_WORKERS, thread_name_prefix="bcrypt")
+
+def open_database():
+    global client, db, repo, blob_store, upload_sessions, job_queue
+    client = MongoClient(
+        MONGO_URL,
+        maxPoolSize=MONGO_MAX_POOL_SIZE,
+        minPoolSize=MONGO_MIN_POOL_SIZE,
+        maxIdleTimeMS=MONGO_MAX_IDLE_TIME_MS,
+        waitQueueTimeoutMS=MONGO_WAIT_QUEUE_TIMEOUT_MS,
+        serverSelectionTimeoutMS=MONGO_SERVER_SELECTION_TIMEOUT_MS,
+        connectTimeoutMS=MONGO_CONNECT_TIMEOUT_MS,
+        socketTimeoutMS=MONGO_SOCKET_TIMEOUT_MS,
+        compressors=MONGO_COMPRESSORS,
+        event_listeners=[metrics.command_listener()],
+    )
+    db = client[DB_NAME]
+    repo = Repository(db, max_workers=DB_THREAD_POOL_SIZE)
+    # Media payloads are stored once per distinct content, outside the documents
+    blob_store = BlobStore(os.path.join(uploads_dir, "blobs"), db.blobs)
+    # Next to the blobs so finished uploads are moved into the store, not copied
+    upload_sessions = UploadSessions(os.path.join(uploads_dir, "sessions"), db.upload_sessions, ttl_seconds=RESUMABLE_TTL_SECONDS)
+    job_queue = JobQueue(db.jobs, lease_seconds=JOB_LEASE_SECONDS, max_attempts=JOB_MAX_ATTEMPTS, retry_seconds=JOB_RETRY_SECONDS)
+
+async def warm_up_database():
+    # Overlapping pings open MONGO_MIN_POOL_SIZE connections and start the repo threads;
+    # an unreachable server fails startup here instead of on the first request
+    connections = max(1, min(MONGO_MIN_POOL_SIZE, DB_THREAD_POOL_SIZE))
+    try:
+        await asyncio.gather(*(repo.run(client.admin.command, "ping") for _ in range(connections)))
+    except PyMongoError as e:
+        logger.error("MongoDB at startup is unreachable: %s", e)
+        raise
+
+def migrate_media_payloads():
+    for collection, (field, default_content_type) in MEDIA_FIELDS.items():
+        migrate_inline_payloads(db[collection], field, blob_store, default_content_type)
+
+def create_indexes():
+    if not CREATE_INDEXES_ON_STARTUP:
+        return
+    try:
+        ensure_indexes(db)
+    except OperationFailure as e:
+        # e.g. duplicate usernames blocking the unique index; queries still work without it
+        logger.warning("Index creation failed: %s", e)
+
+def build_static_manifest():
+    static_manifest.build()
+
+def build_search_index():
+    if SEARCH_BACKEND != "memory":
+        return
+    search_index.clear()
+    for collection, weights in SEARCH_FIELDS.items():
+        projection = {field: 1 for field in weights}
+        projection.update(target=1, uploaded_at=1)
+        for doc in db[collection].find({}, projection):
+            search_index.add(collection, doc)
+    logger.info("Search index holds %d documents", len(search_index))
+
+def start_change_feed():
+    global change_feed
+    if EVENTS_BACKEND == "memory":
+        return
+    feed = ChangeStreamFeed(db, COLLECTION_TYPES, content_changed, asyncio.get_running_loop())
+    try:
+        feed.start()
+    except OperationFailure as e:
+        if EVENTS_BACKEND == "changestream":
+            raise
+        # Standalone mongod; only this process's writes reach /api/events
+        logger.info("Change streams unavailable, using in-process events: %s", e)
+        return
+    change_feed = feed
+    # Every process's writes now bump the cache, so its entries need no max age
+    response_cache.max_age = None
+
+async def sweep_upload_sessions():
+    while True:
+        await asyncio.sleep(RESUMABLE_SWEEP_SECONDS)
+        try:
+            expired = await repo.run(upload_sessions.expire)
+            if expired:
+                logger.info("Removed %d expired upload session(s)", expired)
+        except PyMongoError as e:
+            logger.warning("Upload session sweep failed: %s", e)
+
+def start_session_sweeper():
+    global session_sweeper
+    session_sweeper = asyncio.get_running_loop().create_task(sweep_upload_sessions())
+
+def start_job_workers():
+    global job_wakeup
+    # Created here since an Event belongs to the loop that first waits on it
+    job_wakeup = asyncio.Event()
+    prefix = f"{socket.gethostname()}:{os.getpid()}"
+    for number in range(JOB_WORKERS):
+        job_runners.append(asyncio.get_running_loop().create_task(run_jobs(f"{prefix}:{number}")))
+
+async def stop_job_workers():
+    # Before the repository closes, so no claim is left waiting on its pool.
+    # Jobs that were running are claimed again once their leases run out
+    for runner in job_runners:
+        runner.cancel()
+    await asyncio.gather(*job_runners, return_exceptions=True)
+    job_runners.clear()
+
+def close_resources():
+    global change_feed, session_sweeper
+    if change_feed is not None:
+        change_feed.stop()
+        change_feed = None
+        response_cache.max_age = RESPONSE_CACHE_MAX_AGE_SECONDS or None
+    if session_sweeper is not None:
+        session_sweeper.cancel()
+        session_sweeper = None
+    repo.close()
+    client.close()
+    password_executor.shutdown(wait=False)
+    reset_rendition_executor()
+    reset_probe_executor()
 
 # API Routes
 @app.get("/api")
 async def api_root():
     return {"message": "Shree Kara Studios API"}
 
+@app.get("/api/ready")
+async def readiness():
+    # For load balancer / orchestrator readiness probes
+    if not ready:
+        raise HTTPException(status_code=503, detail="Starting up")
+    try:
+        await repo.run(client.admin.command, "ping")
+    except PyMongoError:
+        raise HTTPException(status_code=503, detail="Database unavailable")
+    return {"status": "ready"}
+
 @app.post("/api/auth/token", response_model=Token)
 async def login(form_data: OAuth2PasswordRequestForm = Depends()):
-    # Check against pre-defined authors
-
     http_401_exception = HTTPException(
         status_code=status.HTTP_401_UNAUTHORIZED,
         detail="Invalid author credentials",
@@ -151,62 +1063,320 @@ async def login(form_data: OAuth2PasswordRequestForm = Depends()):
     )
 
     try:
-        AUTHORS = db.Auth.find()
-        for author in AUTHORS:
-            if author["Username"] == form_data.username and verify_password(form_data.password, author["Password"]):
-                access_token_expires = timedelta(minutes=ACCESS_TOKEN_EXPIRE_MINUTES)
-                access_token = create_access_token(
-                    data={"sub": form_data.username}, expires_delta=access_token_expires
-                )
-                return {"access_token": access_token, "token_type": "bearer"}
-    except Exception:    
+        author = await repo.Auth.find_one({"Username": form_data.username})
+        if author is None:
+            await dummy_verify_password()
+            raise http_401_exception
+        verified, new_hash = await verify_and_update_password(form_data.password, author["Password"])
+    except Exception:
         raise http_401_exception
-    
-    raise http_401_exception
+
+    if not verified:
+        raise http_401_exception
+
+    if new_hash:
+        await repo.Auth.update_one({"_id": author["_id"]}, {"$set": {"Password": new_hash}})
+        token_cache.invalidate_user(author["Username"])
+
+    access_token_expires = timedelta(minutes=ACCESS_TOKEN_EXPIRE_MINUTES)
+    access_token = create_access_token(
+        data={"sub": form_data.username}, expires_delta=access_token_expires
+    )
+    return {"access_token": access_token, "token_type": "bearer"}
 
 @app.post("/api/upload/music")
 async def upload_music(music: MusicUpload, current_user: dict = Depends(get_current_user)):
+    blob = await store_payload(music.music_data, "audio/mpeg")
     music_doc = {
         "title": music.title,
         "description": music.description,
-        "music_data": music.music_data,
+        "blob_id": blob["blob_id"],
+        "size": blob["size"],
+        "content_type": blob["content_type"],
         "artist": music.artist,
         "target": music.target,
         "uploaded_by": current_user["username"],
         "uploaded_at": datetime.utcnow()
     }
     
-    result = db.music.insert_one(music_doc)
-    return {"message": "Music uploaded successfully", "music_id": str(result.inserted_id)}
+    result = await insert_media("music", music_doc)
+    content_inserted("music", music_doc)
+    job_id = await enqueue_probe("music", music_doc, current_user["username"])
+    return {"message": "Music uploaded successfully", "music_id": str(result.inserted_id), "job_id": job_id}
 
 # Upload routes
 @app.post("/api/upload/image")
-async def upload_image(image: ImageUpload, current_user: dict = Depends(get_current_user)):
+async def upload_image(image: ImageUpload, background_tasks: BackgroundTasks, current_user: dict = Depends(get_current_user)):
+    blob = await store_payload(image.image_data, "image/jpeg")
     image_doc = {
         "title": image.title,
         "description": image.description,
-        "image_data": image.image_data,
+        "blob_id": blob["blob_id"],
+        "size": blob["size"],
+        "content_type": blob["content_type"],
         "target": image.target,
         "uploaded_by": current_user["username"],
         "uploaded_at": datetime.utcnow()
     }
     
-    result = db.images.insert_one(image_doc)
-    return {"message": "Image uploaded successfully", "image_id": str(result.inserted_id)}
+    result = await insert_media("images", image_doc)
+    content_inserted("images", image_doc)
+    job_id = await enqueue_probe("images", image_doc, current_user["username"])
+    background_tasks.add_task(generate_renditions, result.inserted_id, blob["blob_id"], image_doc["target"])
+    return {"message": "Image uploaded successfully", "image_id": str(result.inserted_id), "job_id": job_id}
 
 @app.post("/api/upload/video")
 async def upload_video(video: VideoUpload, current_user: dict = Depends(get_current_user)):
+    blob = await store_payload(video.video_data, "video/mp4")
     video_doc = {
         "title": video.title,
         "description": video.description,
-        "video_data": video.video_data,
+        "blob_id": blob["blob_id"],
+        "size": blob["size"],
+        "content_type": blob["content_type"],
         "target": video.target,
         "uploaded_by": current_user["username"],
         "uploaded_at": datetime.utcnow()
     }
     
-    result = db.videos.insert_one(video_doc)
-    return {"message": "Video uploaded successfully", "video_id": str(result.inserted_id)}
+    result = await insert_media("videos", video_doc)
+    content_inserted("videos", video_doc)
+    job_id = await enqueue_probe("videos", video_doc, current_user["username"])
+    return {"message": "Video uploaded successfully", "video_id": str(result.inserted_id), "job_id": job_id}
+
+# Resumable uploads, tus-style: create a session, PATCH chunks at the current
+# Upload-Offset, HEAD to find where to resume, then complete. Chunks go
+# straight to a file under uploads_dir instead of being held in memory.
+def upload_session_headers(session: dict):
+    return {
+        "Upload-Offset": str(session["offset"]),
+        "Upload-Length": str(session["length"]),
+        "Upload-Expires": format_datetime(session["expires_at"].replace(tzinfo=dt.timezone.utc), usegmt=True),
+        "Cache-Control": "no-store",
+    }
+
+async def get_upload_session(upload_id: str, current_user: dict):
+    session = await repo.run(upload_sessions.get, upload_id, current_user["username"])
+    if session is None:
+        raise HTTPException(status_code=404, detail="Upload not found or expired")
+    return session
+
+@app.post("/api/upload/video/resumable", status_code=201)
+async def create_resumable_video(upload: ResumableVideoUpload, current_user: dict = Depends(get_current_user)):
+    if upload.size <= 0:
+        raise HTTPException(status_code=400, detail="Upload is empty")
+    if upload.size > RESUMABLE_MAX_BYTES:
+        raise HTTPException(status_code=413, detail=f"Uploads are limited to {RESUMABLE_MAX_BYTES} bytes")
+    metadata = {
+        "title": upload.title,
+        "description": upload.description,
+        "target": upload.target,
+        "content_type": upload.content_type,
+    }
+    session = await repo.run(upload_sessions.create, current_user["username"], upload.size, metadata)
+    location = f"/api/upload/video/resumable/{session['_id']}"
+    return FastJSONResponse(
+        status_code=201,
+        content={"upload_id": session["_id"], "offset": 0, "length": upload.size, "expires_at": session["expires_at"]},
+        headers={**upload_session_headers(session), "Location": location},
+    )
+
+@app.head("/api/upload/video/resumable/{upload_id}")
+async def resumable_video_status(upload_id: str, current_user: dict = Depends(get_current_user)):
+    session = await get_upload_session(upload_id, current_user)
+    return Response(status_code=200, headers=upload_session_headers(session))
+
+@app.patch("/api/upload/video/resumable/{upload_id}")
+async def append_resumable_video(upload_id: str, request: Request, current_user: dict = Depends(get_current_user)):
+    if request.headers.get("content-type") != "application/offset+octet-stream":
+        raise HTTPException(status_code=415, detail="Chunks must be sent as application/offset+octet-stream")
+    try:
+        offset = int(request.headers["upload-offset"])
+    except (KeyError, ValueError):
+        raise HTTPException(status_code=400, detail="Missing or invalid Upload-Offset")
+
+    session = await get_upload_session(upload_id, current_user)
+    if session["state"] != "uploading" or offset != session["offset"]:
+        raise HTTPException(status_code=409, detail="Upload-Offset does not match the upload", headers=upload_session_headers(session))
+
+    remaining = session["length"] - offset
+    written = 0
+    overflow = False
+    buffer = bytearray()
+    f = await repo.run(upload_sessions.open_at, upload_id, offset)
+    try:
+        try:
+            async for chunk in request.stream():
+                if written + len(buffer) + len(chunk) > remaining:
+                    chunk = chunk[:remaining - written - len(buffer)]
+                    overflow = True
+                buffer += chunk
+                if len(buffer) >= UPLOAD_CHUNK_SIZE or overflow:
+                    await repo.run(f.write, buffer)
+                    written += len(buffer)
+                    buffer = bytearray()
+                if overflow:
+                    break
+        except ClientDisconnect:
+            # Keep what arrived; the client resumes from the offset committed below
+            pass
+        if buffer:
+            await repo.run(f.write, buffer)
+            written += len(buffer)
+        updated = await repo.run(upload_sessions.commit, upload_id, offset, offset + written, f)
+    finally:
+        await repo.run(f.close)
+
+    if updated is None:
+        session = await get_upload_session(upload_id, current_user)
+        raise HTTPException(status_code=409, detail="Upload-Offset does not match the upload", headers=upload_session_headers(session))
+    if overflow:
+        raise HTTPException(status_code=413, detail="Chunk runs past the declared upload size", headers=upload_session_headers(updated))
+    return Response(status_code=204, headers=upload_session_headers(updated))
+
+@app.post("/api/upload/video/resumable/{upload_id}/complete")
+async def complete_resumable_video(upload_id: str, current_user: dict = Depends(get_current_user)):
+    session, claimed = await repo.run(upload_sessions.claim, upload_id, current_user["username"])
+    if session is None:
+        raise HTTPException(status_code=404, detail="Upload not found or expired")
+    if not claimed:
+        detail = "Upload is already being completed" if session["state"] != "uploading" else "Upload is incomplete"
+        raise HTTPException(status_code=409, detail=detail, headers=upload_session_headers(session))
+
+    metadata = session["metadata"]
+    try:
+        blob = await repo.run(blob_store.put_file, upload_sessions.path_for(upload_id), metadata["content_type"])
+    except BaseException:
+        # The .part file is still there, so the client can retry /complete or cancel
+        await repo.run(upload_sessions.unclaim, upload_id)
+        raise
+    video_doc = {
+        "title": metadata["title"],
+        "description": metadata["description"],
+        "blob_id": blob["blob_id"],
+        "size": blob["size"],
+        "content_type": blob["content_type"],
+        "target": metadata["target"],
+        "uploaded_by": current_user["username"],
+        "uploaded_at": datetime.utcnow()
+    }
+
+    try:
+        result = await repo.videos.insert_one(video_doc)
+    except BaseException:
+        # The file now belongs to the blob store; drop it and the session, so
+        # the client starts over instead of finding the upload stuck
+        await repo.run(blob_store.release, blob["blob_id"])
+        await repo.run(upload_sessions.remove, upload_id)
+        raise
+    content_inserted("videos", video_doc)
+    job_id = await enqueue_probe("videos", video_doc, current_user["username"])
+    await repo.run(upload_sessions.remove, upload_id)
+    return {"message": "Video uploaded successfully", "video_id": str(result.inserted_id), "job_id": job_id}
+
+@app.delete("/api/upload/video/resumable/{upload_id}", status_code=204)
+async def cancel_resumable_video(upload_id: str, current_user: dict = Depends(get_current_user)):
+    session = await get_upload_session(upload_id, current_user)
+    if session["state"] != "uploading":
+        raise HTTPException(status_code=409, detail="Upload is already being completed")
+    await repo.run(upload_sessions.remove, upload_id)
+    return Response(status_code=204)
+
+@app.get("/api/jobs/{job_id}")
+async def get_job(job_id: str, current_user: dict = Depends(get_current_user)):
+    # Status of a background job started by one of the caller's uploads
+    if not ObjectId.is_valid(job_id):
+        raise HTTPException(status_code=404, detail="Job not found")
+    job = await repo.run(job_queue.get, ObjectId(job_id), current_user["username"])
+    if job is None:
+        raise HTTPException(status_code=404, detail="Job not found")
+    payload = job["payload"]
+    return {
+        "job_id": str(job["_id"]),
+        "kind": job["kind"],
+        "state": job["state"],
+        "attempts": job["attempts"],
+        "collection": payload.get("collection"),
+        "item_id": str(payload["id"]) if payload.get("id") is not None else None,
+        "result": job["result"],
+        "error": job["error"],
+        "created_at": job["created_at"],
+        "updated_at": job["updated_at"],
+        "finished_at": job["finished_at"],
+    }
+
+# Multipart upload routes
+@app.post("/api/upload/music/file")
+async def upload_music_file(
+    request: Request,
+    current_user: dict = Depends(get_current_user),
+):
+    # Form fields: title, target, description, artist and the file
+    fields, blob = await store_upload(request, "audio/mpeg")
+    music_doc = {
+        "title": fields["title"],
+        "description": fields.get("description"),
+        "blob_id": blob["blob_id"],
+        "size": blob["size"],
+        "content_type": blob["content_type"],
+        "artist": fields.get("artist"),
+        "target": fields["target"],
+        "uploaded_by": current_user["username"],
+        "uploaded_at": datetime.utcnow()
+    }
+
+    result = await insert_media("music", music_doc)
+    content_inserted("music", music_doc)
+    job_id = await enqueue_probe("music", music_doc, current_user["username"])
+    return {"message": "Music uploaded successfully", "music_id": str(result.inserted_id), "job_id": job_id}
+
+@app.post("/api/upload/image/file")
+async def upload_image_file(
+    request: Request,
+    background_tasks: BackgroundTasks,
+    current_user: dict = Depends(get_current_user),
+):
+    # Form fields: title, target, description and the file
+    fields, blob = await store_upload(request, "image/jpeg")
+    image_doc = {
+        "title": fields["title"],
+        "description": fields.get("description"),
+        "blob_id": blob["blob_id"],
+        "size": blob["size"],
+        "content_type": blob["content_type"],
+        "target": fields["target"],
+        "uploaded_by": current_user["username"],
+        "uploaded_at": datetime.utcnow()
+    }
+
+    result = await insert_media("images", image_doc)
+    content_inserted("images", image_doc)
+    job_id = await enqueue_probe("images", image_doc, current_user["username"])
+    background_tasks.add_task(generate_renditions, result.inserted_id, blob["blob_id"], image_doc["target"])
+    return {"message": "Image uploaded successfully", "image_id": str(result.inserted_id), "job_id": job_id}
+
+@app.post("/api/upload/video/file")
+async def upload_video_file(
+    request: Request,
+    current_user: dict = Depends(get_current_user),
+):
+    # Form fields: title, target, description and the file
+    fields, blob = await store_upload(request, "video/mp4")
+    video_doc = {
+        "title": fields["title"],
+        "description": fields.get("description"),
+        "blob_id": blob["blob_id"],
+        "size": blob["size"],
+        "content_type": blob["content_type"],
+        "target": fields["target"],
+        "uploaded_by": current_user["username"],
+        "uploaded_at": datetime.utcnow()
+    }
+
+    result = await insert_media("videos", video_doc)
+    content_inserted("videos", video_doc)
+    job_id = await enqueue_probe("videos", video_doc, current_user["username"])
+    return {"message": "Video uploaded successfully", "video_id": str(result.inserted_id), "job_id": job_id}
 
 @app.post("/api/upload/poem")
 async def upload_poem(poem: PoemUpload, current_user: dict = Depends(get_current_user)):
@@ -219,97 +1389,284 @@ async def upload_poem(poem: PoemUpload, current_user: dict = Depends(get_current
         "uploaded_at": datetime.now(dt.timezone.utc)
     }
     
-    result = db.poems.insert_one(poem_doc)
+    result = await repo.poems.insert_one(poem_doc)
+    content_inserted("poems", poem_doc)
     return {"message": "Poem uploaded successfully", "poem_id": str(result.inserted_id)}
 
+def validation_message(error: ValidationError):
+    return "; ".join(f"{'.'.join(str(part) for part in err['loc'])}: {err['msg']}" for err in error.errors())
+
+async def insert_batch(collection: str, entries: list):
+    # One unordered insert_many per collection; returns {position in entries: error}
+    docs = [doc for _, doc, _ in entries]
+    try:
+        await repo[collection].insert_many(docs, ordered=False)
+        return {}
+    except BulkWriteError as e:
+        return {err["index"]: err.get("errmsg", "Write failed") for err in e.details.get("writeErrors", [])}
+    except PyMongoError:
+        logger.exception("Batch insert into %s failed", collection)
+        return {position: "Database write failed" for position in range(len(entries))}
+
+async def read_batch_body(request: Request):
+    # Read and validate the body here rather than as a route parameter, so an
+    # oversized batch is turned away before it is buffered and parsed
+    too_large = HTTPException(status_code=413, detail=f"Batch body exceeds {UPLOAD_BATCH_MAX_BODY_BYTES} bytes")
+    length = request.headers.get("content-length")
+    if length is not None and length.isdigit() and int(length) > UPLOAD_BATCH_MAX_BODY_BYTES:
+        raise too_large
+    body = bytearray()
+    async for chunk in request.stream():
+        body += chunk
+        if len(body) > UPLOAD_BATCH_MAX_BODY_BYTES:
+            raise too_large
+    try:
+        return BatchUpload(**json.loads(body))
+    except ValidationError as e:
+        raise HTTPException(status_code=422, detail=validation_message(e))
+    except (ValueError, TypeError):
+        raise HTTPException(status_code=400, detail="Body must be a JSON object")
+
+@app.post("/api/upload/batch")
+async def upload_batch(request: Request, background_tasks: BackgroundTasks, current_user: dict = Depends(get_current_user)):
+    batch = await read_batch_body(request)
+    if not batch.items:
+        raise HTTPException(status_code=400, detail="Batch is empty")
+    if len(batch.items) > UPLOAD_BATCH_MAX_ITEMS:
+        raise HTTPException(status_code=400, detail=f"Batch exceeds {UPLOAD_BATCH_MAX_ITEMS} items")
+
+    results = [{"index": index, "type": item.get("type")} for index, item in enumerate(batch.items)]
+    valid = []  # (index, collection, model)
+    payload_bytes = 0
+    for index, item in enumerate(batch.items):
+        kind = BATCH_TYPES.get(item.get("type"))
+        if kind is None:
+            results[index]["error"] = f"Unknown type: {item.get('type')}"
+            continue
+        collection, model_class, _ = kind
+        try:
+            model = model_class(**{key: value for key, value in item.items() if key != "type"})
+        except ValidationError as e:
+            results[index]["error"] = validation_message(e)
+            continue
+        if collection in MEDIA_FIELDS:
+            payload_bytes += len(getattr(model, MEDIA_FIELDS[collection][0]))
+        valid.append((index, collection, model))
+
+    if payload_bytes > UPLOAD_BATCH_MAX_BYTES:
+        raise HTTPException(status_code=413, detail=f"Batch payloads exceed {UPLOAD_BATCH_MAX_BYTES} bytes")
+
+    # Payloads go to the blob store first (concurrently, on the repository pool)
+    async def store(collection, model):
+        if collection not in MEDIA_FIELDS:
+            return None
+        field, default_content_type = MEDIA_FIELDS[collection]
+        return await store_payload(getattr(model, field), default_content_type)
+
+    blobs = await asyncio.gather(*(store(collection, model) for _, collection, model in valid), return_exceptions=True)
+    unexpected = [blob for blob in blobs if isinstance(blob, Exception) and not isinstance(blob, HTTPException)]
+    if unexpected:
+        # Nothing will be inserted, so drop the references taken for the other items
+        for blob in blobs:
+            if isinstance(blob, dict):
+                await repo.run(blob_store.release, blob["blob_id"])
+        raise unexpected[0]
+
+    uploaded_at = datetime.utcnow()
+    by_collection = {}
+    for (index, collection, model), blob in zip(valid, blobs):
+        if isinstance(blob, HTTPException):
+            results[index]["error"] = blob.detail
+            continue
+        # Same document shape as the single-item upload routes
+        doc = {field: getattr(model, field) for field in BATCH_TYPES[results[index]["type"]][2]}
+        if blob is not None:
+            doc.update(blob_id=blob["blob_id"], size=blob["size"], content_type=blob["content_type"])
+        doc.update(target=model.target, uploaded_by=current_user["username"], uploaded_at=uploaded_at)
+        by_collection.setdefault(collection, []).append((index, doc, blob))
+
+    inserted = await asyncio.gather(*(insert_batch(collection, entries) for collection, entries in by_collection.items()))
+    for (collection, entries), failures in zip(by_collection.items(), inserted):
+        for position, (index, doc, blob) in enumerate(entries):
+            if position in failures:
+                results[index]["error"] = failures[position]
+                if blob is not None:
+                    await repo.run(blob_store.release, blob["blob_id"])
+                continue
+            results[index]["id"] = str(doc["_id"])
+            content_inserted(collection, doc)
+            if blob is not None:
+                results[index]["job_id"] = await enqueue_probe(collection, doc, current_user["username"])
+            if collection == "images":
+                background_tasks.add_task(generate_renditions, doc["_id"], blob["blob_id"], doc["target"])
+
+    succeeded = sum(1 for result in results if "id" in result)
+    return {
+        "message": f"Uploaded {succeeded} of {len(results)} items",
+        "inserted": succeeded,
+        "failed": len(results) - succeeded,
+        "results": results,
+    }
+
 # Get routes
 @app.get("/api/music")
-async def get_music():
-    music = []
-    try:
-        for track in db.music.find().sort("uploaded_at", -1):
-            track["_id"] = str(track["_id"])
-            music.append(track)
-    except Exception:
-        pass
-    return music
+async def get_music(request: Request, params: ListingParams = Depends()):
+    return await listing_response(request, "music", None, params)
 
 @app.get("/api/music/{target}")
-async def get_music_by_target(target: str):
-    music = []
-    try:
-        for track in db.music.find({"target": target}).sort("uploaded_at", -1):
-            track["_id"] = str(track["_id"])
-            music.append(track)
-    except Exception:
-        pass
-    return music
+async def get_music_by_target(request: Request, target: str, params: ListingParams = Depends()):
+    return await listing_response(request, "music", target, params)
 
 @app.get("/api/images")
-async def get_images():
-    images = []
-    try:
-        for image in db.images.find().sort("uploaded_at", -1):
-            image["_id"] = str(image["_id"])
-            images.append(image)
-    except Exception:
-        pass
-    return images
+async def get_images(request: Request, params: ListingParams = Depends()):
+    return await listing_response(request, "images", None, params)
 
 @app.get("/api/images/{target}")
-async def get_images_by_target(target: str):
-    images = []
-    try:
-        for image in db.images.find({"target": target}).sort("uploaded_at", -1):
-            image["_id"] = str(image["_id"])
-            images.append(image)
-    except Exception:
-        pass
-    return images
+async def get_images_by_target(request: Request, target: str, params: ListingParams = Depends()):
+    return await listing_response(request, "images", target, params)
 
 @app.get("/api/videos")
-async def get_videos():
-    videos = []
-    try:
-        for video in db.videos.find().sort("uploaded_at", -1):
-            video["_id"] = str(video["_id"])
-            videos.append(video)
-    except Exception:
-        pass
-    return videos
+async def get_videos(request: Request, params: ListingParams = Depends()):
+    return await listing_response(request, "videos", None, params)
 
 @app.get("/api/videos/{target}")
-async def get_videos_by_target(target: str):
-    videos = []
-    try:
-        for video in db.videos.find({"target": target}).sort("uploaded_at", -1):
-            video["_id"] = str(video["_id"])
-            videos.append(video)
-    except Exception:
-        pass
-    return videos
+async def get_videos_by_target(request: Request, target: str, params: ListingParams = Depends()):
+    return await listing_response(request, "videos", target, params)
 
 @app.get("/api/poems")
-async def get_poems():
-    poems = []
-    try:
-        for poem in db.poems.find().sort("uploaded_at", -1):
-            poem["_id"] = str(poem["_id"])
-            poems.append(poem)
-    except Exception:
-        pass
-    return poems
+async def get_poems(request: Request, params: ListingParams = Depends()):
+    return await listing_response(request, "poems", None, params)
 
 @app.get("/api/poems/{target}")
-async def get_poems_by_target(target: str):
-    poems = []
+async def get_poems_by_target(request: Request, target: str, params: ListingParams = Depends()):
+    return await listing_response(request, "poems", target, params)
+
+@app.get("/api/pages/{target}")
+async def get_page(request: Request, target: str, params: PageParams = Depends()):
+    # One request per page view: the section queries run concurrently
+    async def render():
+        pages = await asyncio.gather(*(
+            list_content(section, {"target": target}, listing)
+            for section, listing in params.listings.items()
+        ))
+        return {"target": target, **dict(zip(params.listings, pages))}
+
+    scopes = [(section, target) for section in params.listings]
+    return await cached_json(request, scopes, render)
+
+def decode_search_cursor(cursor: Optional[str]):
+    # Search pages are ranked, not keyset-ordered, so the cursor is just an offset
+    if cursor is None:
+        return 0
     try:
-        for poem in db.poems.find({"target": target}).sort("uploaded_at", -1):
-            poem["_id"] = str(poem["_id"])
-            poems.append(poem)
-    except Exception:
-        pass
-    return poems
+        offset = int(cursor)
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+    if offset < 0:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+    return offset
+
+async def search_mongo(q: str, collections: list, target: Optional[str], limit: int, offset: int):
+    # One $text query per collection, merged by textScore
+    query = {"$text": {"$search": q}}
+    if target is not None:
+        query["target"] = target
+
+    async def run(collection):
+        docs = await repo[collection].find(
+            query,
+            {"score": {"$meta": "textScore"}},
+            sort=[("score", {"$meta": "textScore"})],
+            limit=offset + limit,
+        )
+        total = await repo[collection].count_documents(query)
+        return total, [(collection, doc["_id"], doc["score"]) for doc in docs]
+
+    results = await asyncio.gather(*(run(collection) for collection in collections))
+    hits = sorted((hit for _, page in results for hit in page), key=lambda hit: hit[2], reverse=True)
+    return sum(total for total, _ in results), hits[offset:offset + limit]
+
+async def load_hits(hits: list):
+    # Fetch the listing fields of ranked hits, one query per collection, keeping rank order
+    by_collection = {}
+    for collection, doc_id, _ in hits:
+        by_collection.setdefault(collection, []).append(doc_id)
+
+    async def load(collection, ids):
+        listing = ListingQuery(collection, {}, ListingParams(limit=len(ids)))
+        docs = await repo[collection].find({"_id": {"$in": ids}}, listing.projection)
+        return {doc["_id"]: await listing.shape(doc) for doc in docs}
+
+    loaded = dict(zip(by_collection, await asyncio.gather(*(
+        load(collection, ids) for collection, ids in by_collection.items()
+    ))))
+    items = []
+    for collection, doc_id, score in hits:
+        doc = loaded[collection].get(doc_id)
+        if doc is not None:  # deleted since it was ranked
+            items.append({"type": COLLECTION_TYPES[collection], "score": score, **doc})
+    return items
+
+@app.get("/api/search")
+async def search(
+    request: Request,
+    q: str = Query(..., min_length=1, max_length=200),
+    types: Optional[str] = Query(None, alias="type"),
+    target: Optional[str] = None,
+    limit: int = Query(20, ge=1, le=MAX_PAGE_SIZE),
+    cursor: Optional[str] = None,
+):
+    collections = list(SEARCH_FIELDS)
+    if types is not None:
+        requested = [kind.strip() for kind in types.split(",") if kind.strip()]
+        unknown = [kind for kind in requested if kind not in BATCH_TYPES]
+        if unknown:
+            raise HTTPException(status_code=400, detail=f"Unknown types: {', '.join(unknown)}")
+        collections = [BATCH_TYPES[kind][0] for kind in requested]
+    offset = decode_search_cursor(cursor)
+
+    async def render():
+        if SEARCH_BACKEND == "mongo":
+            total, hits = await search_mongo(q, collections, target, limit, offset)
+        else:
+            total, hits = search_index.search(
+                q, set(collections) if types is not None else None, target, limit=limit, offset=offset,
+            )
+        next_cursor = str(offset + limit) if offset + limit < total else None
+        return {"items": await load_hits(hits), "next_cursor": next_cursor, "total": total}
+
+    scopes = [(collection, target) for collection in collections]
+    return await cached_json(request, scopes, render)
+
+# Blobs are content-addressed, so a media URL never changes meaning
+MEDIA_CACHE_CONTROL = "public, max-age=31536000, immutable"
+
+@app.api_route("/api/media/{blob_id}", methods=["GET", "HEAD"])
+async def get_media(request: Request, blob_id: str):
+    blob = await repo.blobs.find_one({"_id": blob_id})
+    if blob is None or not await repo.run(blob_store.exists, blob_id):
+        raise HTTPException(status_code=404, detail="Media not found")
+    return await media_response(
+        request,
+        blob_store.path_for(blob_id),
+        blob["content_type"],
+        etag=f'"{blob_id}"',
+        cache_control=MEDIA_CACHE_CONTROL,
+    )
+
+@app.api_route("/api/media/{blob_id}/renditions/{name}", methods=["GET", "HEAD"])
+async def get_rendition(request: Request, blob_id: str, name: str):
+    blob = await repo.blobs.find_one({"_id": blob_id}, {"renditions": 1})
+    renditions = {rendition["name"]: rendition for rendition in (blob or {}).get("renditions", [])}
+    if name not in renditions:
+        raise HTTPException(status_code=404, detail="Rendition not found")
+    return await media_response(
+        request,
+        os.path.join(blob_store.derivative_dir(blob_id), name),
+        renditions[name]["content_type"],
+        etag=f'"{blob_id}-{name}"',
+        cache_control=MEDIA_CACHE_CONTROL,
+    )
 
 @app.get("/api/user/profile")
 async def get_profile(current_user: dict = Depends(get_current_user)):
@@ -318,72 +1675,176 @@ async def get_profile(current_user: dict = Depends(get_current_user)):
         "role": "author"
     }
 
+@app.get("/api/events")
+async def content_events(
+    types: Optional[str] = Query(None, alias="type"),
+    target: Optional[str] = None,
+):
+    wanted = None
+    if types is not None:
+        wanted = {kind.strip() for kind in types.split(",") if kind.strip()}
+        unknown = [kind for kind in wanted if kind not in BATCH_TYPES]
+        if unknown:
+            raise HTTPException(status_code=400, detail=f"Unknown types: {', '.join(sorted(unknown))}")
+    subscription = event_broker.subscribe(target, wanted)
+    if subscription is None:
+        raise HTTPException(status_code=503, detail="Too many event subscribers")
+
+    async def stream():
+        try:
+            yield b"retry: 3000\n\n"
+            while True:
+                try:
+                    event = await asyncio.wait_for(subscription.queue.get(), EVENTS_HEARTBEAT_SECONDS)
+                except asyncio.TimeoutError:
+                    # Comment line keeps proxies from closing an idle stream
+                    yield b": keepalive\n\n"
+                    continue
+                if event is None:
+                    # Fell behind and events were dropped; the client should refetch
+                    yield b"event: resync\ndata: {}\n\n"
+                    return
+                yield b"data: " + dumps(event) + b"\n\n"
+        finally:
+            event_broker.unsubscribe(subscription)
+
+    return StreamingResponse(
+        stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+@app.get("/api/metrics")
+async def get_metrics():
+    return Response(content=metrics.render(), media_type="text/plain; version=0.0.4; charset=utf-8")
+
+@app.get("/api/auth/cache")
+async def get_auth_cache_stats(current_user: dict = Depends(get_current_user)):
+    # Each hit is a jwt.decode and an Auth round trip saved
+    return token_cache.stats()
+
 @app.delete("/api/delete/music/{music_id}")
 async def delete_music(music_id: str, current_user: dict = Depends(get_current_user)):
-    result = db.music.delete_one({
+    deleted = await repo.music.find_one_and_delete({
         "_id": ObjectId(music_id), 
         "uploaded_by": current_user["username"]})
     
-    if result.deleted_count == 1:
+    if deleted is not None:
+        await repo.run(blob_store.release, deleted.get("blob_id"))
+        content_deleted("music", deleted)
+        await record_tombstones("music", [deleted])
         return {"message": "Music deleted successfully"}
     else:
         raise HTTPException(status_code=404, detail="Music not found or unauthorized")
 
 @app.delete("/api/delete/images/{image_id}")
 async def delete_image(image_id: str, current_user: dict = Depends(get_current_user)):
-    result = db.images.delete_one({
+    deleted = await repo.images.find_one_and_delete({
         "_id": ObjectId(image_id), 
         "uploaded_by": current_user["username"]})
     
-    if result.deleted_count == 1:
+    if deleted is not None:
+        await repo.run(blob_store.release, deleted.get("blob_id"))
+        content_deleted("images", deleted)
+        await record_tombstones("images", [deleted])
         return {"message": "Image deleted successfully"}
     else:
         raise HTTPException(status_code=404, detail="Image not found or unauthorized")
 
 @app.delete("/api/delete/videos/{video_id}")
 async def delete_video(video_id: str, current_user: dict = Depends(get_current_user)):
-    result = db.videos.delete_one({
+    deleted = await repo.videos.find_one_and_delete({
         "_id": ObjectId(video_id), 
         "uploaded_by": current_user["username"]})
     
-    if result.deleted_count == 1:
+    if deleted is not None:
+        await repo.run(blob_store.release, deleted.get("blob_id"))
+        content_deleted("videos", deleted)
+        await record_tombstones("videos", [deleted])
         return {"message": "Video deleted successfully"}
     else:
         raise HTTPException(status_code=404, detail="Video not found or unauthorized")
 
 @app.delete("/api/delete/poems/{poem_id}")
 async def delete_poem(poem_id: str, current_user: dict = Depends(get_current_user)):
-    result = db.poems.delete_one({
+    deleted = await repo.poems.find_one_and_delete({
         "_id": ObjectId(poem_id),
         "uploaded_by": current_user["username"]
     })
 
-    if result.deleted_count == 1:
+    if deleted is not None:
+        content_deleted("poems", deleted)
+        await record_tombstones("poems", [deleted])
         return {"message": "Poem deleted successfully"}
     else:
         raise HTTPException(status_code=404, detail="Poem not found or unauthorized")
 
+@app.post("/api/delete/batch")
+async def delete_batch(batch: BatchDelete, current_user: dict = Depends(get_current_user)):
+    if len(batch.items) > DELETE_BATCH_MAX_ITEMS:
+        raise HTTPException(status_code=400, detail=f"Batch exceeds {DELETE_BATCH_MAX_ITEMS} items")
+
+    not_found = []
+    requested = {}  # collection -> {ObjectId: item}
+    for item in batch.items:
+        kind = BATCH_TYPES.get(item.type)
+        if kind is None or not ObjectId.is_valid(item.id):
+            not_found.append({"type": item.type, "id": item.id})
+            continue
+        requested.setdefault(kind[0], {})[ObjectId(item.id)] = item
+
+    async def delete_from(collection, items):
+        owned = {"_id": {"$in": list(items)}, "uploaded_by": current_user["username"]}
+        # Fetch what the delete will remove so blobs and cache scopes can be cleaned up
+        docs = await repo[collection].find(owned, {"blob_id": 1, "target": 1})
+        if not docs:
+            return []
+        result = await repo[collection].delete_many({"_id": {"$in": [doc["_id"] for doc in docs]}, "uploaded_by": current_user["username"]})
+        if result.deleted_count != len(docs):
+            # A concurrent delete removed some of them and released their blobs; which ones
+            # is unknown, so keep every blob rather than risk releasing one twice
+            logger.warning("Batch delete in %s removed %d of %d documents", collection, result.deleted_count, len(docs))
+            docs = [{**doc, "blob_id": None} for doc in docs]
+        for doc in docs:
+            if doc.get("blob_id"):
+                await repo.run(blob_store.release, doc["blob_id"])
+            content_deleted(collection, doc)
+        await record_tombstones(collection, docs)
+        return [doc["_id"] for doc in docs]
+
+    collections = list(requested)
+    removed = await asyncio.gather(*(delete_from(collection, requested[collection]) for collection in collections))
+
+    deleted = []
+    for collection, ids in zip(collections, removed):
+        ids = set(ids)
+        for object_id, item in requested[collection].items():
+            entry = {"type": item.type, "id": item.id}
+            (deleted if object_id in ids else not_found).append(entry)
+
+    return {
+        "message": f"Deleted {len(deleted)} of {len(batch.items)} items",
+        "deleted": deleted,
+        "not_found": not_found,
+    }
+
 # Serve React app for all other routes (SPA fallback)
 @app.get("/{full_path:path}")
 async def serve_frontend(request: Request, full_path: str):
     # If the request is for an API route, return 404
     if full_path.startswith("api/") or full_path.startswith("docs") or full_path.startswith("openapi.json"):
         raise HTTPException(status_code=404, detail="Route not found")
-    
-    # For static files, try to serve them from the build directory
-    if os.path.exists(build_path):
-        # Check if it's a static file request
-        if full_path.startswith("static/") or full_path.endswith(('.mp4', '.js', '.css', '.png', '.jpg', '.jpeg', '.gif', '.ico', '.svg', '.woff', '.woff2')):
-            static_file_path = os.path.join(build_path, full_path)
-            if os.path.exists(static_file_path):
-                return FileResponse(static_file_path)
-        
-        # For all other routes, serve the React app
-        index_path = os.path.join(build_path, "index.html")
-        if os.path.exists(index_path):
-            return FileResponse(index_path)
-    
-    raise HTTPException(status_code=404, detail="Frontend not found")
+
+    # Known build files are served as-is; every other route gets the React app
+    asset = static_manifest.get(full_path) or static_manifest.get("index.html")
+    if asset is None:
+        raise HTTPException(status_code=404, detail="Frontend not found")
+
+    path, stat, etag, headers = asset.negotiate(request.headers.get("accept-encoding"))
+    return await media_response(
+        request, path, asset.content_type, etag=f'"{etag}"',
+        cache_control=asset.cache_control, stat=stat, headers=headers,
+    )
 
 if __name__ == "__main__":
     import uvicorn
@@ -0,0 +1,171 @@
+import os
+import re
+import gzip
+import hashlib
+import logging
+import mimetypes
+
+try:
+    import brotli
+except ImportError:  # .br siblings are still served if the build already produced them
+    brotli = None
+
+logger = logging.getLogger("shree_kara")
+
+# Precompressed siblings in order of preference: (Content-Encoding, file suffix)
+ENCODINGS = [("br", ".br"), ("gzip", ".gz")]
+
+COMPRESSIBLE_TYPES = ("text/", "application/javascript", "application/json", "image/svg+xml", "application/manifest+json")
+
+# Below this size compression saves less than the extra header and request work
+COMPRESS_MIN_BYTES = 1024
+
+# Files named like main.3f2a1b9c.js (the CRA build output) never change content
+HASHED_NAME = re.compile(r"\.[0-9a-f]{8,}\.(?:chunk\.)?[a-z0-9]+$")
+
+IMMUTABLE_CACHE_CONTROL = "public, max-age=31536000, immutable"
+
+
+class StaticAsset:
+    __slots__ = ("path", "stat", "content_type", "etag", "cache_control", "variants")
+
+    def __init__(self, path, stat, content_type, etag, cache_control, variants):
+        self.path = path
+        self.stat = stat
+        self.content_type = content_type
+        self.etag = etag
+        self.cache_control = cache_control
+        self.variants = variants  # encoding -> (path, stat)
+
+    def negotiate(self, accept_encoding):
+        """Pick the representation to serve for an Accept-Encoding header.
+
+        Returns ``(path, stat, etag, headers)``; each encoding gets its own
+        ETag, and ``Vary`` is set whenever the choice depended on the header.
+        """
+        headers = {"Vary": "Accept-Encoding"} if self.variants else {}
+        encoding = negotiate_encoding(accept_encoding, self.variants)
+        if not encoding:
+            return self.path, self.stat, self.etag, headers
+        path, stat = self.variants[encoding]
+        headers["Content-Encoding"] = encoding
+        return path, stat, f"{self.etag}-{encoding}", headers
+
+
+class StaticManifest:
+    """In-memory index of the frontend build directory.
+
+    Built once at startup so requests resolve with a dict lookup instead of
+    filesystem probes. Each entry carries the file's stat, a content hash for
+    its ETag and any gzip/brotli siblings, which are written next to
+    compressible files when missing or stale.
+    """
+
+    def __init__(self, root, compress=True):
+        self.root = root
+        self.compress = compress
+        self.assets = {}
+
+    def build(self):
+        assets = {}
+        if not os.path.isdir(self.root):
+            self.assets = assets
+            return assets
+
+        for directory, _, files in os.walk(self.root):
+            for name in files:
+                if name.endswith(tuple(suffix for _, suffix in ENCODINGS)):
+                    continue
+                path = os.path.join(directory, name)
+                relative = os.path.relpath(path, self.root).replace(os.sep, "/")
+                assets[relative] = self._index(relative, path)
+
+        self.assets = assets
+        logger.info("Indexed %d static assets under %s", len(assets), self.root)
+        return assets
+
+    def get(self, relative_path):
+        return self.assets.get(relative_path)
+
+    def _index(self, relative, path):
+        stat = os.stat(path)
+        content_type = mimetypes.guess_type(path)[0] or "application/octet-stream"
+        digest = hashlib.sha256()
+        with open(path, "rb") as f:
+            for chunk in iter(lambda: f.read(1024 * 1024), b""):
+                digest.update(chunk)
+
+        immutable = relative.startswith("static/") and HASHED_NAME.search(relative)
+        variants = {}
+        if content_type.startswith(COMPRESSIBLE_TYPES) and stat.st_size >= COMPRESS_MIN_BYTES:
+            variants = self._variants(path, stat)
+
+        return StaticAsset(
+            path=path,
+            stat=stat,
+            content_type=content_type,
+            etag=digest.hexdigest()[:32],
+            cache_control=IMMUTABLE_CACHE_CONTROL if immutable else "no-cache",
+            variants=variants,
+        )
+
+    def _variants(self, path, stat):
+        variants = {}
+        for encoding, suffix in ENCODINGS:
+            variant_path = path + suffix
+            if self.compress and not _is_fresh(variant_path, stat):
+                try:
+                    _write_compressed(path, variant_path, encoding)
+                except OSError as e:
+                    # e.g. a read-only build directory; the identity file is still served
+                    logger.warning("Could not precompress %s: %s", path, e)
+            if not _is_fresh(variant_path, stat):
+                continue
+            variant_stat = os.stat(variant_path)
+            # Keep a variant only when it is actually smaller
+            if variant_stat.st_size < stat.st_size:
+                variants[encoding] = (variant_path, variant_stat)
+        return variants
+
+
+def _is_fresh(variant_path, stat):
+    try:
+        return os.stat(variant_path).st_mtime >= stat.st_mtime
+    except FileNotFoundError:
+        return False
+
+
+def _write_compressed(path, variant_path, encoding):
+    if encoding == "br":
+        if brotli is None:
+            return
+        with open(path, "rb") as f:
+            data = brotli.compress(f.read(), quality=11)
+    else:
+        with open(path, "rb") as f:
+            data = gzip.compress(f.read(), compresslevel=9, mtime=0)
+    tmp_path = variant_path + ".tmp"
+    with open(tmp_path, "wb") as f:
+        f.write(data)
+    os.replace(tmp_path, variant_path)
+
+
+def negotiate_encoding(accept_encoding, available):
+    """Pick the preferred encoding in ``available`` that ``accept_encoding`` allows, or None."""
+    if not accept_encoding or not available:
+        return None
+    accepted = {}
+    for item in accept_encoding.split(","):
+        coding, _, params = item.strip().partition(";")
+        quality = 1.0
+        params = params.strip()
+        if params.startswith("q="):
+            try:
+                quality = float(params[2:])
+            except ValueError:
+                quality = 0.0
+        accepted[coding.strip().lower()] = quality
+    for encoding, _ in ENCODINGS:
+        if encoding in available and accepted.get(encoding, accepted.get("*", 0.0)) > 0:
+            return encoding
+    return None
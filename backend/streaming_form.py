@@ -0,0 +1,98 @@
+try:
+    from python_multipart.multipart import MultipartParser, parse_options_header
+except ImportError:
+    # python-multipart before 0.0.13 only ships the "multipart" package name
+    from multipart.multipart import MultipartParser, parse_options_header
+
+
+class FormError(ValueError):
+    pass
+
+
+class StreamingForm:
+    """Incremental parser for a multipart/form-data body with one file field.
+
+    Feed it the request body chunk by chunk. Text fields are collected into
+    ``fields``, and ``feed`` returns the file field's bytes parsed from each
+    chunk, so the caller can write them straight to storage instead of
+    having the whole upload spooled to a temporary file first, as
+    Starlette's ``UploadFile`` does. Raises FormError on malformed input.
+    """
+
+    def __init__(self, content_type, file_field="file", max_field_size=64 * 1024):
+        kind, options = parse_options_header(content_type)
+        if kind != b"multipart/form-data" or not options.get(b"boundary"):
+            raise FormError("Expected a multipart/form-data body")
+        self.file_field = file_field
+        self.max_field_size = max_field_size
+        self.fields = {}
+        self.file_received = False
+        self.file_content_type = None
+        self._file_data = bytearray()
+        self._headers = {}
+        self._header_field = bytearray()
+        self._header_value = bytearray()
+        self._name = None
+        self._in_file = False
+        self._value = bytearray()
+        self._parser = MultipartParser(options[b"boundary"], callbacks={
+            "on_part_begin": self._on_part_begin,
+            "on_header_field": self._on_header_field,
+            "on_header_value": self._on_header_value,
+            "on_header_end": self._on_header_end,
+            "on_headers_finished": self._on_headers_finished,
+            "on_part_data": self._on_part_data,
+            "on_part_end": self._on_part_end,
+        })
+
+    def feed(self, chunk):
+        """Parse one chunk of the body; returns the file bytes it contained."""
+        try:
+            self._parser.write(chunk)
+        except FormError:
+            raise
+        except Exception as e:
+            raise FormError(f"Malformed multipart body: {e}")
+        data, self._file_data = self._file_data, bytearray()
+        return data
+
+    def finish(self):
+        self._parser.finalize()
+
+    def _on_part_begin(self):
+        self._headers = {}
+        self._value = bytearray()
+
+    def _on_header_field(self, data, start, end):
+        self._header_field += data[start:end]
+
+    def _on_header_value(self, data, start, end):
+        self._header_value += data[start:end]
+
+    def _on_header_end(self):
+        self._headers[bytes(self._header_field).lower()] = bytes(self._header_value)
+        self._header_field = bytearray()
+        self._header_value = bytearray()
+
+    def _on_headers_finished(self):
+        _, options = parse_options_header(self._headers.get(b"content-disposition", b""))
+        self._name = options.get(b"name", b"").decode("utf-8", "replace")
+        self._in_file = self._name == self.file_field
+        if self._in_file:
+            if self.file_received:
+                raise FormError(f"Only one {self.file_field} part is accepted")
+            self.file_received = True
+            content_type = self._headers.get(b"content-type")
+            self.file_content_type = content_type.decode("latin-1").strip() if content_type else None
+
+    def _on_part_data(self, data, start, end):
+        if self._in_file:
+            self._file_data += data[start:end]
+            return
+        self._value += data[start:end]
+        if len(self._value) > self.max_field_size:
+            raise FormError(f"Field {self._name} exceeds {self.max_field_size} bytes")
+
+    def _on_part_end(self):
+        if not self._in_file:
+            self.fields[self._name] = self._value.decode("utf-8", "replace")
@@ -0,0 +1,85 @@
+import time
+import hashlib
+from collections import OrderedDict
+
+
+class TokenCache:
+    """Bounded LRU cache of validated bearer tokens.
+
+    Entries are keyed by the SHA-256 of the token so raw tokens are never
+    kept in memory, and expire after ``ttl_seconds`` or at the token's own
+    ``exp``, whichever comes first. Meant to be used from the event loop;
+    it does no locking of its own.
+    """
+
+    def __init__(self, max_entries=1024, ttl_seconds=60, clock=time.time):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.clock = clock
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._entries = OrderedDict()  # digest -> (expires_at, user)
+        self._by_username = {}  # username -> set of digests
+
+    @staticmethod
+    def _digest(token):
+        return hashlib.sha256(token.encode()).hexdigest()
+
+    def get(self, token):
+        digest = self._digest(token)
+        entry = self._entries.get(digest)
+        if entry is None:
+            self.misses += 1
+            return None
+        expires_at, user = entry
+        if expires_at <= self.clock():
+            self._remove(digest)
+            self.misses += 1
+            return None
+        self._entries.move_to_end(digest)
+        self.hits += 1
+        return user
+
+    def put(self, token, user, exp):
+        if self.max_entries <= 0:
+            return
+        expires_at = min(self.clock() + self.ttl_seconds, exp)
+        digest = self._digest(token)
+        self._entries[digest] = (expires_at, user)
+        self._entries.move_to_end(digest)
+        self._by_username.setdefault(user["username"], set()).add(digest)
+        while len(self._entries) > self.max_entries:
+            oldest = next(iter(self._entries))
+            self._remove(oldest)
+            self.evictions += 1
+
+    def invalidate_user(self, username):
+        """Forget every cached token for ``username``, e.g. after its Auth record changed."""
+        for digest in self._by_username.pop(username, set()):
+            self._entries.pop(digest, None)
+
+    def clear(self):
+        self._entries.clear()
+        self._by_username.clear()
+
+    def stats(self):
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "size": len(self._entries),
+            "max_entries": self.max_entries,
+            "ttl_seconds": self.ttl_seconds,
+        }
+
+    def _remove(self, digest):
+        entry = self._entries.pop(digest, None)
+        if entry is None:
+            return
+        username = entry[1]["username"]
+        digests = self._by_username.get(username)
+        if digests is not None:
+            digests.discard(digest)
+            if not digests:
+                del self._by_username[username]
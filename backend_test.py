@@ -7,12 +7,17 @@ Tests all authentication, upload, and retrieval endpoints
 import requests
 import json
 import base64
+import os
 import sys
+import time
 from datetime import datetime
 
 # Backend URL from environment
 BACKEND_URL = "http://localhost:8001"  # Using public endpoint for testing
 
+# Some checks exercise backend modules directly rather than over HTTP
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "backend"))
+
 class BackendTester:
     def __init__(self):
         self.base_url = BACKEND_URL
@@ -363,6 +368,66 @@ class BackendTester:
             self.log_test("Music Upload", False, "Connection error", str(e))
             return False
     
+    def test_token_cache(self):
+        """Test bearer token cache expiry, invalidation and stats"""
+        from token_cache import TokenCache
+
+        now = [1000.0]
+        cache = TokenCache(ttl_seconds=60, clock=lambda: now[0])
+        author = {"username": "testauthor"}
+        try:
+            # Entries expire at the token's exp when that comes before the TTL...
+            cache.put("short-lived", author, exp=now[0] + 30)
+            # ...and after the TTL otherwise
+            cache.put("long-lived", author, exp=now[0] + 3600)
+            now[0] += 29
+            if cache.get("short-lived") is None or cache.get("long-lived") is None:
+                self.log_test("Token Cache", False, "Entries expired early", cache.stats())
+                return False
+            now[0] += 2
+            if cache.get("short-lived") is not None:
+                self.log_test("Token Cache", False, "Entry outlived the token's exp")
+                return False
+            if cache.get("long-lived") is None:
+                self.log_test("Token Cache", False, "Entry expired before its TTL")
+                return False
+            now[0] += 30
+            if cache.get("long-lived") is not None:
+                self.log_test("Token Cache", False, "Entry outlived the cache TTL")
+                return False
+
+            # A password change invalidates every cached token of that author, and only theirs
+            cache.put("first", author, exp=now[0] + 3600)
+            cache.put("second", author, exp=now[0] + 3600)
+            cache.put("other", {"username": "someone-else"}, exp=now[0] + 3600)
+            cache.invalidate_user("testauthor")
+            if cache.get("first") is not None or cache.get("second") is not None or cache.get("other") is None:
+                self.log_test("Token Cache", False, "invalidate_user did not drop exactly that author's tokens", cache.stats())
+                return False
+        except Exception as e:
+            self.log_test("Token Cache", False, "Unexpected error", str(e))
+            return False
+
+        if not self.token:
+            self.log_test("Token Cache", False, "No authentication token available")
+            return False
+        try:
+            if requests.get(f"{self.base_url}/api/auth/cache").status_code != 401:
+                self.log_test("Token Cache", False, "Stats are readable without a token")
+                return False
+            headers = {"Authorization": f"Bearer {self.token}"}
+            before = requests.get(f"{self.base_url}/api/auth/cache", headers=headers).json()
+            after = requests.get(f"{self.base_url}/api/auth/cache", headers=headers).json()
+            if after.get("hits", 0) > before.get("hits", 0) and after.get("size", 0) >= 1:
+                self.log_test("Token Cache", True, "Expires at min(TTL, exp), invalidates per author, stats count hits")
+                return True
+            else:
+                self.log_test("Token Cache", False, "Repeated requests did not hit the cache", after)
+                return False
+        except Exception as e:
+            self.log_test("Token Cache", False, "Connection error", str(e))
+            return False
+
     def test_target_based_content_filtering(self):
         """Test target-based content filtering endpoints"""
         targets = ["eye", "shree", "dhantha", "kalaagruha", "music"]
@@ -376,10 +441,10 @@ class BackendTester:
                     
                     if response.status_code == 200:
                         data = response.json()
-                        if isinstance(data, list):
-                            self.log_test(f"Target Filter ({content_type}/{target})", True, f"Returns list with {len(data)} items")
+                        if isinstance(data.get("items"), list) and "next_cursor" in data:
+                            self.log_test(f"Target Filter ({content_type}/{target})", True, f"Returns page with {len(data['items'])} items")
                         else:
-                            self.log_test(f"Target Filter ({content_type}/{target})", False, "Expected list response", type(data))
+                            self.log_test(f"Target Filter ({content_type}/{target})", False, "Expected paginated response", data)
                             all_passed = False
                     else:
                         self.log_test(f"Target Filter ({content_type}/{target})", False, f"HTTP {response.status_code}", response.text)
@@ -465,6 +530,8 @@ class BackendTester:
         except Exception as e:
             self.log_test("Image Upload with Target", False, "Connection error", str(e))
             return False
+
+    def test_public_endpoints(self):
         """Test public content retrieval endpoints"""
         public_endpoints = [
             "/api/poems",
@@ -480,10 +547,10 @@ class BackendTester:
                 
                 if response.status_code == 200:
                     data = response.json()
-                    if isinstance(data, list):
-                        self.log_test(f"Public Endpoint ({endpoint})", True, f"Returns list with {len(data)} items")
+                    if isinstance(data.get("items"), list) and "next_cursor" in data:
+                        self.log_test(f"Public Endpoint ({endpoint})", True, f"Returns page with {len(data['items'])} items")
                     else:
-                        self.log_test(f"Public Endpoint ({endpoint})", False, "Expected list response", type(data))
+                        self.log_test(f"Public Endpoint ({endpoint})", False, "Expected paginated response", data)
                         all_passed = False
                 else:
                     self.log_test(f"Public Endpoint ({endpoint})", False, f"HTTP {response.status_code}", response.text)
@@ -494,6 +561,677 @@ class BackendTester:
         
         return all_passed
     
+    def test_listing_pagination(self):
+        """Test cursor pagination on a listing endpoint"""
+        try:
+            first = requests.get(f"{self.base_url}/api/poems", params={"limit": 1, "include_total": "true"})
+            if first.status_code != 200:
+                self.log_test("Listing Pagination", False, f"HTTP {first.status_code}", first.text)
+                return False
+
+            page = first.json()
+            if len(page["items"]) > 1 or "estimated_total" not in page:
+                self.log_test("Listing Pagination", False, "Limit or total not applied", page)
+                return False
+            if not page["next_cursor"]:
+                self.log_test("Listing Pagination", True, "Single page, no cursor returned")
+                return True
+
+            second = requests.get(f"{self.base_url}/api/poems", params={"limit": 1, "cursor": page["next_cursor"]})
+            next_page = second.json()
+            if second.status_code == 200 and next_page["items"] and next_page["items"][0]["_id"] != page["items"][0]["_id"]:
+                self.log_test("Listing Pagination", True, "Cursor returns the following page")
+                return True
+            else:
+                self.log_test("Listing Pagination", False, "Cursor did not advance", next_page)
+                return False
+        except Exception as e:
+            self.log_test("Listing Pagination", False, "Connection error", str(e))
+            return False
+
+    def test_listing_etags(self):
+        """Test listing revalidation: 304 while unchanged, a new ETag after an upload"""
+        if not self.token:
+            self.log_test("Listing ETags", False, "No authentication token available")
+            return False
+
+        headers = {"Authorization": f"Bearer {self.token}"}
+
+        try:
+            first = requests.get(f"{self.base_url}/api/poems/music")
+            etag = first.headers.get("ETag")
+            if first.status_code != 200 or not etag:
+                self.log_test("Listing ETags", False, f"HTTP {first.status_code} without an ETag", first.text)
+                return False
+
+            revalidated = requests.get(f"{self.base_url}/api/poems/music", headers={"If-None-Match": etag})
+            if revalidated.status_code != 304:
+                self.log_test("Listing ETags", False, f"Unchanged listing: HTTP {revalidated.status_code}", revalidated.text)
+                return False
+
+            poem = {"title": "ETag Test Poem", "content": "Changes the listing", "author": "Test Author", "target": "music"}
+            requests.post(f"{self.base_url}/api/upload/poem", json=poem, headers=headers)
+            changed = requests.get(f"{self.base_url}/api/poems/music", headers={"If-None-Match": etag})
+            titles = [item["title"] for item in changed.json().get("items", [])] if changed.status_code == 200 else []
+            if changed.headers.get("ETag") != etag and poem["title"] in titles:
+                self.log_test("Listing ETags", True, "304 while unchanged, new ETag and body after an upload")
+                return True
+            else:
+                self.log_test("Listing ETags", False, f"After upload: HTTP {changed.status_code}", changed.text)
+                return False
+        except Exception as e:
+            self.log_test("Listing ETags", False, "Connection error", str(e))
+            return False
+
+    def test_ndjson_listing(self):
+        """Test streaming a listing as NDJSON"""
+        try:
+            paged = requests.get(f"{self.base_url}/api/poems", params={"limit": 200}).json()
+            response = requests.get(f"{self.base_url}/api/poems", headers={"Accept": "application/x-ndjson"}, stream=True)
+            if response.status_code != 200 or not response.headers.get("Content-Type", "").startswith("application/x-ndjson"):
+                self.log_test("NDJSON Listing", False, f"HTTP {response.status_code}", response.text)
+                return False
+
+            items = [json.loads(line) for line in response.iter_lines() if line]
+            if [item["_id"] for item in items] == [item["_id"] for item in paged["items"]]:
+                self.log_test("NDJSON Listing", True, f"Streamed {len(items)} items, one per line, in listing order")
+                return True
+            else:
+                self.log_test("NDJSON Listing", False, "Streamed items differ from the paged listing")
+                return False
+        except Exception as e:
+            self.log_test("NDJSON Listing", False, "Connection error", str(e))
+            return False
+
+    def test_page_endpoint(self):
+        """Test the aggregated per-target page endpoint"""
+        try:
+            response = requests.get(f"{self.base_url}/api/pages/eye", params={"limit": 5, "sections": "images,poems"})
+            if response.status_code == 200:
+                data = response.json()
+                if set(data) == {"target", "images", "poems"} and all(len(data[s]["items"]) <= 5 for s in ("images", "poems")):
+                    self.log_test("Page Endpoint", True, "Returns the requested sections in one response")
+                    return True
+                else:
+                    self.log_test("Page Endpoint", False, "Unexpected sections or limits", data)
+                    return False
+            else:
+                self.log_test("Page Endpoint", False, f"HTTP {response.status_code}", response.text)
+                return False
+        except Exception as e:
+            self.log_test("Page Endpoint", False, "Connection error", str(e))
+            return False
+
+    def test_media_range_requests(self):
+        """Test byte-range and conditional requests on uploaded media"""
+        try:
+            listing = requests.get(f"{self.base_url}/api/images", params={"limit": 1}).json()
+            if not listing["items"]:
+                self.log_test("Media Range Requests", False, "No images available to fetch")
+                return False
+            url = f"{self.base_url}{listing['items'][0]['url']}"
+
+            response = requests.get(url, headers={"Range": "bytes=0-9"})
+            if response.status_code != 206 or len(response.content) != 10 or "content-range" not in response.headers:
+                self.log_test("Media Range Requests", False, f"Range request returned HTTP {response.status_code}")
+                return False
+
+            revalidated = requests.get(url, headers={"If-None-Match": response.headers["etag"]})
+            if revalidated.status_code == 304:
+                self.log_test("Media Range Requests", True, "Partial content and revalidation work")
+                return True
+            else:
+                self.log_test("Media Range Requests", False, f"Revalidation returned HTTP {revalidated.status_code}")
+                return False
+        except Exception as e:
+            self.log_test("Media Range Requests", False, "Connection error", str(e))
+            return False
+
+    def test_blob_dedup(self):
+        """Test that identical uploads share one blob, kept until the last copy is deleted"""
+        if not self.token:
+            self.log_test("Blob Deduplication", False, "No authentication token available")
+            return False
+
+        headers = {"Authorization": f"Bearer {self.token}"}
+        # Unique per run so the blob starts out unreferenced
+        audio = base64.b64encode(f"blob test {datetime.now().isoformat()}".encode()).decode()
+        music = {"title": "Blob Test Track", "music_data": audio, "target": "blobtest"}
+
+        try:
+            ids = [requests.post(f"{self.base_url}/api/upload/music", json=music, headers=headers).json()["music_id"] for _ in range(2)]
+            items = requests.get(f"{self.base_url}/api/music/blobtest", params={"limit": 200}).json()["items"]
+            urls = {item["url"] for item in items if item["_id"] in ids}
+            if len(urls) != 1:
+                self.log_test("Blob Deduplication", False, f"Identical uploads stored as {len(urls)} blobs")
+                return False
+            url = f"{self.base_url}{urls.pop()}"
+
+            requests.delete(f"{self.base_url}/api/delete/music/{ids[0]}", headers=headers)
+            remaining = requests.get(url)
+            if remaining.status_code != 200 or base64.b64encode(remaining.content).decode() != audio:
+                self.log_test("Blob Deduplication", False, f"Remaining copy: HTTP {remaining.status_code}")
+                return False
+
+            requests.delete(f"{self.base_url}/api/delete/music/{ids[1]}", headers=headers)
+            gone = requests.get(url)
+            if gone.status_code == 404:
+                self.log_test("Blob Deduplication", True, "One shared blob, served until its last copy was deleted")
+                return True
+            else:
+                self.log_test("Blob Deduplication", False, f"After deleting both copies: HTTP {gone.status_code}")
+                return False
+        except Exception as e:
+            self.log_test("Blob Deduplication", False, "Connection error", str(e))
+            return False
+
+    def test_multipart_uploads(self):
+        """Test the multipart file upload routes, including blob sharing between them"""
+        if not self.token:
+            self.log_test("Multipart Uploads", False, "No authentication token available")
+            return False
+
+        headers = {"Authorization": f"Bearer {self.token}"}
+        content = f"multipart test {datetime.now().isoformat()}".encode()
+        uploads = [
+            ("music", "music_id", "audio/mpeg"),
+            ("image", "image_id", "image/png"),
+            ("video", "video_id", "video/mp4"),
+        ]
+
+        try:
+            ids = {}
+            for kind, id_field, content_type in uploads:
+                response = requests.post(
+                    f"{self.base_url}/api/upload/{kind}/file",
+                    data={"title": f"Multipart Test {kind}", "target": "multiparttest"},
+                    files={"file": (f"test.{kind}", content, content_type)},
+                    headers=headers,
+                )
+                if response.status_code != 200 or id_field not in response.json():
+                    self.log_test("Multipart Uploads", False, f"/api/upload/{kind}/file: HTTP {response.status_code}", response.text)
+                    return False
+                ids[kind] = response.json()[id_field]
+
+            # The same bytes under three types share one blob
+            urls = set()
+            for collection in ("music", "images", "videos"):
+                items = requests.get(f"{self.base_url}/api/{collection}/multiparttest", params={"limit": 200}).json()["items"]
+                urls |= {item["url"] for item in items if item["_id"] in ids.values()}
+            if len(urls) != 1:
+                self.log_test("Multipart Uploads", False, f"Identical files stored as {len(urls)} blobs")
+                return False
+            url = f"{self.base_url}{urls.pop()}"
+
+            requests.delete(f"{self.base_url}/api/delete/music/{ids['music']}", headers=headers)
+            requests.delete(f"{self.base_url}/api/delete/images/{ids['image']}", headers=headers)
+            remaining = requests.get(url)
+            if remaining.status_code != 200 or remaining.content != content:
+                self.log_test("Multipart Uploads", False, f"Remaining copy: HTTP {remaining.status_code}")
+                return False
+
+            requests.delete(f"{self.base_url}/api/delete/videos/{ids['video']}", headers=headers)
+            gone = requests.get(url)
+            if gone.status_code == 404:
+                self.log_test("Multipart Uploads", True, "All three routes stored the file once, released with the last copy")
+                return True
+            else:
+                self.log_test("Multipart Uploads", False, f"After deleting every copy: HTTP {gone.status_code}")
+                return False
+        except Exception as e:
+            self.log_test("Multipart Uploads", False, "Connection error", str(e))
+            return False
+
+    def test_batch_upload(self):
+        """Test uploading several items in one request"""
+        if not self.token:
+            self.log_test("Batch Upload", False, "No authentication token available")
+            return False
+
+        headers = {"Authorization": f"Bearer {self.token}"}
+        items = [
+            {"type": "poem", "title": "Batch Poem 1", "content": "First verse", "author": "Test Author", "target": "eye"},
+            {"type": "poem", "title": "Batch Poem 2", "content": "Second verse", "author": "Test Author", "target": "eye"},
+            {"type": "poem", "title": "Incomplete Poem", "target": "eye"},
+        ]
+
+        try:
+            response = requests.post(f"{self.base_url}/api/upload/batch", json={"items": items}, headers=headers)
+            if response.status_code == 200:
+                data = response.json()
+                results = data.get("results", [])
+                if data.get("inserted") == 2 and "id" in results[0] and "error" in results[2]:
+                    self.log_test("Batch Upload", True, "Valid items inserted, invalid item reported")
+                    return True
+                else:
+                    self.log_test("Batch Upload", False, "Unexpected per-item results", data)
+                    return False
+            else:
+                self.log_test("Batch Upload", False, f"HTTP {response.status_code}", response.text)
+                return False
+        except Exception as e:
+            self.log_test("Batch Upload", False, "Connection error", str(e))
+            return False
+
+    def test_batch_delete(self):
+        """Test deleting several items in one request"""
+        if not self.token:
+            self.log_test("Batch Delete", False, "No authentication token available")
+            return False
+
+        headers = {"Authorization": f"Bearer {self.token}"}
+        poem = {"type": "poem", "title": "Poem To Delete", "content": "Short lived", "author": "Test Author", "target": "eye"}
+
+        try:
+            upload = requests.post(f"{self.base_url}/api/upload/batch", json={"items": [poem]}, headers=headers)
+            poem_id = upload.json()["results"][0]["id"]
+            items = [{"type": "poem", "id": poem_id}, {"type": "poem", "id": "000000000000000000000000"}]
+            response = requests.post(f"{self.base_url}/api/delete/batch", json={"items": items}, headers=headers)
+            if response.status_code == 200:
+                data = response.json()
+                if [item["id"] for item in data["deleted"]] == [poem_id] and len(data["not_found"]) == 1:
+                    self.log_test("Batch Delete", True, "Owned item deleted, missing item reported")
+                    return True
+                else:
+                    self.log_test("Batch Delete", False, "Unexpected deleted/not_found lists", data)
+                    return False
+            else:
+                self.log_test("Batch Delete", False, f"HTTP {response.status_code}", response.text)
+                return False
+        except Exception as e:
+            self.log_test("Batch Delete", False, "Connection error", str(e))
+            return False
+
+    def test_search(self):
+        """Test full-text search over uploaded content"""
+        if not self.token:
+            self.log_test("Search", False, "No authentication token available")
+            return False
+
+        headers = {"Authorization": f"Bearer {self.token}"}
+        poem = {"title": "Searchable Monsoon Verse", "content": "Rain over the hills", "author": "Test Author", "target": "eye"}
+
+        try:
+            requests.post(f"{self.base_url}/api/upload/poem", json=poem, headers=headers)
+            response = requests.get(f"{self.base_url}/api/search", params={"q": "monsoon", "type": "poem"})
+            if response.status_code == 200:
+                data = response.json()
+                titles = [item["title"] for item in data["items"]]
+                if poem["title"] in titles and all(item["type"] == "poem" for item in data["items"]):
+                    self.log_test("Search", True, f"Found {data['total']} matching item(s)")
+                    return True
+                else:
+                    self.log_test("Search", False, "Uploaded poem not found", data)
+                    return False
+            else:
+                self.log_test("Search", False, f"HTTP {response.status_code}", response.text)
+                return False
+        except Exception as e:
+            self.log_test("Search", False, "Connection error", str(e))
+            return False
+
+    def test_events(self):
+        """Test the server-sent event feed for uploads"""
+        if not self.token:
+            self.log_test("Events", False, "No authentication token available")
+            return False
+
+        headers = {"Authorization": f"Bearer {self.token}"}
+        poem = {"title": "Event Feed Verse", "content": "Pushed, not polled", "author": "Test Author", "target": "shree"}
+
+        try:
+            stream = requests.get(f"{self.base_url}/api/events", params={"type": "poem", "target": "shree"}, stream=True, timeout=10)
+            if stream.status_code != 200:
+                self.log_test("Events", False, f"HTTP {stream.status_code}", stream.text)
+                return False
+            requests.post(f"{self.base_url}/api/upload/poem", json=poem, headers=headers)
+            for line in stream.iter_lines(decode_unicode=True):
+                if line.startswith("data: "):
+                    event = json.loads(line[len("data: "):])
+                    stream.close()
+                    if event["op"] == "insert" and event["item"]["title"] == poem["title"]:
+                        self.log_test("Events", True, "Upload pushed to event stream")
+                        return True
+                    self.log_test("Events", False, "Unexpected event", event)
+                    return False
+            self.log_test("Events", False, "Stream ended without an event")
+            return False
+        except Exception as e:
+            self.log_test("Events", False, "Connection error", str(e))
+            return False
+
+    def test_delta_sync(self):
+        """Test ?since= delta sync with tombstones"""
+        if not self.token:
+            self.log_test("Delta Sync", False, "No authentication token available")
+            return False
+
+        headers = {"Authorization": f"Bearer {self.token}"}
+
+        try:
+            listing = requests.get(f"{self.base_url}/api/poems/dhantha").json()
+            token = listing["sync_token"]
+            added = {"title": "Delta Sync Added", "content": "New since the token", "author": "Test Author", "target": "dhantha"}
+            removed = {"title": "Delta Sync Removed", "content": "Deleted since the token", "author": "Test Author", "target": "dhantha"}
+            requests.post(f"{self.base_url}/api/upload/poem", json=added, headers=headers)
+            removed_id = requests.post(f"{self.base_url}/api/upload/poem", json=removed, headers=headers).json()["poem_id"]
+            requests.delete(f"{self.base_url}/api/delete/poems/{removed_id}", headers=headers)
+
+            response = requests.get(f"{self.base_url}/api/poems/dhantha", params={"since": token})
+            if response.status_code == 200:
+                data = response.json()
+                titles = [item["title"] for item in data["items"]]
+                if added["title"] in titles and removed["title"] not in titles and removed_id in data["deleted"] and data["sync_token"]:
+                    self.log_test("Delta Sync", True, f"{len(titles)} added and {len(data['deleted'])} deleted since token")
+                    return True
+                else:
+                    self.log_test("Delta Sync", False, "Delta does not match the changes", data)
+                    return False
+            else:
+                self.log_test("Delta Sync", False, f"HTTP {response.status_code}", response.text)
+                return False
+        except Exception as e:
+            self.log_test("Delta Sync", False, "Connection error", str(e))
+            return False
+
+    def test_resumable_upload(self):
+        """Test the resumable video upload protocol"""
+        if not self.token:
+            self.log_test("Resumable Upload", False, "No authentication token available")
+            return False
+
+        headers = {"Authorization": f"Bearer {self.token}"}
+        video = b"\x00\x00\x00\x18ftypmp42" + bytes(range(256)) * 400
+
+        try:
+            response = requests.post(f"{self.base_url}/api/upload/video/resumable", json={
+                "title": "Resumable Test Video", "target": "eye", "size": len(video), "content_type": "video/mp4"
+            }, headers=headers)
+            if response.status_code != 201:
+                self.log_test("Resumable Upload", False, f"Create: HTTP {response.status_code}", response.text)
+                return False
+            location = f"{self.base_url}{response.headers['Location']}"
+
+            chunk_headers = {**headers, "Content-Type": "application/offset+octet-stream"}
+            half = len(video) // 2
+            requests.patch(location, data=video[:half], headers={**chunk_headers, "Upload-Offset": "0"})
+            offset = int(requests.head(location, headers=headers).headers["Upload-Offset"])
+            requests.patch(location, data=video[offset:], headers={**chunk_headers, "Upload-Offset": str(offset)})
+
+            response = requests.post(f"{location}/complete", headers=headers)
+            if response.status_code == 200 and "video_id" in response.json():
+                self.log_test("Resumable Upload", True, f"Uploaded {len(video)} bytes in two chunks (resumed at {offset})")
+                return True
+            else:
+                self.log_test("Resumable Upload", False, f"Complete: HTTP {response.status_code}", response.text)
+                return False
+        except Exception as e:
+            self.log_test("Resumable Upload", False, "Connection error", str(e))
+            return False
+
+    def test_media_probe(self):
+        """Test that uploads are probed by a background job"""
+        if not self.token:
+            self.log_test("Media Probe", False, "No authentication token available")
+            return False
+
+        headers = {"Authorization": f"Bearer {self.token}"}
+        # A 1x1 PNG sent without a data: prefix, so the upload assumes image/jpeg
+        image = {
+            "title": "Probe Test Image",
+            "image_data": "iVBORw0KGgoAAAANSUhEUgAAAAEAAAABCAYAAAAfFcSJAAAADUlEQVR42mNkYPhfDwAChwGA60e6kgAAAABJRU5ErkJggg==",
+            "target": "shree"
+        }
+
+        try:
+            response = requests.post(f"{self.base_url}/api/upload/image", json=image, headers=headers)
+            if response.status_code != 200 or "job_id" not in response.json():
+                self.log_test("Media Probe", False, f"Upload: HTTP {response.status_code}", response.text)
+                return False
+            job_url = f"{self.base_url}/api/jobs/{response.json()['job_id']}"
+
+            job = {}
+            for _ in range(60):
+                job = requests.get(job_url, headers=headers).json()
+                if job.get("state") in ("done", "failed"):
+                    break
+                time.sleep(0.5)
+
+            result = job.get("result") or {}
+            if job.get("state") == "done" and result.get("content_type") == "image/png" and result.get("width") == 1:
+                self.log_test("Media Probe", True, f"Probed as {result['content_type']} {result['width']}x{result['height']}")
+                return True
+            else:
+                self.log_test("Media Probe", False, "Job did not report the image's real type and size", job)
+                return False
+        except Exception as e:
+            self.log_test("Media Probe", False, "Connection error", str(e))
+            return False
+
+    def test_image_renditions(self):
+        """Test that image uploads get resized renditions served with their listed type and size"""
+        if not self.token:
+            self.log_test("Image Renditions", False, "No authentication token available")
+            return False
+
+        from io import BytesIO
+        from PIL import Image
+
+        buffer = BytesIO()
+        Image.new("RGB", (400, 200), (200, 80, 40)).save(buffer, format="PNG")
+        headers = {"Authorization": f"Bearer {self.token}"}
+        image = {
+            "title": f"Rendition Test Image {time.time()}",
+            "image_data": "data:image/png;base64," + base64.b64encode(buffer.getvalue()).decode(),
+            "target": "shree"
+        }
+
+        try:
+            response = requests.post(f"{self.base_url}/api/upload/image", json=image, headers=headers)
+            if response.status_code != 200:
+                self.log_test("Image Renditions", False, f"Upload: HTTP {response.status_code}", response.text)
+                return False
+
+            # Renditions are rendered after the response, so wait for them to appear in the listing
+            renditions = []
+            for _ in range(60):
+                items = requests.get(f"{self.base_url}/api/images", params={"target": "shree", "limit": 100}).json()["items"]
+                item = next((item for item in items if item["title"] == image["title"]), None)
+                renditions = (item or {}).get("renditions") or []
+                if renditions:
+                    break
+                time.sleep(0.5)
+
+            if sorted(rendition["content_type"] for rendition in renditions) != ["image/jpeg", "image/webp"]:
+                self.log_test("Image Renditions", False, "Expected a WebP and a JPEG rendition", renditions)
+                return False
+            for rendition in renditions:
+                served = requests.get(f"{self.base_url}{rendition['url']}")
+                if served.status_code != 200 or served.headers.get("Content-Type") != rendition["content_type"]:
+                    self.log_test("Image Renditions", False, f"{rendition['url']}: HTTP {served.status_code} as {served.headers.get('Content-Type')}")
+                    return False
+                with Image.open(BytesIO(served.content)) as rendered:
+                    if rendered.size != (rendition["width"], rendition["height"]) or rendered.size != (256, 128):
+                        self.log_test("Image Renditions", False, f"{rendition['url']} is {rendered.size}", rendition)
+                        return False
+
+            self.log_test("Image Renditions", True, "256x128 WebP and JPEG renditions served as listed")
+            return True
+        except Exception as e:
+            self.log_test("Image Renditions", False, "Connection error", str(e))
+            return False
+
+    def test_metrics(self):
+        """Test the Prometheus metrics endpoint"""
+        try:
+            requests.get(f"{self.base_url}/api/poems")
+            response = requests.get(f"{self.base_url}/api/metrics")
+            if response.status_code == 200:
+                if 'http_request_duration_seconds_count{method="GET",route="/api/poems"' in response.text:
+                    self.log_test("Metrics", True, "Per-route latency histograms exported")
+                    return True
+                else:
+                    self.log_test("Metrics", False, "No latency series for /api/poems")
+                    return False
+            else:
+                self.log_test("Metrics", False, f"HTTP {response.status_code}", response.text)
+                return False
+        except Exception as e:
+            self.log_test("Metrics", False, "Connection error", str(e))
+            return False
+
+    def test_readiness(self):
+        """Test the readiness probe"""
+        try:
+            response = requests.get(f"{self.base_url}/api/ready")
+            if response.status_code == 200 and response.json().get("status") == "ready":
+                self.log_test("Readiness", True, "Server reports ready")
+                return True
+            else:
+                self.log_test("Readiness", False, f"HTTP {response.status_code}", response.text)
+                return False
+        except Exception as e:
+            self.log_test("Readiness", False, "Connection error", str(e))
+            return False
+
+    def test_static_assets(self):
+        """Test caching headers and precompressed variants of frontend build files"""
+        import tempfile
+        from static_manifest import IMMUTABLE_CACHE_CONTROL, StaticManifest
+
+        script = "console.log('Shree Kara Studios');\n" * 100
+        try:
+            with tempfile.TemporaryDirectory() as build:
+                os.makedirs(os.path.join(build, "static", "js"))
+                paths = {
+                    "index.html": "<!doctype html><div id=\"root\"></div>\n" + "<!-- padding -->\n" * 100,
+                    "static/js/main.3f2a1b9c.js": script,
+                    "favicon.ico": "tiny",
+                }
+                for relative, content in paths.items():
+                    with open(os.path.join(build, relative), "w") as f:
+                        f.write(content)
+                # A brotli sibling from the build, which is served even without the brotli module
+                with open(os.path.join(build, "static/js/main.3f2a1b9c.js.br"), "wb") as f:
+                    f.write(b"br")
+
+                manifest = StaticManifest(build)
+                manifest.build()
+                bundle = manifest.get("static/js/main.3f2a1b9c.js")
+                index = manifest.get("index.html")
+                favicon = manifest.get("favicon.ico")
+
+                if bundle.cache_control != IMMUTABLE_CACHE_CONTROL or "immutable" not in bundle.cache_control:
+                    self.log_test("Static Assets", False, f"Hashed bundle sent with {bundle.cache_control}")
+                    return False
+                if index.cache_control != "no-cache" or favicon.cache_control != "no-cache":
+                    self.log_test("Static Assets", False, "Unhashed files must be revalidated", [index.cache_control, favicon.cache_control])
+                    return False
+
+                expected = {
+                    "br, gzip, deflate": "br",
+                    "gzip, br;q=0": "gzip",
+                    "gzip": "gzip",
+                    "identity": None,
+                    None: None,
+                }
+                for accept_encoding, encoding in expected.items():
+                    path, _, etag, headers = bundle.negotiate(accept_encoding)
+                    suffix = {"br": ".br", "gzip": ".gz", None: ""}[encoding]
+                    if (
+                        headers.get("Content-Encoding") != encoding
+                        or headers.get("Vary") != "Accept-Encoding"
+                        or not path.endswith("main.3f2a1b9c.js" + suffix)
+                        or (encoding is not None) != etag.endswith(f"-{encoding}")
+                    ):
+                        self.log_test("Static Assets", False, f"Accept-Encoding {accept_encoding!r} gave {path}", headers)
+                        return False
+
+                # Files too small to compress have a single representation, so no Vary
+                if favicon.negotiate("gzip, br")[3]:
+                    self.log_test("Static Assets", False, "Uncompressed file sent with encoding headers")
+                    return False
+
+            self.log_test("Static Assets", True, "Immutable hashed assets, no-cache index.html, br/gzip negotiated with Vary")
+            return True
+        except Exception as e:
+            self.log_test("Static Assets", False, "Unexpected error", str(e))
+            return False
+
+    def test_profiling_gate(self):
+        """Test that only requests with the profiling token are profiled, one at a time"""
+        import asyncio
+        import pstats
+        import tempfile
+        from profiling import ProfilingMiddleware
+
+        # Holds /slow open so a second profiling request overlaps it
+        release = asyncio.Event()
+
+        async def app(scope, receive, send):
+            if scope["path"] == "/slow":
+                await release.wait()
+            await send({"type": "http.response.start", "status": 200, "headers": []})
+            await send({"type": "http.response.body", "body": b"ok"})
+
+        async def call(middleware, path="/", headers=(), query=b""):
+            scope = {"type": "http", "method": "GET", "path": path, "headers": list(headers), "query_string": query}
+            messages = []
+
+            async def receive():
+                return {"type": "http.request", "body": b"", "more_body": False}
+
+            async def send(message):
+                messages.append(message)
+
+            await middleware(scope, receive, send)
+            start = messages[0]
+            return start["status"], dict(start.get("headers", []))
+
+        async def check(output_dir):
+            middleware = ProfilingMiddleware(app, "secret", output_dir)
+            for headers, query in [((), b""), ([(b"x-profile", b"wrong")], b""), ((), b"profile=wrong")]:
+                status, response_headers = await call(middleware, headers=headers, query=query)
+                if status != 200 or b"x-profile-file" in response_headers:
+                    return f"Profiled without the right token: {headers} {query}"
+            if os.listdir(output_dir):
+                return "Wrote a profile without the right token"
+
+            for mode, extension in [(None, ".folded"), (b"cprofile", ".prof")]:
+                headers = [(b"x-profile", b"secret")] + ([(b"x-profile-mode", mode)] if mode else [])
+                status, response_headers = await call(middleware, headers=headers)
+                name = response_headers.get(b"x-profile-file", b"").decode()
+                if status != 200 or not name.endswith(extension) or not os.path.isfile(os.path.join(output_dir, name)):
+                    return f"{mode or b'sample'} mode: HTTP {status}, file {name!r}"
+            pstats.Stats(os.path.join(output_dir, name))
+
+            status, response_headers = await call(middleware, query=b"profile=secret")
+            if b"x-profile-file" not in response_headers:
+                return "The ?profile= token was ignored"
+
+            first = asyncio.create_task(call(middleware, "/slow", [(b"x-profile", b"secret")]))
+            await asyncio.sleep(0.05)
+            status, _ = await call(middleware, headers=[(b"x-profile", b"secret")])
+            unprofiled, _ = await call(middleware)
+            release.set()
+            first_status, _ = await first
+            if status != 409 or unprofiled != 200 or first_status != 200:
+                return f"Concurrent profile: HTTP {status}, unprofiled HTTP {unprofiled}, first HTTP {first_status}"
+            return None
+
+        try:
+            with tempfile.TemporaryDirectory() as output_dir:
+                problem = asyncio.run(check(output_dir))
+            if problem is None:
+                self.log_test("Profiling Gate", True, "Token required, sample and cProfile files written, overlap gets 409")
+                return True
+            else:
+                self.log_test("Profiling Gate", False, problem)
+                return False
+        except Exception as e:
+            self.log_test("Profiling Gate", False, "Unexpected error", str(e))
+            return False
+
     def run_all_tests(self):
         """Run all test suites"""
         print("=" * 60)
@@ -507,6 +1245,7 @@ class BackendTester:
             ("Invalid Login", self.test_login_invalid_credentials),
             ("Protected Routes (No Auth)", self.test_protected_route_without_token),
             ("Protected Routes (With Auth)", self.test_protected_route_with_token),
+            ("Token Cache", self.test_token_cache),
             ("Target-based Content Filtering", self.test_target_based_content_filtering),
             ("Poem Upload with Target", self.test_poem_upload_with_target),
             ("Image Upload with Target", self.test_image_upload_with_target),
@@ -515,7 +1254,26 @@ class BackendTester:
             ("Image Upload", self.test_image_upload),
             ("Video Upload", self.test_video_upload),
             ("Music Upload", self.test_music_upload),
-            ("Public Endpoints", self.test_public_endpoints)
+            ("Public Endpoints", self.test_public_endpoints),
+            ("Listing Pagination", self.test_listing_pagination),
+            ("Listing ETags", self.test_listing_etags),
+            ("NDJSON Listing", self.test_ndjson_listing),
+            ("Page Endpoint", self.test_page_endpoint),
+            ("Media Range Requests", self.test_media_range_requests),
+            ("Blob Deduplication", self.test_blob_dedup),
+            ("Multipart Uploads", self.test_multipart_uploads),
+            ("Batch Upload", self.test_batch_upload),
+            ("Batch Delete", self.test_batch_delete),
+            ("Search", self.test_search),
+            ("Events", self.test_events),
+            ("Delta Sync", self.test_delta_sync),
+            ("Resumable Upload", self.test_resumable_upload),
+            ("Media Probe", self.test_media_probe),
+            ("Image Renditions", self.test_image_renditions),
+            ("Metrics", self.test_metrics),
+            ("Readiness", self.test_readiness),
+            ("Static Assets", self.test_static_assets),
+            ("Profiling Gate", self.test_profiling_gate)
         ]
         
         passed = 0
@@ -1,6 +1,9 @@
-import React, { useState, useEffect } from 'react';
+import React, { useState, useEffect, useRef } from 'react';
 import { useNavigate } from 'react-router-dom';
 import axios from 'axios';
+import useContentEvents from './useContentEvents';
+import LoadMore from './LoadMore';
+import { usePagedListing } from './pagedContent';
 import './Author.css';
 
 const Author = () => {
@@ -46,42 +49,53 @@ const Author = () => {
     setIsLoggedIn(true);
   };
 
+  // Each list shows its first page and loads more on demand; the counts come from estimated_total
+  const backendUrl = process.env.REACT_APP_BACKEND_URL || 'http://localhost:8001';
+  const setSection = (key) => (update) => setContent(prev => ({ ...prev, [key]: update(prev[key]) }));
+  const listings = {
+    poems: usePagedListing(`${backendUrl}/api/poems`, setSection('poems'), { include_total: true }),
+    images: usePagedListing(`${backendUrl}/api/images`, setSection('images'), { include_total: true }),
+    videos: usePagedListing(`${backendUrl}/api/videos`, setSection('videos'), { include_total: true }),
+    music: usePagedListing(`${backendUrl}/api/music`, setSection('music'), { include_total: true })
+  };
+
   const fetchContent = async () => {
     try {
-      const backendUrl = process.env.REACT_APP_BACKEND_URL || 'http://localhost:8001';
-      const [poemsRes, imagesRes, videosRes, musicRes] = await Promise.all([
-        axios.get(`${backendUrl}/api/poems`),
-        axios.get(`${backendUrl}/api/images`),
-        axios.get(`${backendUrl}/api/videos`),
-        axios.get(`${backendUrl}/api/music`)
-      ]);
+      const [poems, images, videos, music] = await Promise.all(
+        ['poems', 'images', 'videos', 'music'].map(collection => listings[collection].reload())
+      );
       
       setStats({
-        poems: poemsRes.data.length,
-        images: imagesRes.data.length,
-        videos: videosRes.data.length,
-        music: musicRes.data.length
-      });
-      setContent({
-        poems: poemsRes.data,
-        images: imagesRes.data,
-        videos: videosRes.data,
-        music: musicRes.data
+        poems: poems.estimated_total,
+        images: images.estimated_total,
+        videos: videos.estimated_total,
+        music: music.estimated_total
       });
     } catch (error) {
       console.error('Error fetching content:', error);
     }
   };
 
-  const convertFileToBase64 = (file) => {
-    return new Promise((resolve, reject) => {
-      const reader = new FileReader();
-      reader.readAsDataURL(file);
-      reader.onload = () => resolve(reader.result.split(',')[1]);
-      reader.onerror = error => reject(error);
-    });
+  // Applies a list update to one content type and keeps its count in step
+  const contentRef = useRef(content);
+  contentRef.current = content;
+  const patchContent = (key) => (update) => {
+    const before = contentRef.current[key];
+    const after = update(before);
+    if (after === before) return;
+    contentRef.current = { ...contentRef.current, [key]: after };
+    setContent(prev => ({ ...prev, [key]: after }));
+    setStats(prev => ({ ...prev, [key]: Math.max(0, (prev[key] || 0) + after.length - before.length) }));
   };
 
+  // Uploads and deletes, from this tab or any other, arrive through the event feed
+  useContentEvents(
+    backendUrl,
+    null,
+    { poem: patchContent('poems'), image: patchContent('images'), video: patchContent('videos'), music: patchContent('music') },
+    fetchContent
+  );
+
   const showNotification = (message, type) => {
     const notification = document.createElement('div');
     notification.className = `notification notification-${type}`;
@@ -112,11 +126,45 @@ const Author = () => {
     }, 3000);
   };
 
+  // Sends a file through the resumable upload routes in chunks; a failed chunk is
+  // retried from the offset the server last committed instead of from zero
+  const RESUMABLE_CHUNK_SIZE = 8 * 1024 * 1024;
+  const RESUMABLE_RETRIES = 5;
+
+  const uploadResumable = async (backendUrl, token, file, metadata) => {
+    const headers = { 'Authorization': `Bearer ${token}` };
+    const created = await axios.post(`${backendUrl}/api/upload/video/resumable`, {
+      ...metadata,
+      size: file.size,
+      content_type: file.type || 'video/mp4'
+    }, { headers });
+    const location = `${backendUrl}${created.headers.location}`;
+
+    let offset = 0;
+    let failures = 0;
+    while (offset < file.size) {
+      try {
+        const response = await axios.patch(location, file.slice(offset, offset + RESUMABLE_CHUNK_SIZE), {
+          headers: { ...headers, 'Content-Type': 'application/offset+octet-stream', 'Upload-Offset': String(offset) }
+        });
+        offset = Number(response.headers['upload-offset']);
+        failures = 0;
+      } catch (error) {
+        if (error.response && error.response.status !== 409) throw error;
+        failures += 1;
+        if (failures > RESUMABLE_RETRIES) throw error;
+        await new Promise(resolve => setTimeout(resolve, 1000 * failures));
+        const status = await axios.head(location, { headers });
+        offset = Number(status.headers['upload-offset']);
+      }
+    }
+    await axios.post(`${location}/complete`, null, { headers });
+  };
+
   const handleUpload = async () => {
     setUploadLoading(true);
 
     try {
-      const backendUrl = process.env.REACT_APP_BACKEND_URL || 'http://localhost:8001';
       const token = localStorage.getItem('token');
       
       let uploadPayload = {};
@@ -141,55 +189,50 @@ const Author = () => {
           setUploadLoading(false);
           return;
         }
-        const base64Data = await convertFileToBase64(uploadData.file);
-        uploadPayload = {
-          title: uploadData.title,
-          description: uploadData.description,
-          image_data: base64Data,
-          target: targetSection
-        };
-        endpoint = '/api/upload/image';
+        uploadPayload = new FormData();
+        uploadPayload.append('title', uploadData.title);
+        uploadPayload.append('description', uploadData.description);
+        uploadPayload.append('target', targetSection);
+        uploadPayload.append('file', uploadData.file);
+        endpoint = '/api/upload/image/file';
       } else if (uploadType === 'video') {
         if (!uploadData.file || !uploadData.title) {
           showNotification('Please select a video file and enter a title', 'error');
           setUploadLoading(false);
           return;
         }
-        const base64Data = await convertFileToBase64(uploadData.file);
-        uploadPayload = {
+        await uploadResumable(backendUrl, token, uploadData.file, {
           title: uploadData.title,
           description: uploadData.description,
-          video_data: base64Data,
           target: targetSection
-        };
-        endpoint = '/api/upload/video';
+        });
+        endpoint = null;
       } else if (uploadType === 'music') {
         if (!uploadData.file || !uploadData.title) {
           showNotification('Please select a music file and enter a title', 'error');
           setUploadLoading(false);
           return;
         }
-        const base64Data = await convertFileToBase64(uploadData.file);
-        uploadPayload = {
-          title: uploadData.title,
-          description: uploadData.description,
-          artist: uploadData.artist,
-          music_data: base64Data,
-          target: targetSection
-        };
-        endpoint = '/api/upload/music';
+        uploadPayload = new FormData();
+        uploadPayload.append('title', uploadData.title);
+        uploadPayload.append('description', uploadData.description);
+        uploadPayload.append('artist', uploadData.artist);
+        uploadPayload.append('target', targetSection);
+        uploadPayload.append('file', uploadData.file);
+        endpoint = '/api/upload/music/file';
       }
 
-      await axios.post(`${backendUrl}${endpoint}`, uploadPayload, {
-        headers: {
-          'Authorization': `Bearer ${token}`,
-          'Content-Type': 'application/json'
-        }
-      });
+      // Files go as multipart/form-data; axios sets the boundary header itself
+      if (endpoint) {
+        await axios.post(`${backendUrl}${endpoint}`, uploadPayload, {
+          headers: {
+            'Authorization': `Bearer ${token}`
+          }
+        });
+      }
 
       showNotification('Content uploaded successfully!', 'success');
       setUploadData({ title: '', content: '', author: '', artist: '', description: '', file: null });
-      fetchContent();
     } catch (error) {
       showNotification('Upload failed: ' + (error.response?.data?.detail || 'Unknown error'), 'error');
     } finally {
@@ -201,7 +244,6 @@ const Author = () => {
     if (!window.confirm('Are you sure you want to delete this item?')) return;
     
     try {
-      const backendUrl = process.env.REACT_APP_BACKEND_URL || 'http://localhost:8001';
       const token = localStorage.getItem('token');
 
       if (!token) {
@@ -209,20 +251,23 @@ const Author = () => {
         return;
       }
 
-      let endpoint = '';
-      if (type === 'poem') endpoint = `/api/delete/poems/${id}`;
-      else if (type === 'image') endpoint = `/api/delete/images/${id}`;
-      else if (type === 'video') endpoint = `/api/delete/videos/${id}`;
-      else if (type === 'music') endpoint = `/api/delete/music/${id}`;
-
-      await axios.delete(`${backendUrl}${endpoint}`, {
+      const response = await axios.post(`${backendUrl}/api/delete/batch`, {
+        items: [{ type, id }]
+      }, {
         headers: {
           'Authorization': `Bearer ${token}`,
         },
       });
 
+      if (response.data.deleted.length === 0) {
+        showNotification('Deletion failed: Item not found or unauthorized', 'error');
+        return;
+      }
+
+      // Drop the item locally instead of refetching every listing; the matching event is then a no-op
+      const key = { poem: 'poems', image: 'images', video: 'videos', music: 'music' }[type];
+      patchContent(key)(items => items.filter(item => item._id !== id));
       showNotification('Deleted successfully!', 'success');
-      fetchContent();  
     } catch (error) {
       showNotification('Deletion failed: ' + (error.response?.data?.detail || 'Unknown error'), 'error');
     }
@@ -459,6 +504,7 @@ const Author = () => {
                   <button onClick={() => deleteContent('poem', item._id)} className="delete-btn">Delete</button>
                 </div>
               ))}
+              <LoadMore hasMore={listings.poems.hasMore} loading={listings.poems.isLoading} onLoadMore={listings.poems.loadMore} />
             </div>
           )}
           {/* Images */}
@@ -474,6 +520,7 @@ const Author = () => {
                   <button onClick={() => deleteContent('image', item._id)} className="delete-btn">Delete</button>
                 </div>
               ))}
+              <LoadMore hasMore={listings.images.hasMore} loading={listings.images.isLoading} onLoadMore={listings.images.loadMore} />
             </div>
           )}
           {/* Videos */}
@@ -489,6 +536,7 @@ const Author = () => {
                   <button onClick={() => deleteContent('video', item._id)} className="delete-btn">Delete</button>
                 </div>
               ))}
+              <LoadMore hasMore={listings.videos.hasMore} loading={listings.videos.isLoading} onLoadMore={listings.videos.loadMore} />
             </div>
           )}
           {/* Music */}
@@ -504,6 +552,7 @@ const Author = () => {
                   <button onClick={() => deleteContent('music', item._id)} className="delete-btn">Delete</button>
                 </div>
               ))}
+              <LoadMore hasMore={listings.music.hasMore} loading={listings.music.isLoading} onLoadMore={listings.music.loadMore} />
             </div>
           )}
         </div>
@@ -1,10 +1,14 @@
 import React, { useState, useEffect, useRef } from 'react';
 import { useNavigate } from 'react-router-dom';
-import axios from 'axios';
+import ResponsiveImage from './ResponsiveImage';
+import useContentEvents from './useContentEvents';
+import LoadMore from './LoadMore';
+import { usePageSections } from './pagedContent';
 import './Dhantha.css';
 
 const Dhantha = () => {
   const navigate = useNavigate();
+  const backendUrl = process.env.REACT_APP_BACKEND_URL || 'http://localhost:8001';
   const [images, setImages] = useState([]);
   const [videos, setVideos] = useState([]);
   const [poems, setPoems] = useState([]);
@@ -16,29 +20,22 @@ const Dhantha = () => {
   const videosRef = useRef(null);
   const musicRef = useRef(null);
 
+  const paging = usePageSections(backendUrl, 'dhantha', { images: setImages, videos: setVideos, poems: setPoems, music: setMusic });
+
   useEffect(() => {
     fetchContent();
   }, []);
 
   const fetchContent = async () => {
     try {
-      const backendUrl = process.env.REACT_APP_BACKEND_URL || 'http://localhost:8001';
-      const [imagesRes, videosRes, poemsRes, musicRes] = await Promise.all([
-        axios.get(`${backendUrl}/api/images/dhantha`),
-        axios.get(`${backendUrl}/api/videos/dhantha`),
-        axios.get(`${backendUrl}/api/poems/dhantha`),
-        axios.get(`${backendUrl}/api/music/dhantha`)
-      ]);
-      
-      setImages(imagesRes.data);
-      setVideos(videosRes.data);
-      setPoems(poemsRes.data);
-      setMusic(musicRes.data);
+      await paging.reload();
     } catch (error) {
       console.error('Error fetching content:', error);
     }
   };
 
+  useContentEvents(backendUrl, 'dhantha', { image: setImages, video: setVideos, poem: setPoems, music: setMusic }, fetchContent);
+
   const goBack = () => {
     navigate('/');
   };
@@ -114,8 +111,9 @@ const Dhantha = () => {
                 {images.map((image) => (
                   <div key={image._id} className="content-card image-card">
                     <div className="image-container">
-                      <img 
-                        src={`data:image/jpeg;base64,${image.image_data}`} 
+                      <ResponsiveImage
+                        image={image}
+                        backendUrl={backendUrl}
                         alt={image.title} 
                         className="content-image"
                       />
@@ -136,6 +134,7 @@ const Dhantha = () => {
                   </div>
                 ))}
               </div>
+              <LoadMore hasMore={paging.hasMore('images')} loading={paging.isLoading('images')} onLoadMore={() => paging.loadMore('images')} />
             </div>
           )}
 
@@ -153,7 +152,8 @@ const Dhantha = () => {
                       <video 
                         controls 
                         className="content-video"
-                        src={`data:video/mp4;base64,${video.video_data}`} 
+                        src={`${backendUrl}${video.url}`}
+                        preload="metadata" 
                       />
                     </div>
                     <div className="card-content">
@@ -170,6 +170,7 @@ const Dhantha = () => {
                   </div>
                 ))}
               </div>
+              <LoadMore hasMore={paging.hasMore('videos')} loading={paging.isLoading('videos')} onLoadMore={() => paging.loadMore('videos')} />
             </div>
           )}
 
@@ -1,10 +1,14 @@
 import React, { useState, useEffect, useRef } from 'react';
 import { useNavigate } from 'react-router-dom';
-import axios from 'axios';
+import ResponsiveImage from './ResponsiveImage';
+import useContentEvents from './useContentEvents';
+import LoadMore from './LoadMore';
+import { usePageSections } from './pagedContent';
 import './Eye.css';
 
 const Eye = () => {
   const navigate = useNavigate();
+  const backendUrl = process.env.REACT_APP_BACKEND_URL || 'http://localhost:8001';
   const [images, setImages] = useState([]);
   const [videos, setVideos] = useState([]);
   const [poems, setPoems] = useState([]);
@@ -14,27 +18,22 @@ const Eye = () => {
   const imagesRef = useRef(null);
   const videosRef = useRef(null);
 
+  const paging = usePageSections(backendUrl, 'eye', { images: setImages, videos: setVideos, poems: setPoems });
+
   useEffect(() => {
     fetchContent();
   }, []);
 
   const fetchContent = async () => {
     try {
-      const backendUrl = process.env.REACT_APP_BACKEND_URL || 'http://localhost:8001';
-      const [imagesRes, videosRes, poemsRes] = await Promise.all([
-        axios.get(`${backendUrl}/api/images/eye`),
-        axios.get(`${backendUrl}/api/videos/eye`),
-        axios.get(`${backendUrl}/api/poems/eye`),
-      ]);
-      
-      setImages(imagesRes.data);
-      setVideos(videosRes.data);
-      setPoems(poemsRes.data);
+      await paging.reload();
     } catch (error) {
       console.error('Error fetching content:', error);
     }
   };
 
+  useContentEvents(backendUrl, 'eye', { image: setImages, video: setVideos, poem: setPoems }, fetchContent);
+
   const goBack = () => {
     navigate('/');
   };
@@ -110,8 +109,9 @@ const Eye = () => {
                 {images.map((image) => (
                   <div key={image._id} className="content-card image-card">
                     <div className="image-container">
-                      <img 
-                        src={`data:image/jpeg;base64,${image.image_data}`} 
+                      <ResponsiveImage
+                        image={image}
+                        backendUrl={backendUrl}
                         alt={image.title} 
                         className="content-image"
                       />
@@ -132,6 +132,7 @@ const Eye = () => {
                   </div>
                 ))}
               </div>
+              <LoadMore hasMore={paging.hasMore('images')} loading={paging.isLoading('images')} onLoadMore={() => paging.loadMore('images')} />
             </div>
           )}
 
@@ -149,7 +150,8 @@ const Eye = () => {
                       <video 
                         controls 
                         className="content-video"
-                        src={`data:video/mp4;base64,${video.video_data}`} 
+                        src={`${backendUrl}${video.url}`}
+                        preload="metadata" 
                       />
                     </div>
                     <div className="card-content">
@@ -166,6 +168,7 @@ const Eye = () => {
                   </div>
                 ))}
               </div>
+              <LoadMore hasMore={paging.hasMore('videos')} loading={paging.isLoading('videos')} onLoadMore={() => paging.loadMore('videos')} />
             </div>
           )}
 
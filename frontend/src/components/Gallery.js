@@ -1,5 +1,6 @@
 import React, { useState, useEffect } from 'react';
-import axios from 'axios';
+import LoadMore from './LoadMore';
+import { usePagedListing } from './pagedContent';
 import './Gallery.css';
 
 const Gallery = () => {
@@ -9,19 +10,16 @@ const Gallery = () => {
   const [loading, setLoading] = useState(true);
   const [selectedImage, setSelectedImage] = useState(null);
 
+  const imageListing = usePagedListing('/api/images', setImages);
+  const poemListing = usePagedListing('/api/poems', setPoems);
+
   useEffect(() => {
     fetchContent();
   }, []);
 
   const fetchContent = async () => {
     try {
-      const [imagesResponse, poemsResponse] = await Promise.all([
-        axios.get('/api/images'),
-        axios.get('/api/poems')
-      ]);
-      
-      setImages(imagesResponse.data);
-      setPoems(poemsResponse.data);
+      await Promise.all([imageListing.reload(), poemListing.reload()]);
     } catch (error) {
       console.error('Error fetching content:', error);
     } finally {
@@ -64,62 +62,68 @@ const Gallery = () => {
       </div>
 
       {activeTab === 'images' && (
-        <div className="images-grid">
-          {images.length === 0 ? (
-            <div className="empty-state">
-              <i className="fas fa-image"></i>
-              <p>No images uploaded yet</p>
-            </div>
-          ) : (
-            images.map((image) => (
-              <div 
-                key={image._id} 
-                className="image-card"
-                onClick={() => setSelectedImage(image)}
-              >
-                <div className="image-wrapper">
-                  <img src={image.image_data} alt={image.title} />
-                  <div className="image-overlay">
-                    <h3>{image.title}</h3>
-                    <p>{image.description}</p>
+        <>
+          <div className="images-grid">
+            {images.length === 0 ? (
+              <div className="empty-state">
+                <i className="fas fa-image"></i>
+                <p>No images uploaded yet</p>
+              </div>
+            ) : (
+              images.map((image) => (
+                <div 
+                  key={image._id} 
+                  className="image-card"
+                  onClick={() => setSelectedImage(image)}
+                >
+                  <div className="image-wrapper">
+                    <img src={image.url} alt={image.title} loading="lazy" />
+                    <div className="image-overlay">
+                      <h3>{image.title}</h3>
+                      <p>{image.description}</p>
+                    </div>
+                  </div>
+                  <div className="card-info">
+                    <h4>{image.title}</h4>
+                    <p className="upload-info">
+                      By {image.uploaded_by} • {formatDate(image.uploaded_at)}
+                    </p>
                   </div>
                 </div>
-                <div className="card-info">
-                  <h4>{image.title}</h4>
-                  <p className="upload-info">
-                    By {image.uploaded_by} • {formatDate(image.uploaded_at)}
-                  </p>
-                </div>
-              </div>
-            ))
-          )}
-        </div>
+              ))
+            )}
+          </div>
+          <LoadMore hasMore={imageListing.hasMore} loading={imageListing.isLoading} onLoadMore={imageListing.loadMore} />
+        </>
       )}
 
       {activeTab === 'poems' && (
-        <div className="poems-grid">
-          {poems.length === 0 ? (
-            <div className="empty-state">
-              <i className="fas fa-pen"></i>
-              <p>No poems uploaded yet</p>
-            </div>
-          ) : (
-            poems.map((poem) => (
-              <div key={poem._id} className="poem-card">
-                <h3>{poem.title}</h3>
-                <p className="poem-author">By {poem.author}</p>
-                <div className="poem-content">
-                  {poem.content.split('\n').map((line, index) => (
-                    <p key={index}>{line}</p>
-                  ))}
-                </div>
-                <p className="upload-info">
-                  Uploaded by {poem.uploaded_by} • {formatDate(poem.uploaded_at)}
-                </p>
+        <>
+          <div className="poems-grid">
+            {poems.length === 0 ? (
+              <div className="empty-state">
+                <i className="fas fa-pen"></i>
+                <p>No poems uploaded yet</p>
               </div>
-            ))
-          )}
-        </div>
+            ) : (
+              poems.map((poem) => (
+                <div key={poem._id} className="poem-card">
+                  <h3>{poem.title}</h3>
+                  <p className="poem-author">By {poem.author}</p>
+                  <div className="poem-content">
+                    {poem.content.split('\n').map((line, index) => (
+                      <p key={index}>{line}</p>
+                    ))}
+                  </div>
+                  <p className="upload-info">
+                    Uploaded by {poem.uploaded_by} • {formatDate(poem.uploaded_at)}
+                  </p>
+                </div>
+              ))
+            )}
+          </div>
+          <LoadMore hasMore={poemListing.hasMore} loading={poemListing.isLoading} onLoadMore={poemListing.loadMore} />
+        </>
       )}
 
       {/* Image Modal */}
@@ -132,7 +136,7 @@ const Gallery = () => {
             >
               <i className="fas fa-times"></i>
             </button>
-            <img src={selectedImage.image_data} alt={selectedImage.title} />
+            <img src={selectedImage.url} alt={selectedImage.title} />
             <div className="modal-info">
               <h3>{selectedImage.title}</h3>
               {selectedImage.description && <p>{selectedImage.description}</p>}
@@ -1,10 +1,14 @@
 import React, { useState, useEffect, useRef } from 'react';
 import { useNavigate } from 'react-router-dom';
-import axios from 'axios';
+import ResponsiveImage from './ResponsiveImage';
+import useContentEvents from './useContentEvents';
+import LoadMore from './LoadMore';
+import { usePageSections } from './pagedContent';
 import './Kalaagruha.css';
 
 const Kalaagruha = () => {
   const navigate = useNavigate();
+  const backendUrl = process.env.REACT_APP_BACKEND_URL || 'http://localhost:8001';
   const [poems, setPoems] = useState([]);
   const [images, setImages] = useState([]);
   const [videos, setVideos] = useState([]);
@@ -16,29 +20,22 @@ const Kalaagruha = () => {
   const videosRef = useRef(null);
   const musicRef = useRef(null);
 
+  const paging = usePageSections(backendUrl, 'kalaagruha', { poems: setPoems, images: setImages, videos: setVideos, music: setMusic });
+
   useEffect(() => {
     fetchContent();
   }, []);
 
   const fetchContent = async () => {
     try {
-      const backendUrl = process.env.REACT_APP_BACKEND_URL || 'http://localhost:8001';
-      const [poemsRes, imagesRes, videosRes, musicRes] = await Promise.all([
-        axios.get(`${backendUrl}/api/poems/kalaagruha`),
-        axios.get(`${backendUrl}/api/images/kalaagruha`),
-        axios.get(`${backendUrl}/api/videos/kalaagruha`),
-        axios.get(`${backendUrl}/api/music/kalaagruha`)
-      ]);
-      
-      setPoems(poemsRes.data);
-      setImages(imagesRes.data);
-      setVideos(videosRes.data);
-      setMusic(musicRes.data);
+      await paging.reload();
     } catch (error) {
       console.error('Error fetching content:', error);
     }
   };
 
+  useContentEvents(backendUrl, 'kalaagruha', { poem: setPoems, image: setImages, video: setVideos, music: setMusic }, fetchContent);
+
   const goBack = () => {
     navigate('/');
   };
@@ -116,6 +113,7 @@ const Kalaagruha = () => {
                   </div>
                 ))}
               </div>
+              <LoadMore hasMore={paging.hasMore('poems')} loading={paging.isLoading('poems')} onLoadMore={() => paging.loadMore('poems')} />
             </div>
           )}
 
@@ -128,8 +126,9 @@ const Kalaagruha = () => {
                   <div key={image._id} className="content-card image-card">
                     <h3 className="item-title">{image.title}</h3>
                     <div className="image-container">
-                      <img 
-                        src={`data:image/jpeg;base64,${image.image_data}`} 
+                      <ResponsiveImage
+                        image={image}
+                        backendUrl={backendUrl}
                         alt={image.title} 
                         className="content-image"
                       />
@@ -140,6 +139,7 @@ const Kalaagruha = () => {
                   </div>
                 ))}
               </div>
+              <LoadMore hasMore={paging.hasMore('images')} loading={paging.isLoading('images')} onLoadMore={() => paging.loadMore('images')} />
             </div>
           )}
 
@@ -155,7 +155,8 @@ const Kalaagruha = () => {
                       <video 
                         controls 
                         className="content-video"
-                        src={`data:video/mp4;base64,${video.video_data}`} 
+                        src={`${backendUrl}${video.url}`}
+                        preload="metadata" 
                       />
                     </div>
                     {video.description && (
@@ -164,6 +165,7 @@ const Kalaagruha = () => {
                   </div>
                 ))}
               </div>
+              <LoadMore hasMore={paging.hasMore('videos')} loading={paging.isLoading('videos')} onLoadMore={() => paging.loadMore('videos')} />
             </div>
           )}
 
@@ -182,7 +184,8 @@ const Kalaagruha = () => {
                       <audio 
                         controls 
                         className="content-audio"
-                        src={`data:audio/mpeg;base64,${track.music_data}`} 
+                        src={`${backendUrl}${track.url}`}
+                        preload="metadata" 
                       />
                     </div>
                     {track.description && (
@@ -191,6 +194,7 @@ const Kalaagruha = () => {
                   </div>
                 ))}
               </div>
+              <LoadMore hasMore={paging.hasMore('music')} loading={paging.isLoading('music')} onLoadMore={() => paging.loadMore('music')} />
             </div>
           )}
 
@@ -0,0 +1,33 @@
+import React, { useEffect, useRef } from 'react';
+
+// Ends a paged list: loads the next page when scrolled into view, with a
+// button for browsers without IntersectionObserver (or impatient readers).
+// Renders nothing once the list is exhausted.
+const LoadMore = ({ hasMore, loading, onLoadMore, className = 'load-more' }) => {
+  const sentinel = useRef(null);
+
+  useEffect(() => {
+    if (!hasMore || loading || !sentinel.current || !('IntersectionObserver' in window)) return undefined;
+    const observer = new IntersectionObserver((entries) => {
+      if (entries[0].isIntersecting) {
+        onLoadMore();
+      }
+    }, { rootMargin: '400px' });
+    observer.observe(sentinel.current);
+    return () => observer.disconnect();
+  }, [hasMore, loading]);
+
+  if (!hasMore) {
+    return null;
+  }
+
+  return (
+    <div ref={sentinel} className={className} style={{ display: 'flex', justifyContent: 'center', margin: '1.5rem 0' }}>
+      <button type="button" onClick={onLoadMore} disabled={loading}>
+        {loading ? 'Loading...' : 'Load more'}
+      </button>
+    </div>
+  );
+};
+
+export default LoadMore;
@@ -1,38 +1,36 @@
 import React, { useState, useEffect } from 'react';
 import { useNavigate } from 'react-router-dom';
-import axios from 'axios';
+import ResponsiveImage from './ResponsiveImage';
+import useContentEvents from './useContentEvents';
+import LoadMore from './LoadMore';
+import { usePageSections } from './pagedContent';
 import './Music.css';
 
 const Music = () => {
   const navigate = useNavigate();
+  const backendUrl = process.env.REACT_APP_BACKEND_URL || 'http://localhost:8001';
   const [music, setMusic] = useState([]);
   const [images, setImages] = useState([]);
   const [videos, setVideos] = useState([]);
   const [poems, setPoems] = useState([]);
   const [currentlyPlaying, setCurrentlyPlaying] = useState(null);
 
+  const paging = usePageSections(backendUrl, 'music', { music: setMusic, images: setImages, videos: setVideos, poems: setPoems });
+
   useEffect(() => {
     fetchContent();
   }, []);
 
   const fetchContent = async () => {
     try {
-      const backendUrl = process.env.REACT_APP_BACKEND_URL || 'http://localhost:8001';
-      const [musicRes, imagesRes, videosRes, poemsRes] = await Promise.all([
-        axios.get(`${backendUrl}/api/music/music`),
-        axios.get(`${backendUrl}/api/images/music`),
-        axios.get(`${backendUrl}/api/videos/music`),
-        axios.get(`${backendUrl}/api/poems/music`)
-      ]);
-      setMusic(musicRes.data);
-      setImages(imagesRes.data);
-      setVideos(videosRes.data);
-      setPoems(poemsRes.data);
+      await paging.reload();
     } catch (error) {
       console.error('Error fetching music:', error);
     }
   };
 
+  useContentEvents(backendUrl, 'music', { music: setMusic, image: setImages, video: setVideos, poem: setPoems }, fetchContent);
+
   const goBack = () => {
     navigate('/');
   };
@@ -105,6 +103,7 @@ const Music = () => {
                   </div>
                 ))}
               </div>
+              <LoadMore hasMore={paging.hasMore('poems')} loading={paging.isLoading('poems')} onLoadMore={() => paging.loadMore('poems')} />
             </div>
           )}
 
@@ -130,8 +129,9 @@ const Music = () => {
                     {image.description && (
                       <p style={{ color: '#ccc', marginBottom: '1rem' }}>{image.description}</p>
                     )}
-                    <img
-                      src={`data:image/jpeg;base64,${image.image_data}`}
+                    <ResponsiveImage
+                      image={image}
+                      backendUrl={backendUrl}
                       alt={image.title}
                       style={{ width: '100%', borderRadius: '10px', marginBottom: '1rem' }}
                     />
@@ -141,6 +141,7 @@ const Music = () => {
                   </div>
                 ))}
               </div>
+              <LoadMore hasMore={paging.hasMore('images')} loading={paging.isLoading('images')} onLoadMore={() => paging.loadMore('images')} />
             </div>
           )}
 
@@ -169,7 +170,8 @@ const Music = () => {
                     <video
                       controls
                       style={{ width: '100%', borderRadius: '10px' }}
-                      src={`data:video/mp4;base64,${video.video_data}`}
+                      src={`${backendUrl}${video.url}`}
+                      preload="metadata"
                     />
                     <p style={{ fontSize: '0.8rem', color: '#888', marginTop: '0.5rem' }}>
                       Uploaded by: {video.uploaded_by} | {new Date(video.uploaded_at).toLocaleDateString()}
@@ -177,6 +179,7 @@ const Music = () => {
                   </div>
                 ))}
               </div>
+              <LoadMore hasMore={paging.hasMore('videos')} loading={paging.isLoading('videos')} onLoadMore={() => paging.loadMore('videos')} />
             </div>
           )}
 
@@ -205,7 +208,8 @@ const Music = () => {
                       <div className="music-player">
                         <audio
                           id={`audio-${track._id}`}
-                          src={`data:audio/mpeg;base64,${track.music_data}`}
+                          src={`${backendUrl}${track.url}`}
+                          preload="metadata"
                           onEnded={() => setCurrentlyPlaying(null)}
                         />
                         <button
@@ -231,6 +235,7 @@ const Music = () => {
                     </div>
                   ))}
                 </div>
+                <LoadMore hasMore={paging.hasMore('music')} loading={paging.isLoading('music')} onLoadMore={() => paging.loadMore('music')} />
               </div>
             ) : null}
           </div>
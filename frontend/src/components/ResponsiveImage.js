@@ -0,0 +1,29 @@
+import React from 'react';
+
+// Renders a listed image through its server-generated renditions so the
+// browser picks a size that fits, preferring WebP with a JPEG fallback.
+const ResponsiveImage = ({ image, backendUrl, sizes = '(max-width: 768px) 100vw, 33vw', ...imgProps }) => {
+  const renditions = image.renditions || [];
+  const srcSetFor = (contentType) => renditions
+    .filter((rendition) => rendition.content_type === contentType)
+    .map((rendition) => `${backendUrl}${rendition.url} ${rendition.width}w`)
+    .join(', ');
+
+  const webpSrcSet = srcSetFor('image/webp');
+  const jpegSrcSet = srcSetFor('image/jpeg');
+
+  return (
+    <picture>
+      {webpSrcSet && <source type="image/webp" srcSet={webpSrcSet} sizes={sizes} />}
+      <img
+        src={`${backendUrl}${image.url}`}
+        srcSet={jpegSrcSet || undefined}
+        sizes={jpegSrcSet ? sizes : undefined}
+        loading="lazy"
+        {...imgProps}
+      />
+    </picture>
+  );
+};
+
+export default ResponsiveImage;
@@ -1,37 +1,34 @@
 import React, { useState, useEffect } from 'react';
 import { useNavigate } from 'react-router-dom';
-import axios from 'axios';
+import ResponsiveImage from './ResponsiveImage';
+import useContentEvents from './useContentEvents';
+import LoadMore from './LoadMore';
+import { usePageSections } from './pagedContent';
 
 const Shree = () => {
   const navigate = useNavigate();
+  const backendUrl = process.env.REACT_APP_BACKEND_URL || 'http://localhost:8001';
   const [poems, setPoems] = useState([]);
   const [images, setImages] = useState([]);
   const [videos, setVideos] = useState([]);
   const [music, setMusic] = useState([]);
 
+  const paging = usePageSections(backendUrl, 'shree', { poems: setPoems, images: setImages, videos: setVideos, music: setMusic });
+
   useEffect(() => {
     fetchContent();
   }, []);
 
   const fetchContent = async () => {
     try {
-      const backendUrl = process.env.REACT_APP_BACKEND_URL || 'http://localhost:8001';
-      const [poemsRes, imagesRes, videosRes, musicRes] = await Promise.all([
-        axios.get(`${backendUrl}/api/poems/shree`),
-        axios.get(`${backendUrl}/api/images/shree`),
-        axios.get(`${backendUrl}/api/videos/shree`),
-        axios.get(`${backendUrl}/api/music/shree`)
-      ]);
-      
-      setPoems(poemsRes.data);
-      setImages(imagesRes.data);
-      setVideos(videosRes.data);
-      setMusic(musicRes.data);
+      await paging.reload();
     } catch (error) {
       console.error('Error fetching content:', error);
     }
   };
 
+  useContentEvents(backendUrl, 'shree', { poem: setPoems, image: setImages, video: setVideos, music: setMusic }, fetchContent);
+
   const goBack = () => {
     navigate('/');
   };
@@ -139,6 +136,7 @@ const Shree = () => {
                   </div>
                 ))}
               </div>
+              <LoadMore hasMore={paging.hasMore('poems')} loading={paging.isLoading('poems')} onLoadMore={() => paging.loadMore('poems')} />
             </div>
           )}
 
@@ -163,8 +161,9 @@ const Shree = () => {
                     {image.description && (
                       <p style={{ color: '#ccc', marginBottom: '1rem' }}>{image.description}</p>
                     )}
-                    <img
-                      src={`data:image/jpeg;base64,${image.image_data}`}
+                    <ResponsiveImage
+                      image={image}
+                      backendUrl={backendUrl}
                       alt={image.title}
                       style={{ width: '100%', borderRadius: '10px', marginBottom: '1rem' }}
                     />
@@ -174,6 +173,7 @@ const Shree = () => {
                   </div>
                 ))}
               </div>
+              <LoadMore hasMore={paging.hasMore('images')} loading={paging.isLoading('images')} onLoadMore={() => paging.loadMore('images')} />
             </div>
           )}
 
@@ -201,7 +201,8 @@ const Shree = () => {
                     <video
                       controls
                       style={{ width: '100%', borderRadius: '10px' }}
-                      src={`data:video/mp4;base64,${video.video_data}`}
+                      src={`${backendUrl}${video.url}`}
+                      preload="metadata"
                     />
                     <p style={{ fontSize: '0.8rem', color: '#888', marginTop: '0.5rem' }}>
                       Uploaded by: {video.uploaded_by} | {new Date(video.uploaded_at).toLocaleDateString()}
@@ -209,6 +210,7 @@ const Shree = () => {
                   </div>
                 ))}
               </div>
+              <LoadMore hasMore={paging.hasMore('videos')} loading={paging.isLoading('videos')} onLoadMore={() => paging.loadMore('videos')} />
             </div>
           )}
 
@@ -239,7 +241,8 @@ const Shree = () => {
                     <audio
                       controls
                       style={{ width: '100%', marginBottom: '1rem' }}
-                      src={`data:audio/mpeg;base64,${track.music_data}`}
+                      src={`${backendUrl}${track.url}`}
+                      preload="metadata"
                     />
                     <p style={{ fontSize: '0.8rem', color: '#888' }}>
                       Uploaded by: {track.uploaded_by} | {new Date(track.uploaded_at).toLocaleDateString()}
@@ -247,6 +250,7 @@ const Shree = () => {
                   </div>
                 ))}
               </div>
+              <LoadMore hasMore={paging.hasMore('music')} loading={paging.isLoading('music')} onLoadMore={() => paging.loadMore('music')} />
             </div>
           )}
 
@@ -0,0 +1,97 @@
+import { useRef, useState } from 'react';
+import axios from 'axios';
+
+// Adds a page to a list, skipping items the event feed already inserted
+const appendPage = (items, page) => {
+  const seen = new Set(items.map(item => item._id));
+  return [...items, ...page.filter(item => !seen.has(item._id))];
+};
+
+// Cursor state shared by the hooks below. `fetchPages(cursors)` requests the
+// sections named in `cursors` and resolves to {section: page}; `setters` maps
+// sections to state setters, which are always called with an update function.
+const useCursors = (setters, fetchPages) => {
+  const [cursors, setCursors] = useState({});
+  const [loading, setLoading] = useState({});
+  const cursorsRef = useRef({});
+  const loadingRef = useRef({});
+  // Bumped by reload so a page requested before it is not appended afterwards
+  const generation = useRef(0);
+
+  const storeCursors = (next) => {
+    cursorsRef.current = { ...cursorsRef.current, ...next };
+    setCursors(cursorsRef.current);
+  };
+
+  const markLoading = (section, value) => {
+    loadingRef.current = { ...loadingRef.current, [section]: value };
+    setLoading(loadingRef.current);
+  };
+
+  // First page of every section, replacing what is listed
+  const reload = async () => {
+    generation.current += 1;
+    const sections = Object.keys(setters);
+    const pages = await fetchPages(Object.fromEntries(sections.map(section => [section, null])));
+    const next = {};
+    sections.forEach(section => {
+      setters[section](() => pages[section].items);
+      next[section] = pages[section].next_cursor;
+    });
+    storeCursors(next);
+    return pages;
+  };
+
+  // Next page of one section, appended to what is listed
+  const loadMore = async (section) => {
+    const cursor = cursorsRef.current[section];
+    if (!cursor || loadingRef.current[section]) return;
+    const started = generation.current;
+    markLoading(section, true);
+    try {
+      const pages = await fetchPages({ [section]: cursor });
+      if (generation.current !== started) return;
+      setters[section](items => appendPage(items, pages[section].items));
+      storeCursors({ [section]: pages[section].next_cursor });
+    } catch (error) {
+      console.error(`Error loading more ${section}:`, error);
+    } finally {
+      markLoading(section, false);
+    }
+  };
+
+  return {
+    reload,
+    loadMore,
+    hasMore: section => Boolean(cursors[section]),
+    isLoading: section => Boolean(loading[section]),
+  };
+};
+
+// Sections of /api/pages/{target}, one page at a time. `setters` maps
+// section names ('poems', 'images', 'videos', 'music') to state setters.
+export const usePageSections = (backendUrl, target, setters) => useCursors(setters, async (cursors) => {
+  const params = { sections: Object.keys(cursors).join(',') };
+  Object.entries(cursors).forEach(([section, cursor]) => {
+    if (cursor) {
+      params[`${section}_cursor`] = cursor;
+    }
+  });
+  const { data } = await axios.get(`${backendUrl}/api/pages/${target}`, { params });
+  return data;
+});
+
+// One listing route, one page at a time. `reload` resolves to the first
+// page, so fields such as estimated_total can be read from it.
+export const usePagedListing = (url, setItems, params = {}) => {
+  const paged = useCursors({ items: setItems }, async ({ items: cursor }) => {
+    const { data } = await axios.get(url, { params: cursor ? { ...params, cursor } : params });
+    return { items: data };
+  });
+  return {
+    reload: async () => (await paged.reload()).items,
+    loadMore: () => paged.loadMore('items'),
+    hasMore: paged.hasMore('items'),
+    isLoading: paged.isLoading('items'),
+  };
+};
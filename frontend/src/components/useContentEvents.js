@@ -0,0 +1,38 @@
+import { useEffect } from 'react';
+
+// Keeps lists current from the /api/events feed. `setters` maps item types
+// ('poem', 'image', 'video', 'music') to React state setters for lists of
+// listing items; uploads are prepended and deletes removed. `onResync`
+// refetches when events may have been missed (dropped or reconnected).
+const useContentEvents = (backendUrl, target, setters, onResync) => {
+  useEffect(() => {
+    const params = new URLSearchParams({ type: Object.keys(setters).join(',') });
+    if (target) {
+      params.set('target', target);
+    }
+    const events = new EventSource(`${backendUrl}/api/events?${params}`);
+    let opened = false;
+
+    events.onopen = () => {
+      if (opened) {
+        onResync();
+      }
+      opened = true;
+    };
+    events.onmessage = (message) => {
+      const event = JSON.parse(message.data);
+      const setItems = setters[event.type];
+      if (!setItems) return;
+      if (event.op === 'insert') {
+        setItems(items => (items.some(item => item._id === event.id) ? items : [event.item, ...items]));
+      } else {
+        setItems(items => items.filter(item => item._id !== event.id));
+      }
+    };
+    events.addEventListener('resync', onResync);
+
+    return () => events.close();
+  }, [backendUrl, target]);
+};
+
+export default useContentEvents;